@@ -2,7 +2,7 @@ from portals.AdminPortal import AdminPortal
 
 
 def main():
-    admin_portal = AdminPortal()
+    admin_portal = AdminPortal.get_session_portal()
     admin_portal.start()
 
 
@@ -0,0 +1,94 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+ASSESSMENT_MAX_CONCURRENCY = 4  # LLM requests in flight at once
+ASSESSMENT_MAX_RETRIES = 3
+ASSESSMENT_RETRY_DELAY = 1.0  # Seconds before the first retry, doubled on every retry
+ASSESSMENT_CACHE_SIZE = 512
+
+
+class AssessmentGenerator:
+    """
+    Runs a batch of LLM prompts on a bounded thread pool, retrying failed calls.
+
+    Responses are cached across sessions by a hash of the prompt, so a student
+    whose data has not changed is not sent to the LLM again.
+    """
+
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, llm, max_concurrency=ASSESSMENT_MAX_CONCURRENCY,
+                 max_retries=ASSESSMENT_MAX_RETRIES, retry_delay=ASSESSMENT_RETRY_DELAY):
+        self.llm = llm
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+    def generate(self, prompts):
+        """
+        :param prompts: Dictionary of key (e.g. user ID) to prompt.
+        :return: Dictionary of key to LLM response. Keys whose prompt failed on
+            every attempt are left out.
+        """
+        results = {}
+        pending = {}
+        for key, prompt in prompts.items():
+            cached = self.get_cached(prompt)
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending[key] = prompt
+
+        if not pending:
+            return results
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = {key: executor.submit(self.call_llm, prompt) for key, prompt in pending.items()}
+            for key, future in futures.items():
+                try:
+                    response = future.result()
+                except Exception as e:
+                    print(f"Error while generating the assessment for {key}: {e}")
+                    continue
+                self.set_cached(pending[key], response)
+                results[key] = response
+
+        return results
+
+    def call_llm(self, prompt):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.llm(prompt)
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.retry_delay * 2 ** attempt)
+
+    @staticmethod
+    def get_prompt_hash(prompt):
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def get_cached(cls, prompt):
+        prompt_hash = cls.get_prompt_hash(prompt)
+        with cls._cache_lock:
+            if prompt_hash not in cls._cache:
+                return None
+            cls._cache.move_to_end(prompt_hash)
+            return cls._cache[prompt_hash]
+
+    @classmethod
+    def set_cached(cls, prompt, response):
+        with cls._cache_lock:
+            cls._cache[cls.get_prompt_hash(prompt)] = response
+            while len(cls._cache) > ASSESSMENT_CACHE_SIZE:
+                cls._cache.popitem(last=False)
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._cache_lock:
+            cls._cache.clear()
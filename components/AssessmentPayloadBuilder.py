@@ -0,0 +1,90 @@
+import json
+import math
+import re
+from collections import Counter
+
+REMARKS_TOKEN_BUDGET = 300  # Tokens all remarks of a student may take in the prompt
+MAX_REMARK_TOKENS = 60  # Tokens a single remark is truncated to
+CHARS_PER_TOKEN = 4  # Rough size of a token for English text
+
+
+class AssessmentPayloadBuilder:
+    """
+    Condenses a student's recordings, practice logs and achievements into the
+    figures the progress report prompt asks for. Only the teacher remarks are
+    kept as text; they are deduplicated, newest first, within a token budget.
+    """
+
+    def __init__(self, remarks_token_budget=REMARKS_TOKEN_BUDGET, max_remark_tokens=MAX_REMARK_TOKENS):
+        self.remarks_token_budget = remarks_token_budget
+        self.max_remark_tokens = max_remark_tokens
+
+    def build(self, recordings, practice_logs, achievements):
+        """
+        :param recordings: Recording rows with timestamp, track_name, duration, score and teacher_remarks.
+        :param practice_logs: Practice log rows with timestamp and minutes.
+        :param achievements: Achievement rows with badge.
+        :return: Dictionary that serializes to the prompt's MusicData.
+        """
+        daily_minutes = Counter()
+        for log in practice_logs:
+            day = log['timestamp'].date() if log.get('timestamp') else None
+            daily_minutes[day] += log['minutes'] or 0
+
+        scores = [float(recording['score']) for recording in recordings if recording.get('score') is not None]
+        badges = Counter(achievement['badge'] for achievement in achievements)
+
+        return {
+            'practice_minutes': int(sum(daily_minutes.values())),
+            'max_daily_practice_minutes': int(max(daily_minutes.values(), default=0)),
+            'practice_days': len(daily_minutes),
+            'recordings': len(recordings),
+            'recording_minutes': round(sum(recording.get('duration') or 0 for recording in recordings) / 60, 2),
+            'unique_tracks': len({recording['track_name'] for recording in recordings}),
+            'average_score': round(sum(scores) / len(scores), 2) if scores else None,
+            'badges_earned': len(achievements),
+            'badges': dict(badges),
+            'remarks': self.get_remarks(recordings),
+        }
+
+    def get_remarks(self, recordings):
+        """
+        Unique remarks as "track: remark", in the order of the recordings (newest
+        first, as the queries return them), until the token budget is spent.
+        """
+        remarks = []
+        seen = set()
+        tokens = 0
+        for recording in recordings:
+            if not recording.get('teacher_remarks'):
+                continue
+            remark = ' '.join(recording['teacher_remarks'].split())
+            key = remark.casefold()
+            if key in seen:
+                continue
+            seen.add(key)
+
+            remark = self.truncate(f"{recording['track_name']}: {remark}", self.max_remark_tokens)
+            remark_tokens = self.estimate_tokens(remark)
+            if tokens + remark_tokens > self.remarks_token_budget:
+                break
+            remarks.append(remark)
+            tokens += remark_tokens
+        return remarks
+
+    @staticmethod
+    def truncate(text, max_tokens):
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return text
+        # Cut at the last word boundary that fits
+        return re.sub(r'\s+\S*$', '', text[:max_chars - 1]) + '…'
+
+    @staticmethod
+    def estimate_tokens(text):
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    @classmethod
+    def get_payload_size(cls, payload):
+        text = json.dumps(payload)
+        return {'characters': len(text), 'tokens': cls.estimate_tokens(text)}
@@ -0,0 +1,167 @@
+import base64
+import hashlib
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from components.LocalFileCache import LocalFileCache
+from enums.SoundEffect import SoundEffect
+
+ASSET_DIRECTORIES = ['badges', 'sound effects', 'avatars']  # Bucket folders mirrored locally
+ASSET_SYNC_MAX_WORKERS = 8  # Assets downloaded at once
+ASSET_MISS_RETRY_INTERVAL = 300  # Seconds before a failed on-demand download is tried again
+
+
+class AssetSync:
+    """
+    Process-level mirror of the static assets (badges, sound effects and
+    avatars) in the storage bucket.
+
+    The first sync lists the bucket folders as a manifest of names and MD5
+    checksums, downloads missing or changed files in parallel, verifies them
+    and keeps an index of blob name to local path. After that, looking up an
+    asset is a dictionary lookup.
+    """
+
+    def __init__(self, directories=None, local_root='', max_workers=ASSET_SYNC_MAX_WORKERS,
+                 miss_retry_interval=ASSET_MISS_RETRY_INTERVAL):
+        self.directories = directories or ASSET_DIRECTORIES
+        self.local_root = local_root
+        self.max_workers = max_workers
+        self.miss_retry_interval = miss_retry_interval
+        self.lock = threading.Lock()
+        self.index = {}
+        self.misses = {}
+        self.synced = False
+        self.storage_repo = None
+
+    def sync(self, storage_repo):
+        """Sync the assets once per process; later calls return immediately."""
+        with self.lock:
+            if self.synced:
+                return
+            self.storage_repo = storage_repo
+            try:
+                manifest = []
+                for directory in self.directories:
+                    manifest.extend(storage_repo.get_manifest(directory))
+            except Exception as e:
+                print(f"Error while fetching the asset manifest: {e}")
+                manifest = None
+
+            if manifest is None:
+                # Serve whatever is on disk; misses are downloaded on demand
+                self.index = self.scan_local_assets()
+            else:
+                self.index = self.sync_manifest(manifest)
+            self.synced = True
+            print(f"Synced {len(self.index)} assets.")
+
+    def sync_manifest(self, manifest):
+        index = {}
+        outdated = []
+        for entry in manifest:
+            local_path = self.get_local_path(entry['name'])
+            if self.is_current(local_path, entry['md5_hash']):
+                index[entry['name']] = local_path
+            else:
+                outdated.append(entry)
+
+        if outdated:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for entry, local_path in zip(outdated, executor.map(self.download, outdated)):
+                    if local_path:
+                        index[entry['name']] = local_path
+        return index
+
+    def download(self, entry):
+        """Download a manifest entry, returning its local path, or None if it failed or did not verify."""
+        local_path = self.get_local_path(entry['name'])
+        try:
+            data = self.storage_repo.download_blob_by_name(entry['name'])
+        except Exception as e:
+            print(f"Error while downloading asset {entry['name']}: {e}")
+            return None
+
+        if entry.get('md5_hash') and self.get_checksum(data) != entry['md5_hash']:
+            print(f"Checksum mismatch for asset {entry['name']}, skipping it.")
+            return None
+
+        try:
+            LocalFileCache.write_atomically(local_path, data)
+        except OSError as e:
+            print(f"Error while writing asset {entry['name']}: {e}")
+            return None
+        return local_path
+
+    def scan_local_assets(self):
+        index = {}
+        for directory in self.directories:
+            local_directory = self.get_local_path(directory)
+            if not os.path.isdir(local_directory):
+                continue
+            for filename in os.listdir(local_directory):
+                index[f"{directory}/{filename}"] = os.path.join(local_directory, filename)
+        return index
+
+    def get_path(self, directory, filename):
+        """
+        :return: Local path of the asset, or None if it does not exist. An asset
+            missing from the index (e.g. uploaded after the sync) is downloaded on
+            demand; a failed download is retried after ASSET_MISS_RETRY_INTERVAL.
+        """
+        name = f"{directory}/{filename}"
+        local_path = self.index.get(name)
+        if local_path is not None:
+            return local_path
+
+        with self.lock:
+            if name in self.index:
+                return self.index[name]
+            if self.storage_repo is None:
+                return None
+            # Remember misses, so a missing asset is not requested on every rerun
+            missed_at = self.misses.get(name)
+            if missed_at is not None and time.monotonic() - missed_at < self.miss_retry_interval:
+                return None
+            local_path = self.download({'name': name, 'md5_hash': None})
+            if local_path is None:
+                self.misses[name] = time.monotonic()
+            else:
+                self.misses.pop(name, None)
+                self.index[name] = local_path
+            return local_path
+
+    def get_badge(self, badge_name):
+        return self.get_path('badges', f"{badge_name}.png")
+
+    def get_avatar(self, avatar_name):
+        return self.get_path('avatars', f"{avatar_name}.png")
+
+    def get_sound_effect(self, sound_effect: SoundEffect):
+        return self.get_path('sound effects', random.choice(sound_effect.effects))
+
+    def get_local_path(self, name):
+        return os.path.join(self.local_root, *name.split('/'))
+
+    @classmethod
+    def is_current(cls, local_path, md5_hash):
+        if not os.path.isfile(local_path):
+            return False
+        if not md5_hash:
+            # Composite objects have no MD5; trust an existing file
+            return True
+        with open(local_path, "rb") as f:
+            return cls.get_checksum(f.read()) == md5_hash
+
+    @staticmethod
+    def get_checksum(data):
+        """Base64 encoded MD5 digest, the format the storage bucket reports."""
+        return base64.b64encode(hashlib.md5(data).digest()).decode('utf-8')
+
+
+# Workers on the same host mirror into the same APP_CACHE_DIR, so only the
+# first one downloads; the others find the files current
+shared_asset_sync = AssetSync(local_root=os.environ.get('APP_CACHE_DIR', ''))
@@ -1,46 +1,55 @@
-import librosa
 import numpy as np
-from fastdtw import fastdtw
-from scipy.spatial.distance import cosine, euclidean
-from scipy.stats import zscore
+
+# librosa, scipy and fastdtw are imported on first use, so that importing a
+# portal does not load them unless audio is actually processed
 
 
 class AudioProcessor:
 
     @staticmethod
     def load_and_normalize_audio(audio_path):
+        import librosa
         y, sr = librosa.load(audio_path)
         y = librosa.util.normalize(y)
         return y, sr
 
     @staticmethod
     def compute_mfcc(audio, sr):
+        import librosa
         return librosa.feature.mfcc(y=audio, sr=sr)
 
     @staticmethod
     def compute_chromagram(audio, sr):
+        import librosa
         return librosa.feature.chroma_stft(y=audio, sr=sr)
 
     @staticmethod
     def euclidean_distance(feature1, feature2):
+        from scipy.spatial.distance import euclidean
         return euclidean(feature1.flatten(), feature2.flatten())
 
     @staticmethod
     def cosine_distance(feature1, feature2):
+        from scipy.spatial.distance import cosine
         return cosine(feature1.flatten(), feature2.flatten())
 
     @staticmethod
     def dtw_euclidean_distance(feature1, feature2):
+        from fastdtw import fastdtw
+        from scipy.spatial.distance import euclidean
         distance, _ = fastdtw(feature1.T, feature2.T, dist=euclidean)
         return distance
 
     @staticmethod
     def dtw_cosine_distance(feature1, feature2):
+        from fastdtw import fastdtw
+        from scipy.spatial.distance import cosine
         distance, _ = fastdtw(feature1.T, feature2.T, dist=cosine)
         return distance
 
     @classmethod
     def extract_features(cls, audio_path):
+        from scipy.stats import zscore
         y, sr = cls.load_and_normalize_audio(audio_path)
         chroma = cls.compute_chromagram(y, sr)
         mfcc = cls.compute_mfcc(y, sr)
@@ -54,5 +63,6 @@ class AudioProcessor:
 
     @staticmethod
     def calculate_audio_duration(path):
+        import librosa
         y, sr = librosa.load(path)
         return librosa.get_duration(y=y, sr=sr)
@@ -0,0 +1,31 @@
+import hashlib
+import threading
+import time
+
+
+class FakeLLM:
+    """
+    Local stand-in for the LLM, used when USE_FAKE_LLM is set and in tests.
+
+    It answers every prompt with a deterministic canned assessment, and can
+    simulate latency and a number of initial failures to exercise retries.
+    """
+
+    def __init__(self, latency=0.0, failures=0):
+        self.latency = latency
+        self.failures = failures
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self.lock:
+            self.prompts.append(prompt)
+            if self.failures > 0:
+                self.failures -= 1
+                raise RuntimeError("Simulated LLM failure")
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+        return f"Great progress this period! Keep practicing regularly. [fake assessment {prompt_hash}]"
@@ -0,0 +1,136 @@
+import multiprocessing
+import time
+
+import numpy as np
+
+from enums.LearningModels import LearningModels
+from repositories.ModelPerformanceRepository import ModelPerformanceRepository
+from repositories.ScorePredictionModelRepository import ScorePredictionModelRepository, TRAINING_SET_FEATURES
+
+TUNING_TIME_BUDGET = 600  # Seconds the whole tuning job may take
+TUNING_TRIALS_PER_MODEL = 20
+TUNING_CV_FOLDS = 5
+TUNING_POLL_INTERVAL = 0.1  # Seconds between checks for finished trials
+# Weight of the inference cost in the objective: every 10x increase in tree
+# levels walked per prediction costs as much as a 10% higher MSE.
+INFERENCE_COST_WEIGHT = 0.1
+
+
+def run_trial(model_name, params, features, target, cv=TUNING_CV_FOLDS):
+    """
+    Cross-validate one hyperparameter configuration. Runs in a worker process,
+    so it only takes and returns picklable values.
+    """
+    from sklearn.model_selection import cross_validate
+
+    model_builder = LearningModels[model_name].get_model_builder_class()()
+    start = time.perf_counter()
+    scores = cross_validate(
+        model_builder.create_model(params), features, target, cv=cv,
+        scoring=('neg_mean_squared_error', 'neg_mean_absolute_error', 'r2'),
+        return_estimator=True)
+    fit_seconds = time.perf_counter() - start
+
+    metrics = {
+        'mse': float(-np.mean(scores['test_neg_mean_squared_error'])),
+        'mae': float(-np.mean(scores['test_neg_mean_absolute_error'])),
+        'r2': float(np.mean(scores['test_r2'])),
+    }
+    inference_cost = max(model_builder.get_inference_cost(estimator) for estimator in scores['estimator'])
+    return {
+        'model_name': model_name,
+        'params': params,
+        'metrics': metrics,
+        'fit_seconds': fit_seconds,
+        'inference_cost': inference_cost,
+        'objective': HyperparameterTuner.get_objective(metrics['mse'], inference_cost),
+    }
+
+
+class HyperparameterTuner:
+    def __init__(self,
+                 score_prediction_model_repo: ScorePredictionModelRepository,
+                 model_performance_repo: ModelPerformanceRepository):
+        self.score_prediction_model_repo = score_prediction_model_repo
+        self.model_performance_repo = model_performance_repo
+
+    def tune(self, model_types=None, trials_per_model=TUNING_TRIALS_PER_MODEL,
+             time_budget=TUNING_TIME_BUDGET, max_workers=None):
+        """
+        Search hyperparameters for each model on a process pool and store the best
+        configuration per model for ScorePredictor.train to reuse.
+
+        When the time budget runs out, the worker pool is terminated, which stops
+        the running trials and drops the ones that have not started. Every finished
+        trial is recorded in model_performance.
+
+        :return: Dictionary of model name to its best trial.
+        """
+        training_set = self.score_prediction_model_repo.get_training_arrays()
+        features = np.column_stack([training_set[feature] for feature in TRAINING_SET_FEATURES])
+        target = training_set['score']
+        if len(target) < TUNING_CV_FOLDS:
+            print("Insufficient data for tuning the models.")
+            return {}
+
+        model_types = model_types or LearningModels.get_enabled_models()
+        candidates = [(model_type.name, params)
+                      for model_type in model_types
+                      for params in self.get_candidate_params(model_type, trials_per_model)]
+
+        deadline = time.monotonic() + time_budget
+        best_trials = {}
+        # Terminating the pool stops trials still running at the deadline
+        pool = multiprocessing.Pool(processes=max_workers)
+        try:
+            pending = [pool.apply_async(run_trial, (model_name, params, features, target))
+                       for model_name, params in candidates]
+            while pending:
+                for result in [result for result in pending if result.ready()]:
+                    pending.remove(result)
+                    self.record_trial(result, best_trials)
+                if not pending:
+                    break
+                if time.monotonic() >= deadline:
+                    print(f"Tuning time budget exceeded, stopping {len(pending)} unfinished trials.")
+                    break
+                time.sleep(TUNING_POLL_INTERVAL)
+        finally:
+            pool.terminate()
+            pool.join()
+
+        for model_name, trial in best_trials.items():
+            self.model_performance_repo.save_best_params(
+                model_name, trial['params'], trial['objective'], trial['model_performance_id'])
+        return best_trials
+
+    def record_trial(self, result, best_trials):
+        try:
+            trial = result.get()
+        except Exception as e:
+            print(f"Tuning trial failed: {e}")
+            return
+
+        trial['model_performance_id'] = self.model_performance_repo.record_tuning_trial(
+            trial['model_name'], trial['metrics'], trial['params'], trial['fit_seconds'], trial['inference_cost'])
+        best = best_trials.get(trial['model_name'])
+        if best is None or trial['objective'] < best['objective']:
+            best_trials[trial['model_name']] = trial
+
+    @staticmethod
+    def get_candidate_params(model_type, trials_per_model):
+        """
+        Return the configurations to try: the full grid if it is small enough,
+        otherwise a reproducible random sample of it.
+        """
+        from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+        param_distributions = model_type.get_model_builder_class().param_distributions
+        grid = ParameterGrid(param_distributions)
+        if len(grid) <= trials_per_model:
+            return list(grid)
+        return list(ParameterSampler(param_distributions, trials_per_model, random_state=42))
+
+    @staticmethod
+    def get_objective(mse, inference_cost):
+        return float(mse * (1 + INFERENCE_COST_WEIGHT * np.log10(1 + inference_cost)))
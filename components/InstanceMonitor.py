@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+import urllib.request
+from collections import deque
+
+from repositories.AppInstanceRepository import AppInstanceRepository
+from repositories.DatabaseManager import DatabaseManager
+
+INSTANCE_REPORT_INTERVAL = 30  # Seconds between health reports of an instance
+ACTIVE_SESSION_WINDOW = 300  # Seconds after its last render that a session still counts as active
+RENDER_TIME_SAMPLES = 200  # Recent render times the p95 is computed from
+HEALTH_CHECK_INTERVAL = 1  # Seconds between checks whether the server is serving, before it reports
+HEALTH_CHECK_TIMEOUT = 5  # Seconds the server may take to answer a health check
+
+
+class InstanceMonitor:
+    """
+    Tracks this instance's active sessions and render times, and reports them
+    with a heartbeat into app_instances for the load balancer.
+
+    Reports are sent by a background thread every INSTANCE_REPORT_INTERVAL
+    seconds, whether or not the instance renders pages, but only while its
+    server answers the health check. A server that is not up yet, or hangs,
+    goes stale.
+
+    Reporting is enabled by setting APP_INSTANCE_URL to the instance's public URL.
+    """
+
+    def __init__(self, report_interval=INSTANCE_REPORT_INTERVAL,
+                 active_session_window=ACTIVE_SESSION_WINDOW, samples=RENDER_TIME_SAMPLES,
+                 connection_factory=DatabaseManager):
+        self.report_interval = report_interval
+        self.active_session_window = active_session_window
+        self.connection_factory = connection_factory
+        self.lock = threading.Lock()
+        self.render_times = deque(maxlen=samples)
+        self.sessions = {}
+        self.thread = None
+
+    def record_render(self, session_key, render_seconds):
+        with self.lock:
+            self.render_times.append(render_seconds)
+            self.sessions[session_key] = time.monotonic()
+
+    def get_active_sessions(self):
+        with self.lock:
+            cutoff = time.monotonic() - self.active_session_window
+            self.sessions = {key: seen for key, seen in self.sessions.items() if seen >= cutoff}
+            return len(self.sessions)
+
+    def get_p95_render_ms(self):
+        with self.lock:
+            render_times = sorted(self.render_times)
+        if not render_times:
+            return None
+        return int(render_times[min(len(render_times) - 1, int(len(render_times) * 0.95))] * 1000)
+
+    def start_reporting(self, health_url, url=None):
+        """
+        Start the reporting thread, once per process.
+
+        :param health_url: Health check URL of this instance's server, e.g.
+            http://localhost:8501/_stcore/health.
+        """
+        url = url or os.environ.get('APP_INSTANCE_URL')
+        if not url:
+            return False
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, args=(health_url, url),
+                                               name='InstanceMonitor', daemon=True)
+                self.thread.start()
+        return True
+
+    def run(self, health_url, url):
+        database_manager = None
+        while True:
+            if not self.is_serving(health_url):
+                time.sleep(HEALTH_CHECK_INTERVAL)
+                continue
+            try:
+                if database_manager is None:
+                    database_manager = self.connection_factory()
+                self.report(database_manager.connection, url)
+            except Exception as e:
+                print(f"Error while reporting the health of instance {url}: {e}")
+                if database_manager is not None:
+                    database_manager.close()
+                database_manager = None
+            time.sleep(self.report_interval)
+
+    @staticmethod
+    def is_serving(health_url):
+        try:
+            with urllib.request.urlopen(health_url, timeout=HEALTH_CHECK_TIMEOUT) as response:
+                return response.status == 200
+        except Exception:
+            return False
+
+    def report(self, connection, url):
+        AppInstanceRepository(connection).report_health(url, self.get_active_sessions(), self.get_p95_render_ms())
+
+
+shared_instance_monitor = InstanceMonitor()
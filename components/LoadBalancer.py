@@ -0,0 +1,54 @@
+import random
+
+from repositories.AppInstanceRepository import AppInstanceRepository
+
+INSTANCE_STALE_AFTER = 90  # Seconds without a heartbeat after which an instance is skipped
+CLIENT_PIN_MAX_AGE = 7 * 24 * 3600  # Seconds a returning client is sent back to the same instance
+DEFAULT_RENDER_MS = 500  # Assumed p95 render time of an instance that has not measured one yet
+
+
+class LoadBalancer:
+    """
+    Picks the app instance for a new visitor.
+
+    A returning client goes back to its pinned instance while that instance is
+    healthy, so it finds warm caches. Otherwise two healthy instances are
+    sampled and the less loaded one is claimed (power of two choices), which
+    spreads load without every balancer piling onto the same instance. Only
+    if no instance has a recent heartbeat is the least loaded of all
+    instances claimed, so a stale instance never takes a session while a
+    healthy one is up.
+
+    Claims go through AppInstanceRepository.claim_instance, which compares the
+    load and counts the new session in one atomic UPDATE.
+    """
+
+    def __init__(self, stale_after=INSTANCE_STALE_AFTER, rng=None):
+        self.stale_after = stale_after
+        self.rng = rng or random.Random()
+
+    def claim(self, app_instance_repo: AppInstanceRepository, pinned_instance_id=None):
+        """
+        :param pinned_instance_id: Instance the client was last sent to, if any.
+        :return: The claimed instance as a dictionary with id and url, or None if there are none.
+        """
+        healthy_ids = [instance['id'] for instance in app_instance_repo.get_instances()
+                       if self.is_healthy(instance)]
+
+        if pinned_instance_id in healthy_ids:
+            instance = app_instance_repo.claim_instance([pinned_instance_id], DEFAULT_RENDER_MS)
+            if instance:
+                return instance
+
+        if not healthy_ids:
+            return app_instance_repo.claim_instance(None, DEFAULT_RENDER_MS)
+
+        candidate_ids = self.rng.sample(healthy_ids, min(2, len(healthy_ids)))
+        instance = app_instance_repo.claim_instance(candidate_ids, DEFAULT_RENDER_MS)
+        if instance or len(candidate_ids) == len(healthy_ids):
+            return instance
+        # The sampled instances were removed meanwhile, stay among the healthy ones
+        return app_instance_repo.claim_instance(healthy_ids, DEFAULT_RENDER_MS)
+
+    def is_healthy(self, instance):
+        return instance['heartbeat_age'] is not None and instance['heartbeat_age'] <= self.stale_after
@@ -0,0 +1,60 @@
+import os
+import threading
+
+
+class LocalFileCache:
+    """Helpers for the files the workers on a host share through the local cache directories."""
+
+    @staticmethod
+    def write_atomically(path, data):
+        """
+        Write data to path through a temporary file in the same directory, so
+        readers in other threads or processes never see a partial file.
+
+        :param path: Destination path, its directory is created if missing.
+        :param data: Bytes to write.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def prune(directory, keep, prefix='', suffix=''):
+        """
+        Remove all but the keep most recently modified files in directory whose
+        names start with prefix and end with suffix. Temporary files are left alone.
+
+        :param directory: Directory to prune, nothing happens if it does not exist.
+        :param keep: Number of files to keep.
+        :param prefix: Only files whose names start with this are considered.
+        :param suffix: Only files whose names end with this are considered.
+        :return: The paths that were removed.
+        """
+        if not os.path.isdir(directory):
+            return []
+        paths = [os.path.join(directory, filename) for filename in os.listdir(directory)
+                 if filename.startswith(prefix) and filename.endswith(suffix) and not filename.endswith(".tmp")]
+        paths.sort(key=LocalFileCache.get_mtime, reverse=True)
+        removed = []
+        for path in paths[keep:]:
+            try:
+                os.remove(path)
+                removed.append(path)
+            except OSError as e:
+                # Another process may have removed it already
+                print(f"Error while removing cached file {path}: {e}")
+        return removed
+
+    @staticmethod
+    def get_mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0
@@ -0,0 +1,76 @@
+import numpy as np
+import plotly.express as px
+import streamlit as st
+
+MAX_PLOT_POINTS = 500  # Upper bound on points drawn per diagnostics chart
+
+
+class ModelDiagnosticsDisplay:
+    def __init__(self, max_points=MAX_PLOT_POINTS):
+        self.max_points = max_points
+
+    def show(self, diagnostics):
+        if not diagnostics:
+            st.info("No diagnostics available for this model. Generate the models to create them.")
+            return
+
+        influential_ids = set(diagnostics.get('influential_ids', []))
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            self.plot_residuals(diagnostics['test'], influential_ids)
+        with col2:
+            self.plot_cooks_distance(diagnostics['train'], influential_ids)
+        with col3:
+            self.plot_leverage(diagnostics['train'], influential_ids)
+
+    def plot_residuals(self, test_diagnostics, influential_ids):
+        ids = test_diagnostics['ids']
+        indices = self.downsample(ids, influential_ids)
+        fig = px.scatter(
+            x=np.asarray(test_diagnostics['predicted'])[indices],
+            y=np.asarray(test_diagnostics['residuals'])[indices],
+            hover_name=np.asarray(ids)[indices],
+            labels={'x': 'Predicted Values', 'y': 'Residuals'},
+            title='Residual Plot')
+        fig.add_hline(y=0, line_dash="dash", line_color="red")
+        st.plotly_chart(fig, use_container_width=True)
+
+    def plot_cooks_distance(self, train_diagnostics, influential_ids):
+        ids = train_diagnostics['ids']
+        indices = self.downsample(ids, influential_ids)
+        fig = px.scatter(
+            x=indices,
+            y=np.asarray(train_diagnostics['cooks_distance'], dtype=float)[indices],
+            hover_name=np.asarray(ids)[indices],
+            labels={'x': 'Data Points', 'y': 'Distance'},
+            title='Cooks Distance')
+        st.plotly_chart(fig, use_container_width=True)
+
+    def plot_leverage(self, train_diagnostics, influential_ids):
+        ids = train_diagnostics['ids']
+        indices = self.downsample(ids, influential_ids)
+        residuals_squared = np.asarray(train_diagnostics['normalized_residuals'], dtype=float) ** 2
+        fig = px.scatter(
+            x=residuals_squared[indices],
+            y=np.asarray(train_diagnostics['leverage'], dtype=float)[indices],
+            hover_name=np.asarray(ids)[indices],
+            labels={'x': 'Normalized residuals**2', 'y': 'Leverage'},
+            title='Leverage vs. Normalized residuals squared')
+        st.plotly_chart(fig, use_container_width=True)
+
+    def downsample(self, ids, influential_ids):
+        """
+        Return the positions of the points to draw: every influential point plus an
+        evenly spaced sample of the rest, capped at max_points overall.
+        """
+        if len(ids) <= self.max_points:
+            return np.arange(len(ids))
+
+        is_influential = np.isin(np.asarray(ids), list(influential_ids))
+        keep = np.flatnonzero(is_influential)[:self.max_points]
+        others = np.flatnonzero(~is_influential)
+        remaining = self.max_points - len(keep)
+        if remaining > 0 and len(others):
+            step = int(np.ceil(len(others) / remaining))
+            keep = np.concatenate((keep, others[::step]))
+        return np.sort(keep)
@@ -1,21 +1,28 @@
+import hashlib
+import time
+from datetime import datetime
+
 import pandas as pd
 import streamlit as st
-
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
-from sklearn.model_selection import train_test_split
-import matplotlib.pyplot as plt
-import seaborn as sns
-import statsmodels.api as sm
 import numpy as np
 
 from enums.LearningModels import LearningModels
+from models.CompactTreeEnsemble import CompactTreeEnsemble
 from repositories import TrackRepository
 from repositories.ModelPerformanceRepository import ModelPerformanceRepository
 from repositories.ModelStorageRepository import ModelStorageRepository
-from repositories.ScorePredictionModelRepository import ScorePredictionModelRepository
+from repositories.ScorePredictionModelRepository import ScorePredictionModelRepository, TRAINING_SET_FEATURES
+
+INFLUENCE_CACHE_SIZE = 4  # Number of training-set snapshots to keep diagnostics for
+COMPACT_MODEL_VERSION_CHECK_INTERVAL = 30  # Seconds a loaded compact model is reused before checking its version
 
 
 class ScorePredictor:
+    # Influence diagnostics keyed by training-set snapshot, shared across instances
+    _influence_diagnostics_cache = {}
+    # (version, version check time, compact model) keyed by model path, shared across instances
+    _compact_model_cache = {}
+
     def __init__(self,
                  score_prediction_model_repo: ScorePredictionModelRepository,
                  track_repo: TrackRepository,
@@ -29,9 +36,8 @@ class ScorePredictor:
 
     def build_models(self):
         # Dictionary to hold models for each track
-        training_dataset = self.score_prediction_model_repo.get_training_set()
-        if not isinstance(training_dataset, pd.DataFrame):
-            training_dataset = pd.DataFrame(training_dataset)
+        # Typed columnar arrays, streamed from the DB or read from a local snapshot
+        training_dataset = pd.DataFrame(self.score_prediction_model_repo.get_training_arrays())
         # Check if there is sufficient data
         if training_dataset.empty:
             print("Insufficient data for training the model.")
@@ -54,31 +60,42 @@ class ScorePredictor:
             return
 
         # Preparing the dataset
-        features = training_dataset[['level', 'offset', 'duration', 'distance']]
+        features = training_dataset[TRAINING_SET_FEATURES]
         target = training_dataset['score']
 
         # Iterate through LearningModels enum and train each model
         for model_type in LearningModels.get_enabled_models():
             with st.spinner(f"Building model {model_type.name}"):
                 model_builder = model_type.get_model_builder()
-                model = model_builder.train(features, target)
+                # Use the tuned hyperparameters when a tuning job has stored some
+                params = self.model_performance_repo.get_best_params(model_type.name)
+                model = model_builder.train(features, target, params)
 
                 # Store the model (assuming you have a method for this)
                 blob_path = self.get_score_prediction_model_path(model_type.name)
                 model_path = self.model_storage_repo.save_model(blob_path, model)
 
+                # Tree models are also exported in a compact form for fast inference
+                if CompactTreeEnsemble.supports(model):
+                    self.model_storage_repo.save_compact_model(blob_path, CompactTreeEnsemble.from_model(model))
+                self._compact_model_cache.pop(blob_path, None)
+
                 print(f"{model_type.value['description']} model saved at: {model_path}")
 
     def predict_score(self, level, offset, duration, distance,
                       model_name=LearningModels.RandomForestRegressorScorePredictionModel.name):
-        model = self.model_storage_repo.load_model(self.get_score_prediction_model_path(model_name))
-        # Model not found?
-        if not model:
-            return None
-
-        features = pd.DataFrame([[level, offset, duration, distance]],
-                                columns=['level', 'offset', 'duration', 'distance'])
-        predicted_score = model.predict(features)[0]
+        compact_model = self.get_compact_model(model_name)
+        if compact_model:
+            predicted_score = compact_model.predict([level, offset, duration, distance])
+        else:
+            model = self.model_storage_repo.load_model(self.get_score_prediction_model_path(model_name))
+            # Model not found?
+            if not model:
+                return None
+
+            features = pd.DataFrame([[level, offset, duration, distance]],
+                                    columns=['level', 'offset', 'duration', 'distance'])
+            predicted_score = model.predict(features)[0]
 
         # Ensure the score is within 0 to 10 range
         predicted_score = max(0, min(predicted_score, 10))
@@ -86,16 +103,44 @@ class ScorePredictor:
         # Format the score to 2 decimal places
         return round(predicted_score, 2)
 
+    def get_compact_model(self, model_name):
+        """
+        Return the compact form of a tree model. The copy loaded by this process
+        is keyed by the MD5 of the stored model, checked at most every
+        COMPACT_MODEL_VERSION_CHECK_INTERVAL seconds, so a model retrained by
+        another process is picked up on the next check.
+        """
+        model_path = self.get_score_prediction_model_path(model_name)
+        cached = self._compact_model_cache.get(model_path)
+        if cached and time.monotonic() - cached[1] < COMPACT_MODEL_VERSION_CHECK_INTERVAL:
+            return cached[2]
+
+        version = self.model_storage_repo.get_compact_model_version(model_path)
+        if cached and (version is None or version == cached[0]):
+            # Unchanged, or storage could not be read: keep serving the loaded copy
+            self._compact_model_cache[model_path] = (cached[0], time.monotonic(), cached[2])
+            return cached[2]
+
+        compact_model = self.model_storage_repo.load_compact_model(model_path)
+        self._compact_model_cache[model_path] = (version, time.monotonic(), compact_model)
+        return compact_model
+
     def get_score_prediction_model_path(self, model_name):
         return f'{self.model_bucket}/{model_name}'
 
     def evaluate_model_performance(self, training_dataset):
         """
         Evaluate the performance of both track-specific and generic models.
+
+        No plots are rendered here: each model gets a serializable diagnostics
+        artifact saved next to it, which the model generation dashboard renders
+        on demand.
         """
+        from sklearn.model_selection import train_test_split
+
         # Include 'id' column in the split
         x_train, x_test, y_train, y_test, ids_train, ids_test = train_test_split(
-            training_dataset[['level', 'offset', 'duration', 'distance']],
+            training_dataset[TRAINING_SET_FEATURES],
             training_dataset['score'],
             training_dataset['recording_id'],
             test_size=0.2,
@@ -103,12 +148,24 @@ class ScorePredictor:
         )
 
         # Convert all columns to float
-        x_train = x_train.applymap(float)
+        x_train = x_train.astype(float)
         y_train = y_train.astype(float)
-        x_test = x_test.applymap(float)
+        x_test = x_test.astype(float)
         y_test = y_test.astype(float)
 
-        influential_ids = []
+        # The OLS influence diagnostics only depend on the data, not on the model
+        # being evaluated, so compute them once and share them across models.
+        train_diagnostics = self.get_influence_diagnostics(x_train, y_train, ids_train)
+        test_diagnostics = self.get_influence_diagnostics(x_test, y_test, ids_test)
+
+        # Identify influential IDs from training and testing data
+        influential_ids_train = self.identify_influential_ids(train_diagnostics)
+        influential_ids_test = self.identify_influential_ids(test_diagnostics)
+
+        # Consolidate and deduplicate IDs
+        influential_ids = list(set(influential_ids_train + influential_ids_test))
+
+        artifacts = []
         for model_type in LearningModels.get_enabled_models():
             model_path = self.get_score_prediction_model_path(model_type.name)
             model = self.model_storage_repo.load_model(model_path)
@@ -117,37 +174,108 @@ class ScorePredictor:
                 y_pred = y_pred.astype(float)
                 residuals = y_test - y_pred
                 metrics = self.get_evaluation_metrics(y_test, y_pred)
-                # Display plots side by side
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    self.plot_residuals(y_pred, residuals, ids_test)
-                with col2:
-                    self.plot_cooks_distance(x_train, y_train, ids_train)
-                with col3:
-                    self.plot_leverage(x_train, y_train, ids_train)
-
-                # Identify influential IDs from training and testing data
-                influential_ids_train = self.identify_influential_ids(x_train, y_train, ids_train)
-                influential_ids_test = self.identify_influential_ids(x_test, y_test, ids_test)
-
-                # Consolidate and deduplicate IDs
-                influential_ids = list(set(influential_ids_train + influential_ids_test))
-                self.persist_model_performance(model_type.name, metrics, influential_ids)
+
+                model_performance_id = self.persist_model_performance(model_type.name, metrics, influential_ids)
+                artifact = self.build_diagnostics_artifact(
+                    model_type.name, model_performance_id, metrics, ids_test, y_pred, residuals,
+                    train_diagnostics, influential_ids)
+                self.model_storage_repo.save_diagnostics(model_path, artifact)
+                artifacts.append(artifact)
+
+        return artifacts
+
+    @staticmethod
+    def build_diagnostics_artifact(model_name, model_performance_id, metrics, ids_test, y_pred, residuals,
+                                   train_diagnostics, influential_ids):
+        """
+        Bundle the evaluation results of a model into a JSON-serializable dictionary.
+        """
+        return {
+            'model_name': model_name,
+            'model_performance_id': model_performance_id,
+            'created_at': datetime.utcnow().isoformat(),
+            'metrics': {name: float(value) for name, value in metrics.items()},
+            'test': {
+                'ids': [int(id_val) for id_val in ids_test],
+                'predicted': np.asarray(y_pred, dtype=float).tolist(),
+                'residuals': np.asarray(residuals, dtype=float).tolist(),
+            },
+            'train': {
+                'ids': [int(id_val) for id_val in train_diagnostics['ids']],
+                'cooks_distance': train_diagnostics['cooks_distance'].tolist(),
+                'leverage': train_diagnostics['leverage'].tolist(),
+                'normalized_residuals': train_diagnostics['normalized_residuals'].tolist(),
+            },
+            'influential_ids': sorted(int(id_val) for id_val in influential_ids),
+        }
+
+    def load_diagnostics(self, model_name):
+        return self.model_storage_repo.load_diagnostics(self.get_score_prediction_model_path(model_name))
+
+    @classmethod
+    def get_influence_diagnostics(cls, X, y, ids):
+        """
+        Return the OLS influence diagnostics for a data snapshot, computing them
+        only if the same snapshot has not been seen before.
+        """
+        key = cls.get_snapshot_key(X, y, ids)
+        diagnostics = cls._influence_diagnostics_cache.get(key)
+        if diagnostics is None:
+            diagnostics = cls.compute_influence_diagnostics(X, y, ids)
+            if len(cls._influence_diagnostics_cache) >= INFLUENCE_CACHE_SIZE:
+                cls._influence_diagnostics_cache.pop(next(iter(cls._influence_diagnostics_cache)))
+            cls._influence_diagnostics_cache[key] = diagnostics
+        return diagnostics
+
+    @staticmethod
+    def get_snapshot_key(X, y, ids):
+        digest = hashlib.sha1()
+        for values in (X, y, ids):
+            digest.update(np.ascontiguousarray(np.asarray(values, dtype=float)).tobytes())
+            digest.update(str(np.shape(values)).encode())
+        return digest.hexdigest()
 
     @staticmethod
-    def identify_influential_ids(X, y, ids, residuals=None):
-        model = sm.OLS(y, sm.add_constant(X)).fit()
-        influence = model.get_influence()
+    def compute_influence_diagnostics(X, y, ids):
+        """
+        Fit OLS once and derive residuals, leverage and Cook's distance from it.
+
+        The hat matrix diagonal is taken from the row norms of the thin QR factor
+        of the design matrix, so memory stays O(n * p) instead of O(n²).
+        """
+        design = np.column_stack([np.ones(len(X)), np.asarray(X, dtype=float)])
+        target = np.asarray(y, dtype=float)
+        n_obs, n_params = design.shape
 
-        # Cook's Distance
-        cooks_d = influence.cooks_distance[0]
+        q, _ = np.linalg.qr(design)
+        fitted = q @ (q.T @ target)
+        residuals = target - fitted
+        leverage = np.einsum('ij,ij->i', q, q)
 
-        # Leverage (hat values)
-        leverage = influence.hat_matrix_diag
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scale = residuals @ residuals / (n_obs - n_params)
+            cooks_distance = residuals ** 2 / (n_params * scale) * leverage / (1 - leverage) ** 2
+            normalized_residuals = residuals / np.sqrt(residuals @ residuals)
+
+        return {
+            'ids': list(ids),
+            'fitted': fitted,
+            'residuals': residuals,
+            'normalized_residuals': normalized_residuals,
+            'leverage': leverage,
+            'cooks_distance': cooks_distance,
+            'n_params': n_params,
+        }
+
+    @staticmethod
+    def identify_influential_ids(diagnostics, residuals=None):
+        cooks_d = diagnostics['cooks_distance']
+        leverage = diagnostics['leverage']
+        n_obs = len(leverage)
 
         # Set thresholds for Cook's distance, leverage, and residuals
-        cooks_d_threshold = 4 / len(X)
-        leverage_threshold = 2 * (X.shape[1] + 1) / len(X)
+        cooks_d_threshold = 4 / n_obs
+        leverage_threshold = 2 * diagnostics['n_params'] / n_obs
         residual_threshold = 2 * np.std(residuals) if residuals is not None else None
 
         # Identify high leverage, high Cook's distance, and high residual points
@@ -157,83 +285,21 @@ class ScorePredictor:
 
         # Combine the indices of influential points
         influential_points = np.unique(
-            np.concatenate((high_leverage_points, high_cooks_d_points, high_residual_points)))
+            np.concatenate((high_leverage_points, high_cooks_d_points, high_residual_points))).astype(int)
 
         # Retrieve the recording IDs of these influential points
-        influential_ids = ids.iloc[influential_points].tolist()
+        ids = diagnostics['ids']
+        influential_ids = [ids[i] for i in influential_points]
 
         return influential_ids
 
-    @staticmethod
-    def plot_residuals(y_pred, residuals, ids):
-        plt.figure(figsize=(8, 4))  # Adjusted to smaller size
-        sns.scatterplot(x=y_pred, y=residuals)
-        plt.axhline(y=0, color='red', linestyle='--')
-        plt.xlabel('Predicted Values')
-        plt.ylabel('Residuals')
-        plt.title('Residual Plot')
-
-        # Convert to numpy arrays for correct indexing
-        y_pred = np.array(y_pred)
-        residuals = np.array(residuals)
-
-        # Annotate each point with its ID
-        for id_val, pred, resid in zip(ids, y_pred, residuals):
-            plt.annotate(id_val, (pred, resid))
-
-        st.pyplot(plt)
-        plt.clf()
-
-    @staticmethod
-    def plot_cooks_distance(X, y, ids):
-        model = sm.OLS(y, sm.add_constant(X)).fit()
-        influence = model.get_influence()
-
-        # Cook's Distance
-        plt.figure(figsize=(8, 4))  # Adjusted to smaller size
-        (c, p) = influence.cooks_distance
-        plt.stem(np.arange(len(c)), c, markerfmt=",")
-        plt.title('Cooks Distance')
-        plt.xlabel('Data Points')
-        plt.ylabel('Distance')
-
-        # Annotate each point with its ID
-        for i, id_val in enumerate(ids):
-            plt.annotate(id_val, (i, c[i]), textcoords="offset points", xytext=(0, 10), ha='center')
-
-        st.pyplot(plt)
-        plt.clf()
-
-    @staticmethod
-    def plot_leverage(X, y, ids):
-        model = sm.OLS(y, sm.add_constant(X)).fit()
-        fig, ax = plt.subplots(figsize=(8, 4))
-        sm.graphics.plot_leverage_resid2(model, ax=ax)
-
-        # Get the leverage values
-        leverage = model.get_influence().hat_matrix_diag
-        # Get the residuals
-        residuals = model.resid
-
-        # Ensure 'ids' is aligned with 'residuals'
-        if len(ids) != len(residuals):
-            st.error("Mismatch in the length of IDs and residuals.")
-            return
-
-        # Annotate each point with its ID
-        for i, id_val in enumerate(ids):
-            # Leverage index might not align with residual index, so use .iloc
-            ax.annotate(id_val, (leverage[i], residuals.iloc[i]), textcoords="offset points", xytext=(0, 10),
-                        ha='center')
-
-        st.pyplot(fig)
-        plt.clf()
-
     @staticmethod
     def get_evaluation_metrics(y_true, y_pred):
         """
         Calculate evaluation metrics for a given model.
         """
+        from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+
         return {
             'mse': mean_squared_error(y_true, y_pred),
             'mae': mean_absolute_error(y_true, y_pred),
@@ -245,4 +311,4 @@ class ScorePredictor:
         Persist the model performance metrics in the repository.
         """
         # Call the method from ModelPerformanceRepository to save these metrics
-        self.model_performance_repo.record_model_performance(model, metrics, ids)
+        return self.model_performance_repo.record_model_performance(model, metrics, ids)
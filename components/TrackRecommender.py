@@ -1,8 +1,12 @@
 from datetime import datetime
 
+import pandas as pd
+
 from repositories.RecordingRepository import RecordingRepository
 from repositories.UserRepository import UserRepository
 
+MAX_RECOMMENDED_TRACKS = 5
+
 
 class TrackRecommender:
     def __init__(self, recording_repo: RecordingRepository,
@@ -40,6 +44,10 @@ class TrackRecommender:
             if stat['earliest_recording_date']
         }
 
+        # First recommendation dates of every track, fetched once instead of per track
+        first_recommended_dates = self.recording_repo.get_first_recommendation_dates(user_id)
+        new_recommendations = []
+
         # Iterate through tracks and recommend based on the new conditions
         for track_stat in all_track_stats:
             track_id = track_stat['track_id']
@@ -50,12 +58,11 @@ class TrackRecommender:
             recommended_on_date = earliest_recording_date or datetime.now()
 
             # Check if the track is already recommended and get the first recommended date
-            first_recommended_date = self.recording_repo.get_first_recommendation_date(
-                user_id, track_id)
+            first_recommended_date = first_recommended_dates.get(track_id)
 
             if first_recommended_date is None:
-                # Persist the recommendation date
-                self.recording_repo.add_user_track_recommendation(user_id, track_id, recommended_on_date)
+                # Queue the recommendation date to be persisted with the others
+                new_recommendations.append((track_id, recommended_on_date))
                 first_recommended_date = recommended_on_date
 
             # Calculate days on track using first_recommended_date
@@ -78,21 +85,124 @@ class TrackRecommender:
                 recommended_tracks.append(recommended_track_info)
 
                 # If we have recommended 5 tracks, break the loop
-                if len(recommended_tracks) == 5:
+                if len(recommended_tracks) == MAX_RECOMMENDED_TRACKS:
                     break
 
+        # Persist all new recommendation dates in one bulk insert
+        if new_recommendations:
+            self.recording_repo.add_user_track_recommendations(
+                [(user_id, track_id, recommended_on) for track_id, recommended_on in new_recommendations])
+
         return recommended_tracks
 
-    def get_top_common_tracks_for_group(self, group_id):
+    def recommend_tracks_for_users(self, user_ids):
+        """
+        Compute the recommended tracks of several users at once.
+
+        Applies the same rules as recommend_tracks to every (user, track) pair in
+        one vectorized pass over grouped query results, so the number of queries
+        does not depend on the number of users or tracks. Only the fields the
+        group views need are returned per track.
+
+        :return: Dictionary of user ID to that user's list of recommended tracks.
+        """
+        if not user_ids:
+            return {}
+        all_track_stats = self.recording_repo.get_all_track_statistics()
+        if not all_track_stats:
+            return {user_id: [] for user_id in user_ids}
+
+        now = datetime.now()
+        # One row per (user, track), users in the given order and tracks in catalog order
+        tracks = pd.DataFrame(all_track_stats)[
+            ['track_id', 'name', 'level', 'ordering_rank', 'recommendation_threshold_score']]
+        grid = pd.DataFrame({'user_id': user_ids}).merge(tracks, how='cross')
+        grid = grid.merge(
+            pd.DataFrame(self.recording_repo.get_average_track_scores_by_users(user_ids),
+                         columns=['user_id', 'track_id', 'avg_score']),
+            how='left', on=['user_id', 'track_id'])
+        grid = grid.merge(
+            pd.DataFrame(self.recording_repo.get_track_statistics_by_users(user_ids),
+                         columns=['user_id', 'track_id', 'earliest_recording_date']),
+            how='left', on=['user_id', 'track_id'])
+        grid = grid.merge(
+            pd.DataFrame(self.recording_repo.get_first_recommendation_dates_by_users(user_ids),
+                         columns=['user_id', 'track_id', 'first_recommended_on']),
+            how='left', on=['user_id', 'track_id'])
+
+        user_avg_scores = grid['avg_score'].astype(float).fillna(0)
+        is_recommended = user_avg_scores < grid['recommendation_threshold_score'].astype(float)
+        # recommend_tracks stops walking the catalog once a user has enough recommendations
+        recommended_before = is_recommended.groupby(grid['user_id']).cumsum() - is_recommended
+        is_visited = recommended_before < MAX_RECOMMENDED_TRACKS
+
+        recommended_on_dates = pd.to_datetime(grid['earliest_recording_date']).fillna(now)
+        first_recommended_dates = pd.to_datetime(grid['first_recommended_on'])
+        is_new = is_visited & first_recommended_dates.isna()
+        first_recommended_dates = first_recommended_dates.fillna(recommended_on_dates)
+        grid['days_on_track'] = (now - first_recommended_dates).dt.days
+
+        # Persist all new recommendation dates in one bulk insert
+        new_recommendations = grid[is_new]
+        if not new_recommendations.empty:
+            self.recording_repo.add_user_track_recommendations([
+                (int(user_id), int(track_id), recommended_on.to_pydatetime())
+                for user_id, track_id, recommended_on in zip(
+                    new_recommendations['user_id'], new_recommendations['track_id'],
+                    recommended_on_dates[is_new])])
+
+        recommendations = {user_id: [] for user_id in user_ids}
+        for row in grid[is_recommended & is_visited].itertuples(index=False):
+            recommendations[row.user_id].append({
+                'track_id': int(row.track_id),
+                'track_name': row.name,
+                'level': self.to_optional_int(row.level),
+                'ordering_rank': self.to_optional_int(row.ordering_rank),
+                'days_on_track': int(row.days_on_track),
+            })
+        return recommendations
+
+    @staticmethod
+    def to_optional_int(value):
+        # Tracks without a level or rank keep None, as in recommend_tracks
+        return None if pd.isna(value) else int(value)
+
+    def get_group_recommendations(self, group_id):
+        """
+        Compute the recommendations of every student in a group once and derive
+        the group views from them.
+
+        :return: Dictionary with the per-user 'recommendations', the group's
+                 'common_tracks' and 'advanced_tracks', and the 'top_performer_id'.
+        """
         # Get the list of user IDs in the group
         users = self.user_repo.get_users_by_group(group_id)
         user_ids = [user['user_id'] for user in users]
 
+        recommendations = self.recommend_tracks_for_users(user_ids)
+        advanced_tracks = self.get_top_advanced_tracks(recommendations)
+        return {
+            'recommendations': recommendations,
+            'common_tracks': self.get_top_common_tracks(recommendations),
+            'advanced_tracks': advanced_tracks,
+            'top_performer_id': self.get_top_performer(advanced_tracks),
+        }
+
+    def get_top_common_tracks_for_group(self, group_id):
+        return self.get_group_recommendations(group_id)['common_tracks']
+
+    def get_top_advanced_tracks_for_group(self, group_id):
+        return self.get_group_recommendations(group_id)['advanced_tracks']
+
+    def find_top_performer_in_group(self, group_id):
+        return self.get_group_recommendations(group_id)['top_performer_id']
+
+    @staticmethod
+    def get_top_common_tracks(recommendations):
         # Dictionary to count the frequency of each track being recommended
         track_recommendation_details = {}
 
-        for user_id in user_ids:
-            recommended_tracks = self.recommend_tracks(user_id)
+        for recommended_tracks in recommendations.values():
             for track in recommended_tracks:
                 track_name = track['track_name']
                 if track_name not in track_recommendation_details:
@@ -112,22 +222,21 @@ class TrackRecommender:
         return [{'name': track[0], 'level': track[1]['level'], 'ordering_rank': track[1]['ordering_rank']}
                 for track in top_common_tracks]
 
-    def get_top_advanced_tracks_for_group(self, group_id):
-        # Get the list of user IDs in the group
-        users = self.user_repo.get_users_by_group(group_id)
-        user_ids = [user['user_id'] for user in users]
-
+    @staticmethod
+    def get_top_advanced_tracks(recommendations):
         # Set to store unique tracks (level, ordering_rank)
         unique_tracks = set()
 
-        for user_id in user_ids:
-            recommended_tracks = self.recommend_tracks(user_id)
+        for user_id, recommended_tracks in recommendations.items():
             for track in recommended_tracks:
+                # Tracks without a level cannot be ranked by how advanced they are
+                if track['level'] is None:
+                    continue
                 # Add level and ordering rank tuple to the set
                 unique_tracks.add((track['level'], track['ordering_rank'], user_id))
 
-        # Sort tracks first by level (descending) then by ordering rank (descending)
-        sorted_tracks = sorted(unique_tracks, key=lambda x: (-x[0], -x[1]))
+        # Sort tracks first by level (descending) then by ordering rank (descending), unranked last
+        sorted_tracks = sorted(unique_tracks, key=lambda x: (-x[0], -x[1] if x[1] is not None else float('inf')))
 
         # Get the top 5 most advanced tracks
         top_advanced_tracks = sorted_tracks[:5]
@@ -135,10 +244,8 @@ class TrackRecommender:
         return [{'level': track[0], 'ordering_rank': track[1], 'user_id': track[2]}
                 for track in top_advanced_tracks]
 
-    def find_top_performer_in_group(self, group_id):
-        # Get top advanced tracks along with user IDs
-        top_advanced_tracks = self.get_top_advanced_tracks_for_group(group_id)
-
+    @staticmethod
+    def get_top_performer(top_advanced_tracks):
         # Create a dictionary to count the frequency of advanced tracks per user
         user_advanced_track_count = {}
         for track in top_advanced_tracks:
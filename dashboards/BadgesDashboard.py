@@ -1,8 +1,8 @@
 import datetime
-import os
 
 import streamlit as st
 
+from components.AssetSync import shared_asset_sync
 from components.SoundEffectGenerator import SoundEffectGenerator
 from enums.Badges import UserBadges, TrackBadges, BaseBadge
 from enums.Settings import Settings
@@ -169,26 +169,9 @@ class BadgesDashboard:
                     Start by listening to a track and making your first recording today!
                 """)
 
-    def get_badge(self, badge_name):
-        # Directory where badges are stored locally
-        local_badges_directory = 'badges'
-
-        # Construct the local file path for the badge
-        local_file_path = os.path.join(local_badges_directory, f"{badge_name}.png")
-
-        # Check if the badge exists locally
-        if os.path.exists(local_file_path):
-            return local_file_path
-
-        # If badge not found locally, attempt to download from remote
-        remote_path = f"{self.get_badges_bucket()}/{badge_name}.png"
-        success = self.storage_repo.download_blob_and_save(remote_path, local_file_path)
-
-        if success:
-            return local_file_path
-        else:
-            print(f"Failed to download badge named '{badge_name}' from remote location.")
-            return None
+    @staticmethod
+    def get_badge(badge_name):
+        return shared_asset_sync.get_badge(badge_name)
 
     @staticmethod
     def get_badges_bucket():
@@ -3,7 +3,9 @@ from datetime import datetime
 
 import streamlit as st
 import plotly.express as px
+from components.HyperparameterTuner import HyperparameterTuner
 from components.ListBuilder import ListBuilder
+from components.ModelDiagnosticsDisplay import ModelDiagnosticsDisplay
 from components.ScorePredictor import ScorePredictor
 from enums.LearningModels import LearningModels
 from repositories.ModelPerformanceRepository import ModelPerformanceRepository
@@ -43,10 +45,35 @@ class ModelGenerationDashboard:
         if st.button("Generate Models", type="primary"):
             self.score_predictor.build_models()
 
+        with st.expander("Tune Hyperparameters"):
+            time_budget = st.number_input("Time budget (minutes)", min_value=1, max_value=120, value=10)
+            if st.button("Tune Models"):
+                self.tune_models(time_budget * 60)
+
         # self.test_model()
         st.divider()
         self.show_model_performance()
 
+    def tune_models(self, time_budget):
+        with st.spinner("Tuning hyperparameters"):
+            best_trials = HyperparameterTuner(
+                self.score_prediction_model_repo, self.model_performance_repo).tune(time_budget=time_budget)
+
+        if not best_trials:
+            st.info("No tuning trials completed.")
+            return
+
+        list_builder = ListBuilder(column_widths=[30, 40, 15, 15])
+        list_builder.build_header(column_names=["Model", "Best Parameters", "CV MSE", "Inference Cost"])
+        for model_name, trial in best_trials.items():
+            list_builder.build_row({
+                'model_name': model_name,
+                'params': ', '.join(f"{key}={value}" for key, value in trial['params'].items()),
+                'mse': round(trial['metrics']['mse'], 2),
+                'inference_cost': trial['inference_cost']
+            })
+        st.success("Tuned hyperparameters will be used the next time the models are generated.")
+
     def show_model_performance(self):
         # Initialize an empty list to store performance data for all models
         all_model_performance_data = []
@@ -91,6 +118,10 @@ class ModelGenerationDashboard:
                     # Pass the extracted data as a dictionary to the build_row method
                     list_builder.build_row(extracted_data)
 
+                # Diagnostics are rendered lazily from the artifact saved at training time
+                if st.checkbox("Show diagnostics", key=f"show_diagnostics_{model_name}"):
+                    ModelDiagnosticsDisplay().show(self.score_predictor.load_diagnostics(model_name))
+
             st.write("")
 
         # Display consolidated visualizations using the DataFrame
@@ -9,10 +9,15 @@ class NotificationsDashboard:
         self.user_session_repo = user_session_repo
         self.portal_repo = portal_repo
 
-    def notify(self, user_id, group_id, org_id, last_activity_time):
-        # Fetch new notifications since the last activity time
-        notifications = self.portal_repo.get_notifications(
-            user_id, group_id, org_id, last_activity_time)
+    def notify(self, user_id, group_id, org_id, cursor):
+        """
+        :param cursor: Cursor returned by the previous call, or the id of the last
+            activity the session has been notified of.
+        :return: Tuple of the messages to show and the new cursor.
+        """
+        # Fetch new notifications since the cursor
+        notifications, cursor = self.portal_repo.get_notifications(
+            user_id, group_id, org_id, cursor)
         # Display each notification
         messages = []
         for notification in notifications:
@@ -37,7 +42,7 @@ class NotificationsDashboard:
 
             messages.append(message)
 
-        return messages
+        return messages, cursor
 
 
 
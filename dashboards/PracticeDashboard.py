@@ -1,5 +1,4 @@
 import pandas as pd
-import plotly.figure_factory as ff
 import streamlit as st
 
 from repositories.UserPracticeLogRepository import UserPracticeLogRepository
@@ -42,7 +41,9 @@ class PracticeDashboard:
         pivot_table = merged_df.pivot_table(values='total_minutes', index=merged_df['date'].dt.dayofweek,
                                             columns=merged_df['date'].dt.isocalendar().week, fill_value=0)
 
-        # Use the Plotly Figure Factory to create the annotated heatmap
+        # Use the Plotly Figure Factory to create the annotated heatmap. It pulls in
+        # scipy, so it is imported here rather than with the portal
+        import plotly.figure_factory as ff
         z = pivot_table.values
         x = ['Week ' + str(int(week)) for week in pivot_table.columns]
         y = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
@@ -115,10 +115,12 @@ class SkillsDashboard:
     def show_recording_stats(self, user_id, group_id, tracks):
         track_recommender = TrackRecommender(self.recording_repo, self.user_repo)
         recommended_tracks = track_recommender.recommend_tracks(user_id)
-        group_tracks = track_recommender.get_top_common_tracks_for_group(group_id)
+        # Common and advanced group tracks come from one shared computation
+        group_recommendations = track_recommender.get_group_recommendations(group_id)
+        group_tracks = group_recommendations['common_tracks']
         recommended_track_names = [track['track_name'] for track in recommended_tracks]
         group_track_names = [track['name'] for track in group_tracks]
-        advanced_group_tracks = track_recommender.get_top_advanced_tracks_for_group(group_id)
+        advanced_group_tracks = group_recommendations['advanced_tracks']
         advanced_group_track_info = [(track['level'], track['ordering_rank']) for track in advanced_group_tracks]
         # Identify the top performer
         top_performer_id = max(advanced_group_tracks, key=lambda track: (track['level'], track['ordering_rank']),
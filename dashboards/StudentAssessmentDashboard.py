@@ -1,9 +1,12 @@
+import json
 import re
 from datetime import datetime
 from decimal import Decimal
 
 import pandas as pd
 
+from components.AssessmentGenerator import AssessmentGenerator
+from components.AssessmentPayloadBuilder import AssessmentPayloadBuilder
 from enums.ActivityType import ActivityType
 from enums.TimeFrame import TimeFrame
 from enums.UserType import UserType
@@ -47,24 +50,28 @@ class StudentAssessmentDashboard:
             print("No users found in the group.")
             return
 
-        # Generate and save an assessment for each user
-        for user in users:
-            user_id = user['user_id']
-            username = user['name']
-
-            # Assessment already generated?
-            if self.user_assessment_repo.exists_assessment(user_id, time_frame):
-                continue
+        # Skip users whose assessment was already generated
+        assessed_user_ids = self.user_assessment_repo.get_assessed_user_ids(
+            [user['user_id'] for user in users], time_frame)
+        users = [user for user in users if user['user_id'] not in assessed_user_ids]
+        if not users:
+            return
 
-            # Fetch data needed for the LLM to generate the assessment
-            data = self.get_student_data(user_id, time_frame)
-            print(data)
-            data = f"Student Name: {username}\nMusic Data:\n{data}"
+        # Fetch data needed for the LLM to generate the assessments
+        students_data = self.get_students_data([user['user_id'] for user in users], time_frame)
+        prompts_by_user_id = {}
+        for user in users:
+            data = students_data[user['user_id']]
+            size = AssessmentPayloadBuilder.get_payload_size(data)
+            print(f"Assessment payload for user {user['user_id']}: "
+                  f"{size['characters']} characters, ~{size['tokens']} tokens.")
+            prompts_by_user_id[user['user_id']] = self.get_prompt(user['name'], data)
 
-            # Generate the assessment text with the LLM
-            assessment = llm(prompts.PROGRESS_REPORT_GENERATION_PROMPT.format(data=data))
+        # Generate the assessment texts with the LLM, several at a time
+        assessments = AssessmentGenerator(llm).generate(prompts_by_user_id)
 
-            # Create the assessment
+        # Create the assessments
+        for user_id, assessment in assessments.items():
             self.user_assessment_repo.create_assessment(user_id, assessment, time_frame)
             print(f"Assessment generated for user {user_id}.")
 
@@ -114,15 +121,14 @@ class StudentAssessmentDashboard:
                 user_id = user_options[username]
                 data = self.get_student_data(
                     user_id, time_frame_selected)
-                formatted_data = f"Student Name: {username}\nMusic Data:\n{data}"
+                formatted_data = self.get_prompt(username, data)
 
             if "assessment" not in st.session_state:
                 st.session_state["assessment"] = ""
 
             if st.button("Generate Report"):
                 if formatted_data:
-                    st.session_state["assessment"] = llm(
-                        prompts.PROGRESS_REPORT_GENERATION_PROMPT.format(data=formatted_data))
+                    st.session_state["assessment"] = llm(formatted_data)
             with st.form(key="assessment_submission", clear_on_submit=True):
                 assessment = st.text_area("Student Assessment:",
                                           value=st.session_state["assessment"], height=150)
@@ -231,11 +237,10 @@ class StudentAssessmentDashboard:
                     with col3:
                         if st.button("Regenerate Report", key=f"regenerate-report-{user_id}", type="primary"):
                             data = self.get_student_data(user_id, time_frame)
-                            formatted_data = f"Student Name: {user_name}\nMusic Data:\n{data}"
+                            formatted_data = self.get_prompt(user_name, data)
 
                             if formatted_data:
-                                st.session_state[report_key] = llm(
-                                    prompts.PROGRESS_REPORT_GENERATION_PROMPT.format(data=formatted_data))
+                                st.session_state[report_key] = llm(formatted_data)
                                 st.rerun()
 
                     if message_type == "success":
@@ -321,39 +326,37 @@ class StudentAssessmentDashboard:
 
     def get_students_data_by_group(self, group_id, time_frame: TimeFrame = TimeFrame.PREVIOUS_WEEK):
         students = self.user_repo.get_users_by_group(group_id)
-        students_data = {}
-        for student in students:
-            students_data[student['user_id']] = \
-                self.get_student_data(student['user_id'], time_frame)
-
-        return students_data
+        return self.get_students_data([student['user_id'] for student in students], time_frame)
 
     def get_student_data(self, user_id, time_frame: TimeFrame = TimeFrame.PREVIOUS_WEEK):
-        practice_logs = self.user_practice_log_repo.get_user_practice_logs_by_timeframe(
-            user_id, time_frame)
-        achievements = self.user_achievement_repo.get_user_achievements_by_timeframe(
-            user_id, time_frame)
-        recordings = self.recording_repo.get_submissions_by_timeframe(user_id, time_frame)
-        # Define a list of fields to exclude
-        fields_to_exclude = ["recording_audio_url", "track_audio_url", "timestamp", "recording_id", "track_id", "id"]
-        # Create a new list without the URL fields
-        filtered_recordings = []
-        filtered_achievements = []
-        filtered_logs = []
+        return self.get_students_data([user_id], time_frame)[user_id]
+
+    def get_students_data(self, user_ids, time_frame: TimeFrame = TimeFrame.PREVIOUS_WEEK):
+        """
+        Fetch the recordings, practice logs and achievements of several students
+        with one query each, and condense them into prompt payloads.
+
+        :return: Dictionary of user ID to that student's payload.
+        """
+        practice_logs = self.user_practice_log_repo.get_user_practice_logs_by_users_and_timeframe(
+            user_ids, time_frame)
+        achievements = self.user_achievement_repo.get_user_achievements_by_users_and_timeframe(
+            user_ids, time_frame)
+        recordings = self.recording_repo.get_submissions_by_users_and_timeframe(user_ids, time_frame)
+
+        # Group the rows by student
+        activity = {user_id: {'recordings': [], 'practice_logs': [], 'achievements': []} for user_id in user_ids}
         for recording in recordings:
-            filtered_recording = {key: value for key, value in recording.items() if key not in fields_to_exclude}
-            filtered_recordings.append(filtered_recording)
-        for achievement in achievements:
-            filtered_achievement = {key: value for key, value in achievement.items() if key not in fields_to_exclude}
-            filtered_achievements.append(filtered_achievement)
+            activity[recording['user_id']]['recordings'].append(recording)
         for log in practice_logs:
-            filtered_log = {key: value for key, value in log.items() if key not in fields_to_exclude}
-            filtered_logs.append(filtered_log)
-        # Combine all the data into a single dictionary
-        student_data = {
-            'recordings': filtered_recordings,
-            'practice_logs': filtered_logs,
-            'achievements': filtered_achievements
-        }
-
-        return student_data
+            activity[log['user_id']]['practice_logs'].append(log)
+        for achievement in achievements:
+            activity[achievement['user_id']]['achievements'].append(achievement)
+
+        payload_builder = AssessmentPayloadBuilder()
+        return {user_id: payload_builder.build(**student_activity) for user_id, student_activity in activity.items()}
+
+    @staticmethod
+    def get_prompt(username, data):
+        return prompts.PROGRESS_REPORT_GENERATION_PROMPT.format(
+            data=f"Student Name: {username}\nMusic Data:\n{json.dumps(data)}")
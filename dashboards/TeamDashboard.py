@@ -26,14 +26,16 @@ class TeamDashboard:
 
     def build(self, group_ids, time_frame: TimeFrame):
         with st.spinner("Please wait.."):
-            # Iterate over each group ID and fetch the dashboard data
-            for group_id in group_ids:
-                dashboard_data = self.portal_repo.fetch_team_dashboard_data(
-                    group_id, time_frame)
+            # Fetch the stats and badges of all groups at once
+            dashboard_data_by_group = {group_id: [] for group_id in group_ids}
+            for data in self.portal_repo.fetch_team_dashboard_data_by_groups(group_ids, time_frame):
+                dashboard_data_by_group[data['group_id']].append(data)
 
+            for group_id, dashboard_data in dashboard_data_by_group.items():
                 # Display group information
-                group = self.user_repo.get_group(group_id)
-                st.markdown(f"### {group['name']}")
+                group_name = dashboard_data[0]['group_name'] if dashboard_data \
+                    else self.user_repo.get_group(group_id)['name']
+                st.markdown(f"### {group_name}")
 
                 column_widths = [12.5, 12.5, 12.5, 12.5, 12.5, 12.5, 13.5, 10]
                 list_builder = ListBuilder(column_widths)
@@ -44,8 +46,7 @@ class TeamDashboard:
 
                 # Display each team and its member count in a row
                 for data in dashboard_data:
-                    user_id = data['user_id']
-                    badges = self.user_achievement_repo.get_user_badges(user_id, time_frame)
+                    badges = data['badges']
                     avatar = data.get('avatar')
                     avatar_file_path = self.avatar_loader.get_avatar(avatar) if avatar else None
 
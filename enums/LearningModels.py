@@ -1,53 +1,52 @@
+import importlib
 from enum import Enum
 
-from models.DecisionTreeModelBuilder import DecisionTreeModelBuilder
-from models.GradientBoostingModelBuilder import GradientBoostingModelBuilder
-from models.KNNModelBuilder import KNNModelBuilder
-from models.LinearRegressionModelBuilder import LinearRegressionModelBuilder
-from models.RandomForestRegressorModelBuilder import RandomForestRegressorModelBuilder
-from models.SVRModelBuilder import SVRModelBuilder
-
 
 class LearningModels(Enum):
     RandomForestRegressorScorePredictionModel = {
         'name': 'RandomForestRegressorScorePredictionModel',
-        'class': RandomForestRegressorModelBuilder,
+        'class': 'models.RandomForestRegressorModelBuilder.RandomForestRegressorModelBuilder',
         'description': 'Random Forest Regressor Score Prediction Model',
         'enabled': True
     }
     LinearRegressionScorePredictionModel = {
         'name': 'LinearRegressionScorePredictionModel',
-        'class': LinearRegressionModelBuilder,
+        'class': 'models.LinearRegressionModelBuilder.LinearRegressionModelBuilder',
         'description': 'Linear Regression Score Prediction Model',
         'enabled': False
     }
     DecisionTreeScorePredictionModel = {
         'name': 'DecisionTreeScorePredictionModel',
-        'class': DecisionTreeModelBuilder,
+        'class': 'models.DecisionTreeModelBuilder.DecisionTreeModelBuilder',
         'description': 'Decision Tree Score Prediction Model',
         'enabled': False
     }
     GradientBoostingScorePredictionModel = {
         'name': 'GradientBoostingScorePredictionModel',
-        'class': GradientBoostingModelBuilder,
+        'class': 'models.GradientBoostingModelBuilder.GradientBoostingModelBuilder',
         'description': 'Gradient Boosting Score Prediction Model',
         'enabled': False
     }
     SVRScorePredictionModel = {
         'name': 'SVRScorePredictionModel',
-        'class': SVRModelBuilder,
+        'class': 'models.SVRModelBuilder.SVRModelBuilder',
         'description': 'SVR Score Prediction Model',
         'enabled': False
     }
     KNNPredictionModel = {
         'name': 'KNNPredictionModel',
-        'class': KNNModelBuilder,
+        'class': 'models.KNNModelBuilder.KNNModelBuilder',
         'description': 'KNN Score Prediction Model',
         'enabled': False
     }
 
+    def get_model_builder_class(self):
+        # The builders import sklearn, so they are only loaded when a model is built
+        module_name, class_name = self.value['class'].rsplit('.', 1)
+        return getattr(importlib.import_module(module_name), class_name)
+
     def get_model_builder(self):
-        model_builder_class = self.value['class']
+        model_builder_class = self.get_model_builder_class()
 
         # Check if the model is enabled before instantiating it
         if self.value.get('enabled', True):
@@ -53,3 +53,17 @@ class TimeFrame(enum.Enum):
             end_date = today + datetime.timedelta(days=1, seconds=-1)
 
         return start_date, end_date
+
+    def get_date_bounds(self, timezone='America/Los_Angeles'):
+        """
+        :return: First day of the time frame and the first day after it, for
+            half-open filters (date >= start AND date < end) on date columns.
+        """
+        start_date, end_date = self.get_date_range(timezone)
+        if isinstance(end_date, datetime.datetime):
+            end_date = end_date.date()
+        if self in (TimeFrame.CURRENT_MONTH, TimeFrame.PREVIOUS_MONTH,
+                    TimeFrame.CURRENT_YEAR, TimeFrame.PREVIOUS_YEAR):
+            # get_date_range already ends these on the first day of the next period
+            return start_date, end_date
+        return start_date, end_date + datetime.timedelta(days=1)
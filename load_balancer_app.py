@@ -1,19 +1,33 @@
 import os
+import uuid
 
-import streamlit as st
 import streamlit as st
 from streamlit.components.v1 import html
 
+from components.LoadBalancer import LoadBalancer, CLIENT_PIN_MAX_AGE
 from repositories.AppInstanceRepository import AppInstanceRepository
+from repositories.DatabaseManager import DatabaseManager
+
+CLIENT_ID_COOKIE = 'ss_client_id'
 
 
 def main():
     set_env()
-    app_instance_repo = AppInstanceRepository()
     st.write("Load balancer active")
-    app_instance = app_instance_repo.get_earliest_instance()
+    client_id = get_client_id()
+    database_manager = DatabaseManager()
+    try:
+        app_instance_repo = AppInstanceRepository(database_manager.connection)
+        app_instance = LoadBalancer().claim(
+            app_instance_repo, app_instance_repo.get_pinned_instance_id(client_id, CLIENT_PIN_MAX_AGE))
+        if app_instance is None:
+            st.error("No app instance is available, please try again later.")
+            return
+        app_instance_repo.pin_client(client_id, app_instance['id'])
+    finally:
+        database_manager.close()
+
     app_instance_url = app_instance['url']
-    app_instance_repo.update_last_used(app_instance['id'])
     st.write(app_instance_url)
     link_html = " <a target=\"_self\" href=\"{url}\" >{msg}</a> ".format(
         url=app_instance_url,
@@ -22,6 +36,25 @@ def main():
     st.markdown(link_html, unsafe_allow_html=True)
 
 
+def get_client_id():
+    """
+    Id of the visitor's browser, kept in a cookie so returning visitors can be
+    sent back to the instance they used last.
+    """
+    client_id = st.context.cookies.get(CLIENT_ID_COOKIE) or st.session_state.get(CLIENT_ID_COOKIE)
+    if client_id:
+        st.session_state[CLIENT_ID_COOKIE] = client_id
+        return client_id
+
+    client_id = uuid.uuid4().hex
+    st.session_state[CLIENT_ID_COOKIE] = client_id
+    html(f"""<script>
+        window.parent.document.cookie =
+            "{CLIENT_ID_COOKIE}={client_id}; max-age={CLIENT_PIN_MAX_AGE}; path=/; SameSite=Lax";
+    </script>""", height=0)
+    return client_id
+
+
 def set_env():
     env_vars = ['ROOT_USER', 'ROOT_PASSWORD', 'ADMIN_PASSWORD',
                 'SQL_SERVER', 'SQL_DATABASE', 'SQL_USERNAME', 'SQL_PASSWORD',
@@ -0,0 +1,157 @@
+import argparse
+import os
+
+import streamlit as st
+
+from repositories.AppInstanceRepository import AppInstanceRepository
+from repositories.AssignmentRepository import AssignmentRepository
+from repositories.DatabaseManager import DatabaseManager
+from repositories.FeatureToggleRepository import FeatureToggleRepository
+from repositories.MessageRepository import MessageRepository
+from repositories.ModelPerformanceRepository import ModelPerformanceRepository
+from repositories.NotesRepository import NotesRepository
+from repositories.OrganizationRepository import OrganizationRepository
+from repositories.RagaRepository import RagaRepository
+from repositories.RecordingRepository import RecordingRepository
+from repositories.ResourceRepository import ResourceRepository
+from repositories.SettingsRepository import SettingsRepository
+from repositories.TenantRepository import TenantRepository
+from repositories.TrackRepository import TrackRepository
+from repositories.UserAchievementRepository import UserAchievementRepository
+from repositories.UserActivityRepository import UserActivityRepository
+from repositories.UserAssessmentRepository import UserAssessmentRepository
+from repositories.UserDailyStatsRepository import UserDailyStatsRepository
+from repositories.UserPracticeLogRepository import UserPracticeLogRepository
+from repositories.UserRepository import UserRepository
+from repositories.UserSessionRepository import UserSessionRepository
+
+
+def bootstrap(connection):
+    """
+    Create the schema and seed data. Run once per deploy; repository
+    constructors do no DDL or seeding of their own. Every step is idempotent.
+    """
+    user_repo = UserRepository(connection)
+    recording_repo = RecordingRepository(connection)
+    user_activity_repo = UserActivityRepository(connection)
+    assignment_repo = AssignmentRepository(connection)
+    user_practice_log_repo = UserPracticeLogRepository(connection)
+    model_performance_repo = ModelPerformanceRepository(connection)
+    raga_repo = RagaRepository(connection)
+    settings_repo = SettingsRepository(connection)
+    feature_toggle_repo = FeatureToggleRepository(connection)
+    app_instance_repo = AppInstanceRepository(connection)
+
+    # Tables, in foreign key order
+    migrations = [
+        TenantRepository(connection).create_tenants_table,
+        OrganizationRepository(connection).create_organization_table,
+        user_repo.create_user_groups_table,
+        user_repo.create_avatars_table,
+        user_repo.create_users_table,
+        raga_repo.create_tables,
+        TrackRepository(connection).create_tables,
+        ResourceRepository(connection).create_resource_table,
+        assignment_repo.create_assignments_table,
+        assignment_repo.create_assignment_details_table,
+        assignment_repo.create_user_assignments_table,
+        recording_repo.create_recordings_table,
+        recording_repo.create_user_track_table,
+        recording_repo.add_user_track_unique_key,
+        recording_repo.create_user_track_stats_table,
+        recording_repo.create_track_stats_table,
+        recording_repo.backfill_user_track_stats,
+        recording_repo.backfill_track_stats,
+        UserSessionRepository(connection).create_sessions_table,
+        user_activity_repo.create_activities_table,
+        user_activity_repo.add_timestamp_index,
+        UserAchievementRepository(connection).create_achievements_table,
+        user_practice_log_repo.create_practice_log_table,
+        user_practice_log_repo.create_practice_streaks_table,
+        user_practice_log_repo.backfill_practice_streaks,
+        UserDailyStatsRepository(connection).create_tables,
+        settings_repo.create_settings_table,
+        feature_toggle_repo.create_feature_toggle_table,
+        MessageRepository(connection).create_messages_table,
+        NotesRepository(connection).create_notes_table,
+        UserAssessmentRepository(connection).create_table,
+        model_performance_repo.create_model_performance_table,
+        model_performance_repo.create_influential_recordings_table,
+        model_performance_repo.add_tuning_trial_columns,
+        model_performance_repo.create_model_hyperparameters_table,
+        app_instance_repo.create_instances_table,
+        app_instance_repo.add_health_columns,
+        app_instance_repo.create_instance_pins_table,
+    ]
+    for migration in migrations:
+        migration()
+    print(f"Applied {len(migrations)} schema migrations.")
+
+    seeds = [
+        user_repo.create_root_user,
+        user_repo.create_avatars,
+        raga_repo.create_seed_data,
+        settings_repo.create_seed_data,
+        feature_toggle_repo.create_seed_data,
+    ]
+    for seed in seeds:
+        seed()
+    print(f"Applied {len(seeds)} seed data sets.")
+
+
+def rebuild_user_track_stats(connection):
+    recording_repo = RecordingRepository(connection)
+    recording_repo.create_user_track_stats_table()
+    recording_repo.create_track_stats_table()
+    rows = recording_repo.rebuild_user_track_stats()
+    print(f"Rebuilt user_track_stats with {rows} rows, and track_stats.")
+
+
+def rebuild_user_daily_stats(connection):
+    user_daily_stats_repo = UserDailyStatsRepository(connection)
+    user_daily_stats_repo.create_tables()
+    rows = user_daily_stats_repo.rebuild_user_daily_stats()
+    print(f"Rebuilt user_daily_stats with {rows} rows.")
+
+
+def rebuild_practice_streaks(connection):
+    user_practice_log_repo = UserPracticeLogRepository(connection)
+    user_practice_log_repo.create_practice_streaks_table()
+    users = user_practice_log_repo.rebuild_practice_streaks()
+    print(f"Rebuilt user_practice_streaks for {users} users.")
+
+
+COMMANDS = {
+    'bootstrap': bootstrap,
+    'rebuild-user-track-stats': rebuild_user_track_stats,
+    'rebuild-user-daily-stats': rebuild_user_daily_stats,
+    'rebuild-practice-streaks': rebuild_practice_streaks,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database maintenance commands.")
+    parser.add_argument('command', choices=COMMANDS.keys())
+    args = parser.parse_args()
+
+    set_env()
+    database_manager = DatabaseManager()
+    try:
+        COMMANDS[args.command](database_manager.connection)
+    finally:
+        database_manager.close()
+
+
+def set_env():
+    env_vars = ['SQL_SERVER', 'SQL_DATABASE', 'SQL_USERNAME', 'SQL_PASSWORD', 'MYSQL_CONNECTION_STRING']
+    for var in env_vars:
+        os.environ[var] = st.secrets[var]
+    # Only needed to seed the root user
+    for var in ['ROOT_USER', 'ROOT_PASSWORD']:
+        if var in st.secrets:
+            os.environ[var] = st.secrets[var]
+    os.environ["GOOGLE_APP_CRED"] = st.secrets["GOOGLE_APPLICATION_CREDENTIALS"]
+
+
+if __name__ == "__main__":
+    main()
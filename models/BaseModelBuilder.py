@@ -1,7 +1,34 @@
 from abc import abstractmethod, ABC
 
+import numpy as np
+
 
 class BaseModelBuilder(ABC):
+    # Hyperparameters used when no tuned configuration is available
+    default_params = {}
+    # Search space explored by the hyperparameter tuner
+    param_distributions = {}
+
     @abstractmethod
-    def train(self, features, target):
+    def train(self, features, target, params=None):
         pass
+
+    @abstractmethod
+    def build_model(self, **params):
+        pass
+
+    def create_model(self, params=None):
+        """Create an untrained model from the defaults overridden by the given params."""
+        return self.build_model(**{**self.default_params, **(params or {})})
+
+    @staticmethod
+    def get_inference_cost(model):
+        """
+        Estimate the per-row prediction cost of a trained model as the number of
+        tree levels walked; models that are not tree based count as 1.
+        """
+        if hasattr(model, 'tree_'):
+            return int(model.tree_.max_depth)
+        if hasattr(model, 'estimators_'):
+            return int(sum(tree.tree_.max_depth for tree in np.ravel(model.estimators_)))
+        return 1
@@ -0,0 +1,109 @@
+import io
+
+import numpy as np
+
+
+class CompactTreeEnsemble:
+    """
+    Tree regressors flattened into plain NumPy arrays.
+
+    The nodes of every tree are stored back to back in `feature`, `threshold`,
+    `left`, `right` and `value` (leaves have -1 children), and `roots` holds the
+    index of each tree's root node. A prediction is
+    `base + scale * sum(leaf values)`, which covers a single decision tree, a
+    random forest (scale = 1 / n_trees) and gradient boosting (base = initial
+    estimate, scale = learning rate).
+    """
+
+    ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+
+    def __init__(self, feature, threshold, left, right, value, roots, base=0.0, scale=1.0, depth=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.base = float(base)
+        self.scale = float(scale)
+        # Number of splits on the longest root-to-leaf path, i.e. traversal steps needed
+        self.depth = int(depth) if depth is not None else len(feature)
+
+    @staticmethod
+    def supports(model):
+        if hasattr(model, 'tree_'):
+            return True
+        return hasattr(model, 'estimators_') and all(hasattr(tree, 'tree_') for tree in np.ravel(model.estimators_))
+
+    @classmethod
+    def from_model(cls, model):
+        """Flatten a fitted DecisionTreeRegressor, RandomForestRegressor or GradientBoostingRegressor."""
+        if hasattr(model, 'tree_'):
+            trees, base, scale = [model], 0.0, 1.0
+        elif hasattr(model, 'learning_rate'):
+            trees = list(np.ravel(model.estimators_))
+            base = float(np.ravel(model.init_.constant_)[0]) if model.init_ != 'zero' else 0.0
+            scale = model.learning_rate
+        else:
+            trees = list(model.estimators_)
+            base, scale = 0.0, 1.0 / len(trees)
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            tree = tree.tree_
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, -1, tree.children_left + offset))
+            rights.append(np.where(is_leaf, -1, tree.children_right + offset))
+            values.append(tree.value[:, 0, 0])
+            offset += tree.node_count
+
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            base=base,
+            scale=scale,
+            depth=max(tree.tree_.max_depth for tree in trees))
+
+    def predict(self, X):
+        """
+        Predict one row (1-D input) or a batch of rows (2-D input).
+
+        All trees are walked in lockstep, one level per step. Inputs are compared
+        as float32, like sklearn does, so predictions match it exactly.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        single_row = X.ndim == 1
+        X = np.atleast_2d(X)
+
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.depth):
+            left = self.left[nodes]
+            if (left == -1).all():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(left == -1, nodes, np.where(go_left, left, self.right[nodes]))
+
+        predictions = self.base + self.scale * self.value[nodes].sum(axis=1)
+        return predictions[0] if single_row else predictions
+
+    def to_bytes(self):
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer, base=self.base, scale=self.scale, depth=self.depth,
+            **{name: getattr(self, name) for name in self.ARRAYS})
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        with np.load(io.BytesIO(data)) as arrays:
+            return cls(**{name: arrays[name] for name in cls.ARRAYS},
+                       base=arrays['base'], scale=arrays['scale'], depth=arrays['depth'])
@@ -4,13 +4,20 @@ from .BaseModelBuilder import BaseModelBuilder
 
 
 class DecisionTreeModelBuilder(BaseModelBuilder):
+    param_distributions = {
+        'max_depth': [None, 4, 6, 10, 16],
+        'min_samples_leaf': [1, 2, 4, 8],
+    }
 
-    def train(self, features, target):
+    def build_model(self, **params):
+        return DecisionTreeRegressor(**params)
+
+    def train(self, features, target, params=None):
         # Split the data
         x_train, x_test, y_train, y_test = train_test_split(
             features, target, test_size=0.2, random_state=42)
 
         # Train a Decision Tree Regressor model
-        model = DecisionTreeRegressor()
+        model = self.create_model(params)
         model.fit(x_train, y_train)
         return model
@@ -4,12 +4,22 @@ from .BaseModelBuilder import BaseModelBuilder
 
 
 class GradientBoostingModelBuilder(BaseModelBuilder):
+    default_params = {'n_estimators': 100, 'learning_rate': 0.1, 'max_depth': 3, 'random_state': 42}
+    param_distributions = {
+        'n_estimators': [50, 100, 200],
+        'learning_rate': [0.03, 0.1, 0.2],
+        'max_depth': [2, 3, 4],
+        'subsample': [0.8, 1.0],
+    }
 
-    def train(self, features, target):
+    def build_model(self, **params):
+        return GradientBoostingRegressor(**params)
+
+    def train(self, features, target, params=None):
         # Split the data
         x_train, x_test, y_train, y_test = train_test_split(
             features, target, test_size=0.2, random_state=42)
         # Train a model
-        model = GradientBoostingRegressor(n_estimators=100, learning_rate=0.1, max_depth=3, random_state=42)
+        model = self.create_model(params)
         model.fit(x_train, y_train)
         return model
@@ -4,13 +4,21 @@ from .BaseModelBuilder import BaseModelBuilder
 
 
 class KNNModelBuilder(BaseModelBuilder):
+    default_params = {'n_neighbors': 5}
+    param_distributions = {
+        'n_neighbors': [3, 5, 7, 11, 15],
+        'weights': ['uniform', 'distance'],
+    }
 
-    def train(self, features, target):
+    def build_model(self, **params):
+        return KNeighborsRegressor(**params)
+
+    def train(self, features, target, params=None):
         # Split the data
         x_train, x_test, y_train, y_test = train_test_split(
             features, target, test_size=0.2, random_state=42)
 
         # Train a K-Nearest Neighbors regression model
-        model = KNeighborsRegressor(n_neighbors=5)
+        model = self.create_model(params)
         model.fit(x_train, y_train)
         return model
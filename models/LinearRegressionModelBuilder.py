@@ -6,11 +6,14 @@ from models.BaseModelBuilder import BaseModelBuilder
 
 class LinearRegressionModelBuilder(BaseModelBuilder):
 
-    def train(self, features, target):
+    def build_model(self, **params):
+        return LinearRegression(**params)
+
+    def train(self, features, target, params=None):
         # Split the data
         x_train, x_test, y_train, y_test = train_test_split(
             features, target, test_size=0.2, random_state=42)
         # Train a model
-        model = LinearRegression()
+        model = self.create_model(params)
         model.fit(x_train, y_train)
         return model
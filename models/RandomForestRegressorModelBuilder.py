@@ -5,9 +5,19 @@ from models.BaseModelBuilder import BaseModelBuilder
 
 
 class RandomForestRegressorModelBuilder(BaseModelBuilder):
+    default_params = {'random_state': 42}
+    param_distributions = {
+        'n_estimators': [25, 50, 100, 200],
+        'max_depth': [None, 6, 10, 16],
+        'min_samples_leaf': [1, 2, 4, 8],
+        'max_features': [1.0, 'sqrt', 0.5],
+    }
 
-    def train(self, features, target):
-        model = RandomForestRegressor(random_state=42)
+    def build_model(self, **params):
+        return RandomForestRegressor(**params)
+
+    def train(self, features, target, params=None):
+        model = self.create_model(params)
         # Cross-validation instead of a single split
         cv_scores = cross_val_score(
             model, features, target, cv=5, scoring='neg_mean_squared_error')
@@ -4,12 +4,19 @@ from .BaseModelBuilder import BaseModelBuilder
 
 
 class SVRModelBuilder(BaseModelBuilder):
+    param_distributions = {
+        'C': [0.1, 1.0, 10.0],
+        'epsilon': [0.0, 0.1, 0.5],
+    }
 
-    def train(self, features, target):
+    def build_model(self, **params):
+        return LinearSVR(**params)
+
+    def train(self, features, target, params=None):
         # Split the data
         x_train, x_test, y_train, y_test = train_test_split(
             features, target, test_size=0.2, random_state=42)
         # Train a model
-        model = LinearSVR()
+        model = self.create_model(params)
         model.fit(x_train, y_train)
         return model
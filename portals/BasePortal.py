@@ -1,19 +1,21 @@
 import base64
-import random
 from datetime import datetime
 import os
 import re
 import tempfile
+import threading
 import time
+import weakref
 from abc import ABC, abstractmethod
 import streamlit as st
-from langchain.llms.openai import AzureOpenAI
 
+from components.AssetSync import shared_asset_sync
 from components.AvatarLoader import AvatarLoader
+from components.FakeLLM import FakeLLM
+from components.InstanceMonitor import shared_instance_monitor
 from components.ListBuilder import ListBuilder
 from dashboards.NotificationsDashboard import NotificationsDashboard
 from enums.ActivityType import ActivityType
-from enums.Badges import UserBadges, TrackBadges
 from enums.Settings import Settings, SettingType
 from enums.SoundEffect import SoundEffect
 from enums.UserType import UserType
@@ -38,7 +40,16 @@ from repositories.UserSessionRepository import UserSessionRepository
 from repositories.ResourceRepository import ResourceRepository
 
 
+# Idle seconds after which a reused session connection is pinged before the next run
+SESSION_CONNECTION_PING_INTERVAL = 60
+
+
 class BasePortal(ABC):
+    # Collaborators shared by every session in the process
+    _shared_lock = threading.Lock()
+    _env_loaded = False
+    _shared_storage_repo = None
+
     def __init__(self):
         self.tenant_repo = None
         self.org_repo = None
@@ -60,10 +71,74 @@ class BasePortal(ABC):
         self.assessment_repo = None
         self.avatar_loader = None
         self.notifications_dashboard = None
-        self.set_env()
+        self.session_scoped = False
+        self.last_used = time.monotonic()
+        self.load_env()
         self.database_manager = DatabaseManager()
+        # Close the connection when an abandoned session's portal is garbage collected
+        weakref.finalize(self, self.database_manager.close)
         self.init_repositories()
 
+    @classmethod
+    def get_session_portal(cls):
+        """
+        Return the portal of the current Streamlit session, so its connection and
+        repositories are reused across reruns. A new one is built on the first
+        run, after logout and when the connection has been lost.
+        """
+        key = f"{cls.__name__}_portal"
+        portal = st.session_state.get(key)
+        if portal is None or not portal.is_connected():
+            portal = cls()
+            portal.session_scoped = True
+            st.session_state[key] = portal
+        return portal
+
+    @classmethod
+    def release_session_portal(cls):
+        portal = st.session_state.pop(f"{cls.__name__}_portal", None)
+        if portal:
+            portal.clean_up()
+
+    def is_connected(self):
+        connection = self.database_manager.connection if self.database_manager else None
+        if connection is None or not connection.open:
+            return False
+        if time.monotonic() - self.last_used > SESSION_CONNECTION_PING_INTERVAL:
+            try:
+                connection.ping(reconnect=False)
+            except Exception as e:
+                print(f"Session connection lost: {e}")
+                return False
+        return True
+
+    def end_read_snapshot(self):
+        """
+        End the transaction a reused session connection may still hold open. The
+        connection does not autocommit, and under REPEATABLE READ its first
+        SELECT fixes the snapshot until the next commit, which a rerun that only
+        reads never makes. Without this, the session would keep seeing the data
+        as of its first read.
+        """
+        try:
+            self.get_connection().rollback()
+        except Exception as e:
+            print(f"Error while ending the read snapshot of the session connection: {e}")
+
+    @classmethod
+    def load_env(cls):
+        with BasePortal._shared_lock:
+            if not BasePortal._env_loaded:
+                cls.set_env()
+                BasePortal._env_loaded = True
+
+    @staticmethod
+    def get_shared_storage_repo():
+        with BasePortal._shared_lock:
+            if BasePortal._shared_storage_repo is None:
+                BasePortal._shared_storage_repo = StorageRepository('melodymaster')
+            return BasePortal._shared_storage_repo
+
     def init_repositories(self):
         self.tenant_repo = TenantRepository(self.get_connection())
         self.org_repo = OrganizationRepository(self.get_connection())
@@ -82,7 +157,7 @@ class BasePortal(ABC):
         self.assignment_repo = AssignmentRepository(self.get_connection())
         self.message_repo = MessageRepository(self.get_connection())
         self.assessment_repo = UserAssessmentRepository(self.get_connection())
-        self.storage_repo = StorageRepository('melodymaster')
+        self.storage_repo = self.get_shared_storage_repo()
         self.avatar_loader = AvatarLoader(self.storage_repo, self.user_repo)
         self.notifications_dashboard = NotificationsDashboard(
             self.user_session_repo, self.portal_repo)
@@ -98,10 +173,11 @@ class BasePortal(ABC):
         self.database_manager.close()
 
     def start(self, register=False):
+        started = time.perf_counter()
+        self.last_used = time.monotonic()
+        self.end_read_snapshot()
         self.init_session()
-        self.cache_badges()
-        self.cache_sound_effects()
-        self.avatar_loader.cache_avatars()
+        self.cache_assets()
         self.set_app_layout()
         if self.user_logged_in():
             user = self.user_repo.get_user(self.get_user_id())
@@ -122,11 +198,25 @@ class BasePortal(ABC):
         else:
             self.build_tabs()
         self.show_copyright()
-        self.clean_up()
+        self.last_used = time.monotonic()
+        shared_instance_monitor.record_render(id(self), time.perf_counter() - started)
+        shared_instance_monitor.start_reporting(
+            f"http://localhost:{st.get_option('server.port')}/_stcore/health")
+        if not self.session_scoped:
+            self.clean_up()
+
+    def cache_assets(self):
+        # Badges, sound effects and avatars are synced once per process
+        shared_asset_sync.sync(self.storage_repo)
 
     def show_notifications(self, last_activity_time):
-        messages = self.notifications_dashboard.notify(
-            self.get_user_id(), self.get_group_id(), self.get_org_id(), last_activity_time)
+        # The session is notified of the activities after its cursor, which
+        # starts at the last activity before the given time
+        cursor = st.session_state.get('notification_cursor')
+        if cursor is None:
+            cursor = self.portal_repo.get_notification_cursor(last_activity_time)
+        messages, st.session_state['notification_cursor'] = self.notifications_dashboard.notify(
+            self.get_user_id(), self.get_group_id(), self.get_org_id(), cursor)
         if len(messages) > 0:
             self.play_sound_effect(SoundEffect.NOTIFICATION)
             for message in messages:
@@ -146,85 +236,13 @@ class BasePortal(ABC):
     def show_avatar(self, avatar):
         st.image(self.avatar_loader.get_avatar(avatar), width=75)
 
-    def get_sound_effect(self, sound_effect: SoundEffect):
-        # Directory where badges are stored locally
-        local_directory = self.get_sound_effects_bucket()
-
-        # Construct the local file path for the badge
-        effect = random.choice(sound_effect.effects)
-        local_file_path = os.path.join(local_directory, effect)
-
-        # Check if the badge exists locally
-        if os.path.exists(local_file_path):
-            return local_file_path
-
-        # If badge not found locally, attempt to download from remote
-        remote_path = f"{self.get_sound_effects_bucket()}/{sound_effect}"
-        success = self.storage_repo.download_blob_and_save(remote_path, local_file_path)
-
-        if success:
-            return local_file_path
-
-    def cache_sound_effects(self):
-        # Directory where sound effects are stored locally
-        local_sound_effects_directory = self.get_sound_effects_bucket()
-
-        # Ensure the directory exists
-        if not os.path.exists(local_sound_effects_directory):
-            os.makedirs(local_sound_effects_directory)
-
-        effects = SoundEffect.get_all_effects()
-        for effect in effects:
-            self._download_if_not_exist(
-                self.get_sound_effects_bucket(), effect, local_sound_effects_directory)
-
-    def cache_badges(self):
-        # Directory where badges are stored locally
-        local_badges_directory = self.get_badges_bucket()
-
-        # Ensure the directory exists
-        if not os.path.exists(local_badges_directory):
-            os.makedirs(local_badges_directory)
-
-        # Create a set to store all badge values (user and track)
-        all_badges = set(badge.value for badge in UserBadges) | \
-                     set(badge.value for badge in TrackBadges)
-
-        # Now, iterate over all badges and download them if they don't exist
-        for badge in all_badges:
-            self._download_if_not_exist(
-                self.get_badges_bucket(), f"{badge}.png", local_badges_directory)
-
-    def _download_if_not_exist(self, bucket, filename, directory):
-        # Construct the local file path
-        local_path = os.path.join(directory, filename)
-
-        # Check if the badge exists locally
-        if not os.path.exists(local_path):
-            # If the badge doesn't exist locally, download it
-            remote_path = f"{bucket}/{filename}"
-            self.storage_repo.download_blob_and_save(remote_path, local_path)
-
-    def get_badge(self, badge_name):
-        # Directory where badges are stored locally
-        local_badges_directory = 'badges'
-
-        # Construct the local file path for the badge
-        local_file_path = os.path.join(local_badges_directory, f"{badge_name}.png")
-
-        # Check if the badge exists locally
-        if os.path.exists(local_file_path):
-            return local_file_path
-
-        # If badge not found locally, attempt to download from remote
-        remote_path = f"{self.get_badges_bucket()}/{badge_name}.png"
-        success = self.storage_repo.download_blob_and_save(remote_path, local_file_path)
+    @staticmethod
+    def get_sound_effect(sound_effect: SoundEffect):
+        return shared_asset_sync.get_sound_effect(sound_effect)
 
-        if success:
-            return local_file_path
-        else:
-            print(f"Failed to download badge named '{badge_name}' from remote location.")
-            return None
+    @staticmethod
+    def get_badge(badge_name):
+        return shared_asset_sync.get_badge(badge_name)
 
     def set_app_layout(self):
         self.set_background_color()
@@ -653,6 +671,7 @@ class BasePortal(ABC):
     def set_session_state(self, user_id, org_id, username, group_id):
         st.session_state['user_logged_in'] = True
         st.session_state['user_id'] = user_id
+        st.session_state['notification_cursor'] = None
         st.session_state['org_id'] = org_id
         st.session_state['username'] = username
         st.session_state['group_id'] = group_id
@@ -688,6 +707,7 @@ class BasePortal(ABC):
             self.user_activity_repo.log_activity(
                 self.get_user_id(), self.get_session_id(), ActivityType.LOG_OUT, additional_params)
         self.clear_session_state()
+        self.release_session_portal()
         st.rerun()
 
     @staticmethod
@@ -1060,6 +1080,10 @@ class BasePortal(ABC):
         for var in env_vars:
             os.environ[var] = st.secrets[var]
         os.environ["GOOGLE_APP_CRED"] = st.secrets["GOOGLE_APPLICATION_CREDENTIALS"]
+        # Public URL of this instance, set where the load balancer routes to it.
+        # Workers started by student_workers.py get theirs in the environment.
+        if "APP_INSTANCE_URL" in st.secrets and "APP_INSTANCE_URL" not in os.environ:
+            os.environ["APP_INSTANCE_URL"] = st.secrets["APP_INSTANCE_URL"]
 
     @staticmethod
     def get_app_name():
@@ -1083,12 +1107,16 @@ class BasePortal(ABC):
 
     @staticmethod
     def load_llm(temperature):
+        if os.environ.get("USE_FAKE_LLM"):
+            return FakeLLM()
         os.environ["OPENAI_API_TYPE"] = st.secrets["OPENAI_API_TYPE"]
         os.environ["OPENAI_API_BASE"] = st.secrets["OPENAI_API_BASE"]
         os.environ["OPENAI_API_KEY"] = st.secrets["OPENAI_API_KEY"]
         os.environ["DEPLOYMENT_NAME"] = st.secrets["DEPLOYMENT_NAME"]
         os.environ["OPENAI_API_VERSION"] = st.secrets["OPENAI_API_VERSION"]
         os.environ["MODEL_NAME"] = st.secrets["MODEL_NAME"]
+        # Imported on first use, so portals that never call the LLM do not load langchain
+        from langchain.llms.openai import AzureOpenAI
         return AzureOpenAI(temperature=temperature,
                            deployment_name=os.environ["DEPLOYMENT_NAME"],
                            model_name=os.environ["MODEL_NAME"])
@@ -5,10 +5,10 @@ import time
 from abc import ABC
 from datetime import datetime
 
-from langchain.llms.openai import AzureOpenAI
 
 from components.AudioProcessor import AudioProcessor
 from components.BadgeAwarder import BadgeAwarder
+from components.FakeLLM import FakeLLM
 from components.ListBuilder import ListBuilder
 from components.RecordingUploader import RecordingUploader
 from components.RecordingsAndTrackScoreTrendsDisplay import RecordingsAndTrackScoreTrendsDisplay
@@ -122,12 +122,16 @@ class TeacherPortal(BasePortal, ABC):
 
     @staticmethod
     def load_llm(temperature):
+        if os.environ.get("USE_FAKE_LLM"):
+            return FakeLLM()
         os.environ["OPENAI_API_TYPE"] = st.secrets["OPENAI_API_TYPE"]
         os.environ["OPENAI_API_BASE"] = st.secrets["OPENAI_API_BASE"]
         os.environ["OPENAI_API_KEY"] = st.secrets["OPENAI_API_KEY"]
         os.environ["DEPLOYMENT_NAME"] = st.secrets["DEPLOYMENT_NAME"]
         os.environ["OPENAI_API_VERSION"] = st.secrets["OPENAI_API_VERSION"]
         os.environ["MODEL_NAME"] = st.secrets["MODEL_NAME"]
+        # Imported on first use, so portals that never call the LLM do not load langchain
+        from langchain.llms.openai import AzureOpenAI
         return AzureOpenAI(temperature=temperature,
                            deployment_name=os.environ["DEPLOYMENT_NAME"],
                            model_name=os.environ["MODEL_NAME"])
@@ -0,0 +1,167 @@
+import atexit
+import queue
+import threading
+import time
+
+from repositories.DatabaseManager import DatabaseManager
+
+ACTIVITY_QUEUE_SIZE = 10000  # Events buffered before log_activity falls back to a direct write
+ACTIVITY_FLUSH_BATCH_SIZE = 100  # Events written per INSERT
+ACTIVITY_FLUSH_INTERVAL = 2.0  # Seconds an event may wait in the queue
+ACTIVITY_FLUSH_MAX_RETRIES = 3
+
+
+class ActivitySink:
+    """
+    Write-behind buffer for user_activities, shared by all sessions of the app.
+
+    Events are queued in memory and written by a background thread with its own
+    connection, in multi-row INSERTs of up to ACTIVITY_FLUSH_BATCH_SIZE events,
+    at least every ACTIVITY_FLUSH_INTERVAL seconds. The queue is drained when
+    the process exits.
+
+    Rows take their timestamp when they are written, so a reader that polls
+    for activities newer than its last visit never skips an event that was
+    still in the queue.
+    """
+
+    def __init__(self, connection_factory=DatabaseManager, queue_size=ACTIVITY_QUEUE_SIZE,
+                 batch_size=ACTIVITY_FLUSH_BATCH_SIZE, flush_interval=ACTIVITY_FLUSH_INTERVAL,
+                 max_retries=ACTIVITY_FLUSH_MAX_RETRIES):
+        self.connection_factory = connection_factory
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stopping = threading.Event()
+        self.database_manager = None
+        self.metrics = {
+            'events_queued': 0,
+            'events_written': 0,
+            'events_dropped': 0,
+            'flushes': 0,
+            'flush_failures': 0,
+            'last_flush_seconds': 0.0,
+            'max_flush_seconds': 0.0,
+            'total_flush_seconds': 0.0,
+        }
+
+    def log(self, user_id, session_id, activity_type, additional_params_json):
+        """
+        Queue an activity.
+
+        :return: False if the sink is stopped or its queue is full; the caller
+            should then write the activity itself.
+        """
+        if self.stopping.is_set():
+            return False
+        self.start()
+        try:
+            self.queue.put_nowait((user_id, session_id, activity_type, additional_params_json))
+        except queue.Full:
+            return False
+        with self.lock:
+            self.metrics['events_queued'] += 1
+        return True
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='ActivitySink', daemon=True)
+                self.thread.start()
+                atexit.register(self.close)
+
+    def run(self):
+        while not self.stopping.is_set():
+            batch = self.take_batch()
+            if batch:
+                self.flush(batch)
+        # Drain whatever was queued before close
+        while True:
+            batch = self.take_batch(block=False)
+            if not batch:
+                break
+            self.flush(batch)
+        self.close_connection()
+
+    def take_batch(self, block=True):
+        """Wait for the first event, then collect events until the batch is full or the interval has passed."""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if block and timeout > 0:
+                    batch.append(self.queue.get(timeout=timeout))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                if batch or not block or self.stopping.is_set():
+                    break
+                deadline = time.monotonic() + self.flush_interval
+        return batch
+
+    def flush(self, batch):
+        insert_activity_query = """
+            INSERT INTO user_activities (user_id, session_id, activity_type, additional_params)
+            VALUES (%s, %s, %s, %s);
+        """
+        for attempt in range(self.max_retries):
+            start = time.perf_counter()
+            try:
+                connection = self.get_connection()
+                with connection.cursor() as cursor:
+                    # pymysql sends this as a single multi-row INSERT
+                    cursor.executemany(insert_activity_query, batch)
+                connection.commit()
+            except Exception as e:
+                print(f"Error while writing {len(batch)} activities (attempt {attempt + 1}): {e}")
+                with self.lock:
+                    self.metrics['flush_failures'] += 1
+                self.close_connection()
+                continue
+
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.metrics['events_written'] += len(batch)
+                self.metrics['flushes'] += 1
+                self.metrics['last_flush_seconds'] = elapsed
+                self.metrics['max_flush_seconds'] = max(self.metrics['max_flush_seconds'], elapsed)
+                self.metrics['total_flush_seconds'] += elapsed
+            return True
+
+        with self.lock:
+            self.metrics['events_dropped'] += len(batch)
+        return False
+
+    def get_connection(self):
+        if self.database_manager is None:
+            self.database_manager = self.connection_factory()
+        return self.database_manager.connection
+
+    def close_connection(self):
+        if self.database_manager is not None:
+            self.database_manager.close()
+            self.database_manager = None
+
+    def close(self, timeout=30):
+        """Stop accepting events and wait for the queue to be written."""
+        self.stopping.set()
+        with self.lock:
+            thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def get_metrics(self):
+        """:return: Dictionary with the queue depth and the write counters and flush latencies."""
+        with self.lock:
+            metrics = dict(self.metrics)
+        metrics['queue_depth'] = self.queue.qsize()
+        metrics['avg_flush_seconds'] = \
+            metrics['total_flush_seconds'] / metrics['flushes'] if metrics['flushes'] else 0.0
+        return metrics
+
+
+shared_activity_sink = ActivitySink()
@@ -1,3 +1,12 @@
+import time
+
+import pymysql.cursors
+
+CLAIM_MAX_ATTEMPTS = 3  # Tries of a claim that lost a deadlock or timed out waiting for a row lock
+CLAIM_RETRY_DELAY = 0.05  # Seconds before the first retry of a claim, doubled on each further retry
+CLAIM_RETRYABLE_ERRORS = (1205, 1213)  # ER_LOCK_WAIT_TIMEOUT, ER_LOCK_DEADLOCK
+
+
 class AppInstanceRepository:
     def __init__(self, connection):
         self.connection = connection
@@ -9,7 +18,40 @@ class AppInstanceRepository:
         create_table_query = """CREATE TABLE IF NOT EXISTS `app_instances` (
                                     id INT AUTO_INCREMENT PRIMARY KEY,
                                     url VARCHAR(255) UNIQUE,
-                                    last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                                    last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                                    heartbeat_at TIMESTAMP NULL,
+                                    active_sessions INT DEFAULT 0,
+                                    p95_render_ms INT
+                                ); """
+        cursor.execute(create_table_query)
+        self.connection.commit()
+
+    def add_health_columns(self):
+        """Add the health columns to app_instances tables created before they existed."""
+        with self.connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT COUNT(*) FROM information_schema.columns
+                WHERE table_schema = DATABASE()
+                AND table_name = 'app_instances'
+                AND column_name = 'heartbeat_at';
+            """)
+            if cursor.fetchone()[0]:
+                return
+            cursor.execute("""
+                ALTER TABLE app_instances
+                ADD COLUMN heartbeat_at TIMESTAMP NULL,
+                ADD COLUMN active_sessions INT DEFAULT 0,
+                ADD COLUMN p95_render_ms INT;
+            """)
+            self.connection.commit()
+
+    def create_instance_pins_table(self):
+        cursor = self.connection.cursor()
+        create_table_query = """CREATE TABLE IF NOT EXISTS `app_instance_pins` (
+                                    client_id VARCHAR(64) PRIMARY KEY,
+                                    instance_id INT,
+                                    pinned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                                    FOREIGN KEY (instance_id) REFERENCES `app_instances`(id) ON DELETE CASCADE
                                 ); """
         cursor.execute(create_table_query)
         self.connection.commit()
@@ -38,21 +80,112 @@ class AppInstanceRepository:
 
         return True, message, instance_id
 
-    def get_earliest_instance(self):
+    def claim_instance(self, instance_ids=None, default_render_ms=500):
+        """
+        Atomically pick the least loaded of the given instances (all if None)
+        and count a new session on it. The pick and the update are one
+        UPDATE statement, so concurrent claims see each other's sessions. A
+        claim that loses a deadlock or a lock wait is retried.
+
+        :return: The claimed instance as a dictionary with id and url, or None.
+        """
         cursor = self.connection.cursor()
-        get_instance_query = """SELECT id, url FROM app_instances ORDER BY last_used ASC LIMIT 1;"""
-        cursor.execute(get_instance_query)
+        where_clause = ''
+        params = []
+        if instance_ids is not None:
+            if not instance_ids:
+                return None
+            where_clause = f"WHERE id IN ({', '.join(['%s'] * len(instance_ids))})"
+            params.extend(instance_ids)
+        params.append(default_render_ms)
+
+        # LAST_INSERT_ID(id) hands the updated row's id back to this connection
+        claim_query = f"""
+            UPDATE app_instances
+            SET last_used = CURRENT_TIMESTAMP,
+                active_sessions = COALESCE(active_sessions, 0) + 1,
+                id = LAST_INSERT_ID(id)
+            {where_clause}
+            ORDER BY (COALESCE(active_sessions, 0) + 1) * COALESCE(p95_render_ms, %s), last_used, id
+            LIMIT 1;
+        """
+        for attempt in range(CLAIM_MAX_ATTEMPTS):
+            try:
+                cursor.execute(claim_query, params)
+                if cursor.rowcount == 0:
+                    self.connection.commit()
+                    return None
+                cursor.execute("SELECT id, url FROM app_instances WHERE id = LAST_INSERT_ID();")
+                result = cursor.fetchone()
+                self.connection.commit()
+                return {'id': result[0], 'url': result[1]} if result else None
+            except pymysql.err.OperationalError as e:
+                self.connection.rollback()
+                if e.args and e.args[0] in CLAIM_RETRYABLE_ERRORS and attempt + 1 < CLAIM_MAX_ATTEMPTS:
+                    # Concurrent claims lock the same rows, the loser may simply try again
+                    time.sleep(CLAIM_RETRY_DELAY * 2 ** attempt)
+                    continue
+                print(f"Error while claiming an app instance: {e}")
+                return None
+            except Exception as e:
+                self.connection.rollback()
+                print(f"Error while claiming an app instance: {e}")
+                return None
+
+    def report_health(self, url, active_sessions, p95_render_ms):
+        """Record an instance's heartbeat and load, registering the instance if it is new."""
+        cursor = self.connection.cursor()
+        report_query = """
+            INSERT INTO app_instances (url, heartbeat_at, active_sessions, p95_render_ms)
+            VALUES (%s, CURRENT_TIMESTAMP, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                heartbeat_at = CURRENT_TIMESTAMP,
+                active_sessions = VALUES(active_sessions),
+                p95_render_ms = VALUES(p95_render_ms);
+        """
+        cursor.execute(report_query, (url, active_sessions, p95_render_ms))
+        self.connection.commit()
+
+    def register_instances(self, urls):
+        """
+        Add the instances that are not registered yet. Their heartbeat is only
+        ever recorded by the instances themselves, see report_health.
+        """
+        if not urls:
+            return
+        cursor = self.connection.cursor()
+        cursor.executemany("INSERT IGNORE INTO app_instances (url) VALUES (%s);", [(url,) for url in urls])
+        self.connection.commit()
+
+    def get_instances(self):
+        """
+        :return: All instances with their load and the seconds since their last
+            heartbeat (heartbeat_age, None if they never reported).
+        """
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        cursor.execute("""
+            SELECT id, url, last_used, active_sessions, p95_render_ms,
+                   TIMESTAMPDIFF(SECOND, heartbeat_at, CURRENT_TIMESTAMP) AS heartbeat_age
+            FROM app_instances;
+        """)
+        return list(cursor.fetchall())
+
+    def get_pinned_instance_id(self, client_id, max_age):
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            SELECT instance_id FROM app_instance_pins
+            WHERE client_id = %s AND pinned_at >= CURRENT_TIMESTAMP - INTERVAL %s SECOND;
+        """, (client_id, max_age))
         result = cursor.fetchone()
-        if result:
-            instance = {'id': result[0], 'url': result[1]}
-            return instance
-        else:
-            return None
+        return result[0] if result else None
 
-    def update_last_used(self, instance_id):
+    def pin_client(self, client_id, instance_id):
         cursor = self.connection.cursor()
-        update_query = """UPDATE app_instances SET last_used = CURRENT_TIMESTAMP WHERE id = %s;"""
-        cursor.execute(update_query, (instance_id,))
+        cursor.execute("""
+            INSERT INTO app_instance_pins (client_id, instance_id)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE instance_id = VALUES(instance_id), pinned_at = CURRENT_TIMESTAMP;
+        """, (client_id, instance_id))
         self.connection.commit()
 
     def create_seed_data(self):
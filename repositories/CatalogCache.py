@@ -0,0 +1,141 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+import pymysql.cursors
+
+from components.LocalFileCache import LocalFileCache
+from repositories.TrackSearchIndex import TrackSearchIndex
+
+VERSION_CHECK_INTERVAL = 30  # Seconds between checks of the catalog version against the DB
+CATALOG_SNAPSHOTS_KEPT = 3  # Most recently used catalog snapshots kept on disk, the older ones are removed
+
+
+class CatalogCache:
+    """
+    In-process copy of the track catalog (tracks, ragas, tags and track tags),
+    shared by every session of the app.
+
+    Writes through TrackRepository and RagaRepository invalidate it directly.
+    Changes made by other processes are picked up by comparing a cheap version
+    query against the DB at most every VERSION_CHECK_INTERVAL seconds.
+
+    With a snapshot directory, each loaded version is also pickled there, so
+    other worker processes on the host start from the snapshot instead of
+    running the catalog queries themselves. Only the CATALOG_SNAPSHOTS_KEPT
+    most recently used snapshots are kept.
+    """
+
+    def __init__(self, version_check_interval=VERSION_CHECK_INTERVAL, snapshot_dir=None):
+        self.version_check_interval = version_check_interval
+        self.snapshot_dir = snapshot_dir
+        self.lock = threading.Lock()
+        self.catalog = None
+        self.version = None
+        self.checked_at = 0
+
+    def get(self, connection):
+        """Return the catalog, loading it from the DB if it is missing or outdated."""
+        with self.lock:
+            now = time.monotonic()
+            if self.catalog is not None and now - self.checked_at < self.version_check_interval:
+                return self.catalog
+
+            version = self.get_version(connection)
+            if self.catalog is None or version != self.version:
+                catalog = self.load_snapshot(version)
+                if catalog is None:
+                    catalog = self.load(connection)
+                    self.save_snapshot(version, catalog)
+                self.catalog = catalog
+                self.version = version
+            self.checked_at = now
+            return self.catalog
+
+    def invalidate(self):
+        with self.lock:
+            self.catalog = None
+            self.version = None
+
+    def get_snapshot_path(self, version):
+        version_hash = hashlib.sha1(repr(version).encode('utf-8')).hexdigest()
+        return os.path.join(self.snapshot_dir, 'catalog', f"{version_hash}.pickle")
+
+    def load_snapshot(self, version):
+        if not self.snapshot_dir:
+            return None
+        snapshot_path = self.get_snapshot_path(version)
+        if not os.path.isfile(snapshot_path):
+            return None
+        try:
+            with open(snapshot_path, "rb") as f:
+                catalog = pickle.load(f)
+            # Mark the snapshot as recently used, so pruning keeps it
+            os.utime(snapshot_path)
+            return catalog
+        except Exception as e:
+            print(f"Error while reading the catalog snapshot {snapshot_path}: {e}")
+            return None
+
+    def save_snapshot(self, version, catalog):
+        if not self.snapshot_dir:
+            return
+        snapshot_path = self.get_snapshot_path(version)
+        try:
+            LocalFileCache.write_atomically(snapshot_path, pickle.dumps(catalog))
+            LocalFileCache.prune(os.path.dirname(snapshot_path), CATALOG_SNAPSHOTS_KEPT, suffix=".pickle")
+        except Exception as e:
+            print(f"Error while writing the catalog snapshot {snapshot_path}: {e}")
+
+    @staticmethod
+    def get_version(connection):
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT
+                    (SELECT CONCAT_WS(':', COUNT(*), MAX(id),
+                                      BIT_XOR(CRC32(CONCAT_WS('|', id, name, level, ragam_id, offset,
+                                                              recommendation_threshold_score, ordering_rank,
+                                                              requires_model_rebuild, description, track_group,
+                                                              track_hash, track_path, track_ref_path,
+                                                              model_path, notation_path))))
+                     FROM tracks),
+                    (SELECT CONCAT_WS(':', COUNT(*), BIT_XOR(CRC32(CONCAT_WS('|', track_id, tag_id))))
+                     FROM track_tags),
+                    (SELECT CONCAT_WS(':', COUNT(*), MAX(id)) FROM tags),
+                    (SELECT CONCAT_WS(':', COUNT(*), MAX(id)) FROM ragas);
+            """)
+            return cursor.fetchone()
+
+    @staticmethod
+    def load(connection):
+        with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute("SELECT * FROM tracks ORDER BY id")
+            tracks = cursor.fetchall()
+            cursor.execute("SELECT * FROM ragas ORDER BY id")
+            ragas = cursor.fetchall()
+            cursor.execute("SELECT DISTINCT tag_name FROM tags")
+            tags = [row['tag_name'] for row in cursor.fetchall()]
+            cursor.execute("""
+                SELECT track_tags.track_id, tags.tag_name
+                FROM track_tags
+                JOIN tags ON track_tags.tag_id = tags.id
+            """)
+            tags_by_track_id = {}
+            for row in cursor.fetchall():
+                tags_by_track_id.setdefault(row['track_id'], []).append(row['tag_name'])
+
+        return {
+            'tracks': tracks,
+            'ragas': ragas,
+            'tags': tags,
+            'levels': list(dict.fromkeys(track['level'] for track in tracks)),
+            'tags_by_track_id': tags_by_track_id,
+            'search_index': TrackSearchIndex(tracks, ragas, tags_by_track_id),
+        }
+
+
+# Catalog cache shared by all sessions in this process, and through
+# APP_CACHE_DIR by the other workers on the host
+shared_catalog_cache = CatalogCache(snapshot_dir=os.environ.get('APP_CACHE_DIR'))
@@ -46,7 +46,11 @@ class DatabaseManager:
 
     def close(self):
         if self.connection:
-            self.connection.close()
+            try:
+                self.connection.close()
+            except pymysql.err.Error as e:
+                # The connection was already closed, e.g. by the server
+                print(f"Failed to close database connection: {e}")
             self.connection = None
 
 
@@ -1,3 +1,5 @@
+import json
+
 import pymysql.cursors
 import pytz
 
@@ -5,8 +7,10 @@ import pytz
 class ModelPerformanceRepository:
     def __init__(self, connection):
         self.connection = connection
-        self.create_model_performance_table()
-        self.create_influential_recordings_table()
+        #self.create_model_performance_table()
+        #self.create_influential_recordings_table()
+        #self.add_tuning_trial_columns()
+        #self.create_model_hyperparameters_table()
 
     def create_model_performance_table(self):
         with self.connection.cursor() as cursor:
@@ -17,6 +21,10 @@ class ModelPerformanceRepository:
                     mse DECIMAL(10, 2),
                     mae DECIMAL(10, 2),
                     r2_score DECIMAL(10, 2),
+                    is_tuning_trial BOOLEAN DEFAULT FALSE,
+                    params JSON,
+                    fit_seconds DECIMAL(10, 2),
+                    inference_cost INT,
                     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
                 );
             """)
@@ -35,6 +43,41 @@ class ModelPerformanceRepository:
             """)
             self.connection.commit()
 
+    def add_tuning_trial_columns(self):
+        """Add the tuning trial columns to model_performance tables created before they existed."""
+        with self.connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT COUNT(*) FROM information_schema.columns
+                WHERE table_schema = DATABASE()
+                AND table_name = 'model_performance'
+                AND column_name = 'is_tuning_trial';
+            """)
+            if cursor.fetchone()[0]:
+                return
+            cursor.execute("""
+                ALTER TABLE model_performance
+                ADD COLUMN is_tuning_trial BOOLEAN DEFAULT FALSE,
+                ADD COLUMN params JSON,
+                ADD COLUMN fit_seconds DECIMAL(10, 2),
+                ADD COLUMN inference_cost INT;
+            """)
+            self.connection.commit()
+
+    def create_model_hyperparameters_table(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS model_hyperparameters (
+                    model_name VARCHAR(255) PRIMARY KEY,
+                    params JSON,
+                    objective DOUBLE,
+                    model_performance_id INT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    FOREIGN KEY (model_performance_id) REFERENCES model_performance(id)
+                    ON DELETE SET NULL
+                );
+            """)
+            self.connection.commit()
+
     def record_model_performance(self, model, metrics, ids):
         """
         Record the performance metrics of a model and associated influential IDs.
@@ -66,6 +109,56 @@ class ModelPerformanceRepository:
 
             return model_performance_id
 
+    def record_tuning_trial(self, model, metrics, params, fit_seconds, inference_cost):
+        """
+        Record the cross-validated metrics of one hyperparameter tuning trial.
+
+        :param model: The model name.
+        :param metrics: Dictionary containing model performance metrics.
+        :param params: Dictionary of the hyperparameters that were tried.
+        :param fit_seconds: Wall-clock seconds spent fitting across all folds.
+        :param inference_cost: Estimated per-row prediction cost of the model.
+        """
+        with self.connection.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO model_performance
+                (model_name, mse, mae, r2_score, is_tuning_trial, params, fit_seconds, inference_cost)
+                VALUES (%s, %s, %s, %s, TRUE, %s, %s, %s);
+            """, (model, metrics.get('mse'), metrics.get('mae'), metrics.get('r2'),
+                  json.dumps(params), fit_seconds, inference_cost))
+            self.connection.commit()
+            return cursor.lastrowid
+
+    def save_best_params(self, model_name, params, objective, model_performance_id=None):
+        """
+        Store the best known hyperparameters for a model, replacing any previous ones.
+        """
+        with self.connection.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO model_hyperparameters (model_name, params, objective, model_performance_id)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                params = VALUES(params),
+                objective = VALUES(objective),
+                model_performance_id = VALUES(model_performance_id);
+            """, (model_name, json.dumps(params), objective, model_performance_id))
+            self.connection.commit()
+
+    def get_best_params(self, model_name):
+        """
+        Retrieve the best known hyperparameters for a model.
+
+        :param model_name: The name of the model.
+        :return: Dictionary of hyperparameters, or None if the model was never tuned.
+        """
+        with self.connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT params FROM model_hyperparameters
+                WHERE model_name = %s;
+            """, (model_name,))
+            result = cursor.fetchone()
+            return json.loads(result[0]) if result else None
+
     def get_recent_influential_ids(self, model_name):
         """
         Retrieve the influential recording IDs for the most recent model run.
@@ -78,6 +171,7 @@ class ModelPerformanceRepository:
             cursor.execute("""
                 SELECT id FROM model_performance 
                 WHERE model_name = %s
+                AND is_tuning_trial = FALSE
                 ORDER BY timestamp DESC
                 LIMIT 1;
             """, (model_name,))
@@ -105,12 +199,14 @@ class ModelPerformanceRepository:
                 cursor.execute("""
                     SELECT * FROM model_performance 
                     WHERE model_name = %s
+                    AND is_tuning_trial = FALSE
                     ORDER BY timestamp DESC
                     LIMIT 10;
                 """, (model_name,))
             else:
                 cursor.execute("""
                     SELECT * FROM model_performance 
+                    WHERE is_tuning_trial = FALSE
                     ORDER BY timestamp DESC
                     LIMIT 10;
                 """)
@@ -1,13 +1,22 @@
+import base64
 import joblib
 import io
+import json
+import os
 from google.cloud import storage
 
+from components.LocalFileCache import LocalFileCache
+from models.CompactTreeEnsemble import CompactTreeEnsemble
 from repositories.StorageRepository import StorageRepository
 
+MODEL_CACHE_VERSIONS_KEPT = 2  # Cached versions of each model blob, the older ones are removed
+
 
 class ModelStorageRepository(StorageRepository):
-    def __init__(self, bucket_name):
+    def __init__(self, bucket_name, cache_dir=None):
         super().__init__(bucket_name)
+        # Workers on the same host share downloaded models through APP_CACHE_DIR
+        self.cache_dir = cache_dir if cache_dir is not None else os.environ.get('APP_CACHE_DIR')
 
     def save_model(self, model_name, model):
         """Save the model to Google Cloud Storage."""
@@ -22,10 +31,83 @@ class ModelStorageRepository(StorageRepository):
         """Load a model from Google Cloud Storage and return a tuple indicating success and the model object."""
         try:
             model_blob_name = f"{model_name}.joblib"
-            model_data = self.download_blob_by_name(model_blob_name)
+            model_data = self.download_cached_blob(model_blob_name)
             model_stream = io.BytesIO(model_data)
             model = joblib.load(model_stream)
             return model
         except Exception as e:
             print(f"Error loading model {model_name}: {e}")
             return None
+
+    def save_compact_model(self, model_name, compact_model: CompactTreeEnsemble):
+        """Save the flattened NumPy form of a tree model to Google Cloud Storage."""
+        compact_blob_name = f"{model_name}.npz"
+        self.upload_blob(compact_model.to_bytes(), compact_blob_name)
+        return self.get_public_url(compact_blob_name)
+
+    def load_compact_model(self, model_name):
+        """Load the flattened NumPy form of a tree model, or None if it was never exported."""
+        try:
+            compact_blob_name = f"{model_name}.npz"
+            return CompactTreeEnsemble.from_bytes(self.download_cached_blob(compact_blob_name))
+        except Exception as e:
+            print(f"Error loading compact model {model_name}: {e}")
+            return None
+
+    def get_compact_model_version(self, model_name):
+        """
+        :return: The MD5 of the stored compact model, which changes whenever the
+            model is retrained, or None if it was never exported or cannot be read.
+        """
+        try:
+            blob = self.get_bucket().get_blob(f"{model_name}.npz")
+            return blob.md5_hash if blob else None
+        except Exception as e:
+            print(f"Error reading the version of compact model {model_name}: {e}")
+            return None
+
+    def save_diagnostics(self, model_name, diagnostics):
+        """Save the evaluation diagnostics of a model next to the model itself."""
+        diagnostics_blob_name = f"{model_name}.diagnostics.json"
+        self.upload_blob(json.dumps(diagnostics).encode('utf-8'), diagnostics_blob_name)
+        return self.get_public_url(diagnostics_blob_name)
+
+    def load_diagnostics(self, model_name):
+        """Load the evaluation diagnostics of a model, or None if there are none."""
+        try:
+            diagnostics_blob_name = f"{model_name}.diagnostics.json"
+            return json.loads(self.download_blob_by_name(diagnostics_blob_name))
+        except Exception as e:
+            print(f"Error loading diagnostics for model {model_name}: {e}")
+            return None
+
+    def download_cached_blob(self, blob_name):
+        """
+        Download a model blob through the local cache directory. Cached files are
+        keyed by the blob's MD5, so a retrained model is fetched again while an
+        unchanged one only costs a metadata request. Only the
+        MODEL_CACHE_VERSIONS_KEPT most recently used versions of a blob are kept.
+        """
+        if not self.cache_dir:
+            return self.download_blob_by_name(blob_name)
+
+        blob = self.get_bucket().get_blob(blob_name)
+        if blob is None:
+            raise FileNotFoundError(f"Blob {blob_name} does not exist")
+        if not blob.md5_hash:
+            return blob.download_as_bytes()
+
+        checksum = base64.b64decode(blob.md5_hash).hex()
+        blob_dir = os.path.join(self.cache_dir, 'models', blob_name.replace('/', '_'))
+        local_path = os.path.join(blob_dir, checksum)
+        if os.path.isfile(local_path):
+            with open(local_path, "rb") as f:
+                data = f.read()
+            # Mark the version as recently used, so pruning keeps it
+            os.utime(local_path)
+            return data
+
+        data = blob.download_as_bytes()
+        LocalFileCache.write_atomically(local_path, data)
+        LocalFileCache.prune(blob_dir, MODEL_CACHE_VERSIONS_KEPT)
+        return data
@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import deque
+
+import pymysql.cursors
+
+NOTIFICATION_FEED_TTL = 5  # Seconds an organization's feed is served from memory before polling the DB
+NOTIFICATION_FEED_SIZE = 200  # Newest activities kept per organization, and fetched per poll
+NOTIFICATION_REORDER_WINDOW = 10  # Seconds an activity id may commit after a higher one and still be notified
+
+
+class NotificationFeed:
+    """
+    Recent notifiable activities (everything but log in and log out) of each
+    organization, shared by all sessions of the app.
+
+    Readers pass the cursor of their last read and get the newer activities. A
+    poll runs at most once every NOTIFICATION_FEED_TTL seconds per organization.
+
+    Activity ids do not commit in order, since the activity sinks of several
+    processes and direct writes insert concurrently. So a poll re-reads the ids
+    after the newest one that was already cached NOTIFICATION_REORDER_WINDOW
+    seconds ago, and merges them by activity id. A cursor is the id up to which
+    the reader has seen everything, plus the ids above it that it has seen.
+    """
+
+    def __init__(self, ttl=NOTIFICATION_FEED_TTL, size=NOTIFICATION_FEED_SIZE,
+                 reorder_window=NOTIFICATION_REORDER_WINDOW):
+        self.ttl = ttl
+        self.size = size
+        self.reorder_window = reorder_window
+        self.lock = threading.Lock()
+        self.feeds = {}
+
+    def get(self, connection, org_id, cursor):
+        """
+        :param cursor: Cursor returned by the previous call, or the id of the
+            last activity the reader has seen.
+        :return: Tuple of the activities the reader has not seen, newest first
+            and at most NOTIFICATION_FEED_SIZE, and the new cursor.
+        """
+        after_id, seen_ids = cursor if isinstance(cursor, tuple) else (cursor, ())
+        with self.lock:
+            now = time.monotonic()
+            feed = self.feeds.get(org_id)
+            if feed is None or after_id < feed['covered_from']:
+                # Nothing cached this far back, read the newest rows after the cursor
+                feed = {'rows': [], 'covered_from': after_id, 'max_ids': deque([(now, after_id)]),
+                        'fetched_at': None}
+                self.feeds[org_id] = feed
+
+            if feed['fetched_at'] is None or now - feed['fetched_at'] >= self.ttl:
+                rows = self.fetch_activities(connection, org_id, self.get_settled_id(feed, now), self.size)
+                cached_ids = {row['activity_id'] for row in feed['rows']}
+                rows = [row for row in rows if row['activity_id'] not in cached_ids] + feed['rows']
+                feed['rows'] = sorted(rows, key=lambda row: row['activity_id'], reverse=True)[:self.size]
+                max_id = feed['rows'][0]['activity_id'] if feed['rows'] else after_id
+                feed['max_ids'].append((now, max(max_id, feed['max_ids'][-1][1])))
+                feed['fetched_at'] = now
+
+            activities = [row for row in feed['rows']
+                          if row['activity_id'] > after_id and row['activity_id'] not in seen_ids]
+            settled_id = max(after_id, self.get_settled_id(feed, now))
+            seen_ids = set(seen_ids).union(row['activity_id'] for row in activities)
+            return activities, (settled_id, tuple(sorted(i for i in seen_ids if i > settled_id)))
+
+    def get_settled_id(self, feed, now):
+        """
+        :return: The newest id that was already cached a reorder window ago. Ids
+            up to it are taken to have committed.
+        """
+        max_ids = feed['max_ids']
+        while len(max_ids) > 1 and now - max_ids[1][0] >= self.reorder_window:
+            max_ids.popleft()
+        return max_ids[0][1]
+
+    def invalidate(self, org_id=None):
+        with self.lock:
+            if org_id is None:
+                self.feeds.clear()
+            else:
+                self.feeds.pop(org_id, None)
+
+    @staticmethod
+    def fetch_activities(connection, org_id, after_id, limit):
+        # A range scan of the primary key, joined to users by theirs
+        with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute("""
+                SELECT
+                    act.activity_id,
+                    act.activity_type,
+                    act.timestamp,
+                    act.additional_params AS metadata,
+                    usr.id AS user_id,
+                    usr.name AS user_name,
+                    usr.user_type,
+                    usr.group_id
+                FROM user_activities act
+                JOIN users usr ON act.user_id = usr.id
+                WHERE act.activity_id > %s
+                    AND usr.org_id = %s
+                    AND usr.user_type IN ('teacher', 'student')
+                    AND act.activity_type NOT IN ('Log In', 'Log Out')
+                ORDER BY act.activity_id DESC
+                LIMIT %s;
+            """, (after_id, org_id, limit))
+            return list(cursor.fetchall())
+
+    @staticmethod
+    def get_cursor(connection, last_activity_time):
+        """
+        :return: Id of the last activity at or before the given time, the starting
+            cursor of a session that has seen everything up to then.
+        """
+        with connection.cursor() as cursor:
+            if last_activity_time is None:
+                cursor.execute("SELECT COALESCE(MAX(activity_id), 0) FROM user_activities;")
+            else:
+                # Walks the timestamp index backwards from the given time and stops at the first row
+                cursor.execute("""
+                    SELECT activity_id FROM user_activities
+                    WHERE timestamp <= %s
+                    ORDER BY timestamp DESC, activity_id DESC
+                    LIMIT 1;
+                """, (last_activity_time,))
+            result = cursor.fetchone()
+            return result[0] if result else 0
+
+
+shared_notification_feed = NotificationFeed()
@@ -1,15 +1,21 @@
 import datetime
+import json
 
 import pymysql.cursors
 import pytz
 
 from enums.Badges import UserBadges
 from enums.TimeFrame import TimeFrame
+from repositories.NotificationFeed import NotificationFeed, shared_notification_feed
+
+TEACHER_NOTIFICATIONS_LIMIT = 20
+STUDENT_NOTIFICATIONS_LIMIT = 5
 
 
 class PortalRepository:
-    def __init__(self, connection):
+    def __init__(self, connection, notification_feed: NotificationFeed = shared_notification_feed):
         self.connection = connection
+        self.notification_feed = notification_feed
 
     def list_tutor_assignments(self, tenant_id):
         cursor = self.connection.cursor()
@@ -173,107 +179,80 @@ class PortalRepository:
         return [{'track_id': row['track_id'], 'badges': row['badges'].split(',')} for row in result]
 
     def fetch_team_dashboard_data(self, group_id, time_frame: TimeFrame):
-        cursor = self.connection.cursor()
+        return self.fetch_team_dashboard_data_by_groups([group_id], time_frame)
 
-        start_date, end_date = time_frame.get_date_range()
-
-        # Query to fetch recordings data
-        recordings_query = """
-        SELECT u.id AS user_id,
-               u.name AS teammate,
-               a.name AS avatar,
-               COALESCE(COUNT(DISTINCT r.track_id), 0) AS unique_tracks,
-               COALESCE(COUNT(r.id), 0) AS recordings,
-               COALESCE(ROUND(SUM(r.duration) / 60, 2), 0) AS recording_minutes,
-               COALESCE(SUM(r.score), 0) AS score
-        FROM users u
-        LEFT JOIN avatars a ON u.avatar_id = a.id
-        LEFT JOIN recordings r ON u.id = r.user_id AND (r.timestamp BETWEEN %s AND %s)
-        WHERE u.group_id = %s AND u.user_type = 'student'
-        GROUP BY u.id
+    def fetch_team_dashboard_data_by_groups(self, group_ids, time_frame: TimeFrame):
         """
+        Fetch the team dashboard stats and badges of every student in the given
+        groups with a single query over the daily rollups (see UserDailyStatsRepository).
+        Badges and their count both come from user_achievements.
 
-        # Query to fetch practice log data
-        practice_logs_query = """
-        SELECT u.id AS user_id, COALESCE(SUM(p.minutes), 0) AS practice_minutes
-        FROM users u
-        LEFT JOIN user_practice_logs p ON u.id = p.user_id AND (p.timestamp BETWEEN %s AND %s)
-        WHERE u.group_id = %s AND u.user_type = 'student'
-        GROUP BY u.id
+        :param group_ids: IDs of the groups to fetch.
+        :param time_frame: Time frame the recordings, practice logs and badges must fall in.
+        :return: List of dictionaries, one per student, ordered by group and student.
         """
-
-        # Query to fetch each user's maximum daily practice log minutes
-        max_practice_log_query = """
-            SELECT u.id AS user_id, MAX(daily_minutes) AS max_daily_practice_minutes
+        if not group_ids:
+            return []
+
+        # Half-open bounds, so the first day of the next period is not counted in both
+        start_date, end_date = time_frame.get_date_bounds()
+        group_placeholders = ', '.join(['%s'] * len(group_ids))
+        period_params = (*group_ids, start_date, end_date)
+
+        # Totals are summed from the daily rollups, one row per student and day
+        query = f"""
+            SELECT u.id AS user_id,
+                   u.name AS teammate,
+                   u.group_id,
+                   g.name AS group_name,
+                   a.name AS avatar,
+                   COALESCE(tracks.unique_tracks, 0) AS unique_tracks,
+                   COALESCE(stats.recordings, 0) AS recordings,
+                   COALESCE(stats.recording_minutes, 0) AS recording_minutes,
+                   COALESCE(stats.score, 0) AS score,
+                   COALESCE(stats.practice_minutes, 0) AS practice_minutes,
+                   COALESCE(stats.max_daily_practice_minutes, 0) AS max_daily_practice_minutes,
+                   COALESCE(ach.badges_earned, 0) AS badges_earned,
+                   ach.badges
             FROM users u
+            LEFT JOIN user_groups g ON u.group_id = g.id
+            LEFT JOIN avatars a ON u.avatar_id = a.id
             LEFT JOIN (
-                SELECT user_id, DATE(timestamp) AS log_date, SUM(minutes) AS daily_minutes
-                FROM user_practice_logs
-                WHERE (timestamp BETWEEN %s AND %s)
-                GROUP BY user_id, log_date
-            ) p ON u.id = p.user_id
-            WHERE u.group_id = %s AND u.user_type = 'student'
-            GROUP BY u.id
-            """
-
-        # Execute the query
-        cursor.execute(max_practice_log_query, (start_date, end_date, group_id))
-        max_practice_log_results = cursor.fetchall()
-
-        # Query to fetch achievements data
-        achievements_query = """
-        SELECT u.id AS user_id, COALESCE(COUNT(ua.id), 0) AS badges_earned
-        FROM users u
-        LEFT JOIN user_achievements ua ON u.id = ua.user_id AND (ua.timestamp BETWEEN %s AND %s)
-        WHERE u.group_id = %s AND u.user_type = 'student'
-        GROUP BY u.id
+                SELECT ds.user_id,
+                       SUM(ds.recordings) AS recordings,
+                       ROUND(SUM(ds.recording_seconds) / 60, 2) AS recording_minutes,
+                       SUM(ds.score) AS score,
+                       SUM(ds.practice_minutes) AS practice_minutes,
+                       MAX(ds.practice_minutes) AS max_daily_practice_minutes
+                FROM user_daily_stats ds
+                JOIN users su ON ds.user_id = su.id
+                WHERE su.group_id IN ({group_placeholders}) AND ds.activity_date >= %s AND ds.activity_date < %s
+                GROUP BY ds.user_id
+            ) stats ON u.id = stats.user_id
+            LEFT JOIN (
+                SELECT dt.user_id, COUNT(DISTINCT dt.track_id) AS unique_tracks
+                FROM user_daily_tracks dt
+                JOIN users tu ON dt.user_id = tu.id
+                WHERE tu.group_id IN ({group_placeholders}) AND dt.activity_date >= %s AND dt.activity_date < %s
+                GROUP BY dt.user_id
+            ) tracks ON u.id = tracks.user_id
+            LEFT JOIN (
+                SELECT ua.user_id, COUNT(*) AS badges_earned, JSON_ARRAYAGG(ua.badge) AS badges
+                FROM user_achievements ua
+                JOIN users au ON ua.user_id = au.id
+                WHERE au.group_id IN ({group_placeholders}) AND ua.timestamp >= %s AND ua.timestamp < %s
+                GROUP BY ua.user_id
+            ) ach ON u.id = ach.user_id
+            WHERE u.group_id IN ({group_placeholders}) AND u.user_type = 'student'
+            ORDER BY u.group_id, u.id
         """
 
-        # Execute recordings query
-        cursor.execute(recordings_query, (start_date, end_date, group_id))
-        recordings_results = cursor.fetchall()
-
-        # Execute practice logs query
-        cursor.execute(practice_logs_query, (start_date, end_date, group_id))
-        practice_logs_results = cursor.fetchall()
-
-        # Execute achievements query
-        cursor.execute(achievements_query, (start_date, end_date, group_id))
-        achievements_results = cursor.fetchall()
-
-        # Create a dictionary to store aggregated results by user_id
-        aggregated_data = {}
-
-        # Aggregate recordings data
-        for row in recordings_results:
-            user_id = row[0]
-            if user_id not in aggregated_data:
-                aggregated_data[user_id] = {'user_id': user_id, 'teammate': row[1]}
-            aggregated_data[user_id]['avatar'] = row[2]
-            aggregated_data[user_id]['unique_tracks'] = row[3]
-            aggregated_data[user_id]['recordings'] = row[4]
-            aggregated_data[user_id]['recording_minutes'] = row[5]
-            aggregated_data[user_id]['score'] = row[6]
-
-        # Aggregate practice logs data
-        for row in practice_logs_results:
-            user_id = row[0]
-            aggregated_data[user_id]['practice_minutes'] = row[1]
-
-        # Process the results to get each user's max daily practice minutes
-        for row in max_practice_log_results:
-            user_id = row[0]
-            aggregated_data[user_id]['max_daily_practice_minutes'] = \
-                row[1] if row[1] is not None else 0
-
-        # Aggregate achievements data
-        for row in achievements_results:
-            user_id = row[0]
-            aggregated_data[user_id]['badges_earned'] = row[1]
-
-        # Convert aggregated data to a list of dictionaries
-        dashboard_data = list(aggregated_data.values())
+        with self.connection.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute(query, (*period_params, *period_params, *period_params, *group_ids))
+            dashboard_data = cursor.fetchall()
 
+        for data in dashboard_data:
+            data['badges'] = json.loads(data['badges']) if data['badges'] else []
         return dashboard_data
 
     def get_winners(self, group_id, time_frame: TimeFrame):
@@ -385,67 +364,31 @@ class PortalRepository:
             max_values[badge]['students'].append(
                 {'student_id': student_id, 'student_name': student_name})
 
-    def get_notifications(self, user_id, group_id, org_id, last_activity_time):
-        with self.connection.cursor(pymysql.cursors.DictCursor) as cursor:
-            # Query for notifications from the teacher
-            teacher_query = """
-            SELECT 
-                act.activity_type, 
-                act.timestamp, 
-                act.additional_params as metadata, 
-                usr.name AS user_name
-            FROM user_activities act
-            JOIN users usr ON act.user_id = usr.id
-            WHERE act.timestamp > %s
-                AND act.activity_type NOT IN ('Log In', 'Log Out') 
-                AND usr.user_type = 'teacher'               
-                AND usr.org_id = %s
-                AND usr.id != %s
-            ORDER BY act.timestamp DESC;
-            """
+    def get_notifications(self, user_id, group_id, org_id, cursor):
+        """
+        Notifications from the teachers of the organization and from the
+        students of the group (of the organization if there is no group),
+        that the session has not seen since the given cursor, see NotificationFeed.
 
-            # Execute the teacher query
-            cursor.execute(teacher_query, (last_activity_time, org_id, user_id))
-            teacher_notifications = list(cursor.fetchall())
-
-            # Conditional logic for student notifications based on group_id
-            student_query_base = """
-            SELECT 
-                act.activity_type, 
-                act.timestamp, 
-                act.additional_params as metadata, 
-                usr.name AS user_name
-            FROM user_activities act
-            JOIN users usr ON act.user_id = usr.id
-            WHERE act.timestamp > %s 
-                AND act.activity_type NOT IN ('Log In', 'Log Out') 
-                AND usr.user_type = 'student'
-                AND usr.id != %s
-            """
-            # If group_id is provided, use it in the WHERE clause
-            if group_id is not None:
-                student_query = student_query_base + """
-                    AND usr.group_id = %s 
-                    ORDER BY act.timestamp DESC
-                    LIMIT 5;
-                """
-                student_query_params = (last_activity_time, user_id, group_id)
-            # If group_id is None, fall back to org_id
-            else:
-                student_query = student_query_base + """
-                    AND usr.org_id = %s 
-                    ORDER BY act.timestamp DESC
-                    LIMIT 5;
-                """
-                student_query_params = (last_activity_time, user_id, org_id)
-
-            # Execute the student query
-            cursor.execute(student_query, student_query_params)
-            student_notifications = list(cursor.fetchall())
-
-            # Combine the results, with teacher notifications on top
-            combined_notifications = teacher_notifications + student_notifications
-
-            return combined_notifications
+        :return: Tuple of the notifications, teacher ones on top, and the new cursor.
+        """
+        activities, cursor = self.notification_feed.get(self.connection, org_id, cursor)
+
+        teacher_notifications = []
+        student_notifications = []
+        for activity in activities:
+            if activity['user_id'] == user_id:
+                continue
+            if activity['user_type'] == 'teacher':
+                if len(teacher_notifications) < TEACHER_NOTIFICATIONS_LIMIT:
+                    teacher_notifications.append(activity)
+            elif group_id is None or activity['group_id'] == group_id:
+                if len(student_notifications) < STUDENT_NOTIFICATIONS_LIMIT:
+                    student_notifications.append(activity)
+
+        return teacher_notifications + student_notifications, cursor
+
+    def get_notification_cursor(self, last_activity_time):
+        return self.notification_feed.get_cursor(self.connection, last_activity_time)
 
 
@@ -1,12 +1,15 @@
 import pymysql
 import pymysql.cursors
 
+from repositories.CatalogCache import shared_catalog_cache
+
 
 class RagaRepository:
-    def __init__(self, connection):
+    def __init__(self, connection, catalog_cache=shared_catalog_cache):
         self.connection = connection
+        self.catalog_cache = catalog_cache
         #self.create_tables()
-        self.create_seed_data()
+        #self.create_seed_data()
 
     def create_tables(self):
         cursor = self.connection.cursor()
@@ -50,6 +53,8 @@ class RagaRepository:
             """, (name, is_melakarta, parent_raga, aarohanam, avarohanam))
 
         self.connection.commit()
+        if not exists:
+            self.catalog_cache.invalidate()
 
     def get_raga_by_name(self, name):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
@@ -57,9 +62,7 @@ class RagaRepository:
         return cursor.fetchone()
 
     def get_all_ragas(self):
-        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
-        cursor.execute("SELECT * FROM ragas")
-        return cursor.fetchall()
+        return [dict(raga) for raga in self.catalog_cache.get(self.connection)['ragas']]
 
     def get_notes(self, raga_id):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
@@ -3,11 +3,16 @@ import datetime
 import pymysql.cursors
 from components.TimeConverter import TimeConverter
 from enums.TimeFrame import TimeFrame
+from repositories.UserDailyStatsRepository import UserDailyStatsRepository
+
+USER_TOP_SCORES = 3  # Scores averaged per user and track
+TRACK_TOP_SCORES = 10  # Scores averaged per track across all users
 
 
 class RecordingRepository:
     def __init__(self, connection):
         self.connection = connection
+        self.user_daily_stats_repo = UserDailyStatsRepository(connection)
         #self.create_recordings_table()
         #self.create_user_track_table()
 
@@ -43,6 +48,7 @@ class RecordingRepository:
             user_id INT,
             track_id INT,
             first_recommended_on DATETIME,
+            UNIQUE KEY user_track_unique (user_id, track_id),
             FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
             FOREIGN KEY (track_id) REFERENCES tracks(id) ON DELETE CASCADE
         );
@@ -50,6 +56,82 @@ class RecordingRepository:
         cursor.execute(create_table_query)
         self.connection.commit()
 
+    def add_user_track_unique_key(self):
+        """
+        Add the unique key on (user_id, track_id) to user_track tables created before
+        it existed, first removing duplicate recommendations and keeping the earliest.
+        """
+        with self.connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT COUNT(*) FROM information_schema.statistics
+                WHERE table_schema = DATABASE()
+                AND table_name = 'user_track'
+                AND index_name = 'user_track_unique';
+            """)
+            if cursor.fetchone()[0]:
+                return
+            cursor.execute("""
+                DELETE later
+                FROM user_track later
+                JOIN user_track earlier
+                    ON later.user_id = earlier.user_id
+                    AND later.track_id = earlier.track_id
+                    AND later.id > earlier.id;
+            """)
+            cursor.execute("ALTER TABLE user_track ADD UNIQUE KEY user_track_unique (user_id, track_id);")
+            self.connection.commit()
+
+    def create_user_track_stats_table(self):
+        cursor = self.connection.cursor()
+        create_table_query = """
+        CREATE TABLE IF NOT EXISTS user_track_stats (
+            user_id INT,
+            track_id INT,
+            num_recordings INT,
+            max_score DECIMAL(4, 2),
+            min_score DECIMAL(4, 2),
+            avg_score DECIMAL(8, 6),  -- Average of the user's top 3 scores
+            first_recording_date DATETIME,
+            last_recording_date DATETIME,
+            PRIMARY KEY (user_id, track_id),
+            INDEX (track_id),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (track_id) REFERENCES tracks(id) ON DELETE CASCADE
+        );
+        """
+        cursor.execute(create_table_query)
+        self.connection.commit()
+
+    def create_track_stats_table(self):
+        cursor = self.connection.cursor()
+        create_table_query = """
+        CREATE TABLE IF NOT EXISTS track_stats (
+            track_id INT PRIMARY KEY,
+            avg_score DECIMAL(8, 6),  -- Average of the track's top 10 scores across all users
+            FOREIGN KEY (track_id) REFERENCES tracks(id) ON DELETE CASCADE
+        );
+        """
+        cursor.execute(create_table_query)
+        self.connection.commit()
+
+    def backfill_user_track_stats(self):
+        """Fill user_track_stats on databases that had recordings before the table existed."""
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM user_track_stats);")
+            if cursor.fetchone()[0]:
+                return
+            cursor.execute(self.get_user_track_stats_query())
+            self.connection.commit()
+
+    def backfill_track_stats(self):
+        """Fill track_stats on databases that had recordings before the table existed."""
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM track_stats);")
+            if cursor.fetchone()[0]:
+                return
+            cursor.execute(self.get_track_stats_query())
+            self.connection.commit()
+
     def get_recording(self, recording_id):
         with self.connection.cursor(pymysql.cursors.DictCursor) as cursor:
             query = """
@@ -71,8 +153,11 @@ class RecordingRepository:
         cursor.execute(add_recording_query,
                        (user_id, track_id, blob_name, blob_url, timestamp, duration, file_hash, analysis, remarks,
                         assignment_id))
+        recording_id = cursor.lastrowid
+        self.refresh_user_track_stats(cursor, user_id, track_id)
+        self.user_daily_stats_repo.refresh_user_daily_stats(cursor, user_id, timestamp)
         self.connection.commit()
-        return cursor.lastrowid
+        return recording_id
 
     def is_duplicate_recording(self, user_id, track_id, file_hash):
         cursor = self.connection.cursor()
@@ -161,17 +246,16 @@ class RecordingRepository:
     def get_track_statistics_by_user(self, user_id):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
         query = """
-        SELECT r.track_id, t.name as name, t.level as level,
+        SELECT s.track_id, t.name as name, t.level as level,
                t.recommendation_threshold_score, 
-               COALESCE(COUNT(*), 0) AS num_recordings, 
-               COALESCE(MAX(r.score), 0) AS max_score, 
-               COALESCE(MIN(r.score), 0) AS min_score,
-               MIN(r.timestamp) AS earliest_recording_date,
-               MAX(r.timestamp) AS latest_recording_date
-        FROM recordings r
-        LEFT JOIN tracks t ON r.track_id = t.id
-        WHERE r.user_id = %s and r.score < 10.00
-        GROUP BY r.track_id, t.name, t.recommendation_threshold_score
+               s.num_recordings, 
+               s.max_score, 
+               s.min_score,
+               s.first_recording_date AS earliest_recording_date,
+               s.last_recording_date AS latest_recording_date
+        FROM user_track_stats s
+        LEFT JOIN tracks t ON s.track_id = t.id
+        WHERE s.user_id = %s
         ORDER BY t.level, t.ordering_rank;
         """
         cursor.execute(query, (user_id,))
@@ -181,30 +265,56 @@ class RecordingRepository:
     def get_average_track_scores_by_user(self, user_id):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
         query = """
-        SELECT track_id, AVG(score) AS avg_score
-        FROM (
-            SELECT track_id, score,
-                   ROW_NUMBER() OVER (PARTITION BY track_id ORDER BY score DESC) as score_rank
-            FROM recordings
-            WHERE user_id = %s AND score < 10.00
-        ) AS ranked_scores
-        WHERE score_rank <= 3
-        GROUP BY track_id;
+        SELECT track_id, avg_score
+        FROM user_track_stats
+        WHERE user_id = %s;
         """
         cursor.execute(query, (user_id,))
         results = cursor.fetchall()
         return results
 
+    def get_track_statistics_by_users(self, user_ids):
+        """
+        Same statistics as get_track_statistics_by_user, for several users in one query.
+        """
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        query = f"""
+        SELECT user_id, track_id, num_recordings, max_score, min_score,
+               first_recording_date AS earliest_recording_date,
+               last_recording_date AS latest_recording_date
+        FROM user_track_stats
+        WHERE user_id IN ({placeholders});
+        """
+        cursor.execute(query, tuple(user_ids))
+        results = cursor.fetchall()
+        return results
+
+    def get_average_track_scores_by_users(self, user_ids):
+        """
+        Same top-3 average scores as get_average_track_scores_by_user, for several users in one query.
+        """
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        query = f"""
+        SELECT user_id, track_id, avg_score
+        FROM user_track_stats
+        WHERE user_id IN ({placeholders});
+        """
+        cursor.execute(query, tuple(user_ids))
+        results = cursor.fetchall()
+        return results
+
     def get_all_track_statistics(self):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
         query = """
         SELECT t.id AS track_id, t.name AS name, t.level AS level, 
                t.recommendation_threshold_score, t.ordering_rank,
-               COALESCE(COUNT(r.id), 0) AS num_recordings, 
-               COALESCE(MAX(r.score), 0) AS max_score, 
-               COALESCE(MIN(r.score), 0) AS min_score
+               COALESCE(SUM(s.num_recordings), 0) AS num_recordings, 
+               COALESCE(MAX(s.max_score), 0) AS max_score, 
+               COALESCE(MIN(s.min_score), 0) AS min_score
         FROM tracks t
-        LEFT JOIN recordings r ON t.id = r.track_id AND r.score < 10.00
+        LEFT JOIN user_track_stats s ON t.id = s.track_id
         GROUP BY t.id, t.name, t.level, t.recommendation_threshold_score, t.ordering_rank
         ORDER BY t.level, t.ordering_rank;
         """
@@ -213,23 +323,73 @@ class RecordingRepository:
         return results
 
     def get_average_track_scores(self):
+        """Average of the top 10 scores of each track across all users, from the track_stats rollup."""
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
-        query = """
-        SELECT track_id, 
-               AVG(score) AS avg_score
+        cursor.execute("SELECT track_id, avg_score FROM track_stats WHERE avg_score IS NOT NULL;")
+        return list(cursor.fetchall())
+
+    def refresh_user_track_stats(self, cursor, user_id, track_id):
+        """
+        Recompute the user_track_stats row of one user and track, and the
+        track_stats row of the track, from their recordings. Runs on the caller's
+        cursor so it commits with the write that triggered it.
+        """
+        cursor.execute("DELETE FROM user_track_stats WHERE user_id = %s AND track_id = %s;", (user_id, track_id))
+        cursor.execute(self.get_user_track_stats_query("AND user_id = %s AND track_id = %s"), (user_id, track_id))
+        cursor.execute("DELETE FROM track_stats WHERE track_id = %s;", (track_id,))
+        cursor.execute(self.get_track_stats_query("AND track_id = %s"), (track_id,))
+
+    def refresh_user_track_stats_for_recording(self, cursor, recording_id):
+        """Refresh the user_track_stats and daily stats rollups a recording counts towards."""
+        cursor.execute("SELECT user_id, track_id, timestamp FROM recordings WHERE id = %s;", (recording_id,))
+        result = cursor.fetchone()
+        if result:
+            self.refresh_user_track_stats(cursor, result[0], result[1])
+            self.user_daily_stats_repo.refresh_user_daily_stats(cursor, result[0], result[2])
+
+    def rebuild_user_track_stats(self):
+        """Rebuild the whole user_track_stats and track_stats tables from the recordings table."""
+        cursor = self.connection.cursor()
+        cursor.execute("DELETE FROM user_track_stats;")
+        cursor.execute(self.get_user_track_stats_query())
+        rows = cursor.rowcount
+        cursor.execute("DELETE FROM track_stats;")
+        cursor.execute(self.get_track_stats_query())
+        self.connection.commit()
+        return rows
+
+    @staticmethod
+    def get_user_track_stats_query(condition=""):
+        # Recordings scored 10 or more, or not scored yet, are left out as in the raw queries
+        return f"""
+        INSERT INTO user_track_stats (user_id, track_id, num_recordings, max_score, min_score, avg_score,
+                                      first_recording_date, last_recording_date)
+        SELECT user_id, track_id, COUNT(*), MAX(score), MIN(score),
+               AVG(CASE WHEN score_rank <= {USER_TOP_SCORES} THEN score END),
+               MIN(timestamp), MAX(timestamp)
         FROM (
-            SELECT track_id, 
-                   score,
-                   ROW_NUMBER() OVER (PARTITION BY track_id ORDER BY score DESC) as score_rank
+            SELECT user_id, track_id, score, timestamp,
+                   ROW_NUMBER() OVER (PARTITION BY user_id, track_id ORDER BY score DESC) AS score_rank
             FROM recordings
-            WHERE score < 10.00
+            WHERE score < 10.00 AND user_id IS NOT NULL AND track_id IS NOT NULL {condition}
         ) AS ranked_scores
-        WHERE score_rank <= 10
+        GROUP BY user_id, track_id;
+        """
+
+    @staticmethod
+    def get_track_stats_query(condition=""):
+        return f"""
+        INSERT INTO track_stats (track_id, avg_score)
+        SELECT track_id, AVG(score)
+        FROM (
+            SELECT track_id, score,
+                   ROW_NUMBER() OVER (PARTITION BY track_id ORDER BY score DESC) AS score_rank
+            FROM recordings
+            WHERE score < 10.00 AND user_id IS NOT NULL AND track_id IS NOT NULL {condition}
+        ) AS ranked_scores
+        WHERE score_rank <= {TRACK_TOP_SCORES}
         GROUP BY track_id;
         """
-        cursor.execute(query)
-        results = cursor.fetchall()
-        return results
 
     def get_unique_tracks_by_user(self, user_id):
         cursor = self.connection.cursor()
@@ -252,6 +412,7 @@ class RecordingRepository:
         # Execute the query with the provided data
         try:
             cursor.execute(update_query, (score, remarks, use_for_training, recording_id))
+            self.refresh_user_track_stats_for_recording(cursor, recording_id)
             self.connection.commit()
             return True
         except Exception as e:
@@ -270,12 +431,14 @@ class RecordingRepository:
         update_query = """UPDATE recordings SET score = %s, distance = %s, analysis = %s 
                           WHERE id = %s;"""
         cursor.execute(update_query, (score, distance, analysis, recording_id))
+        self.refresh_user_track_stats_for_recording(cursor, recording_id)
         self.connection.commit()
 
     def update_score(self, recording_id, score):
         cursor = self.connection.cursor()
         update_query = """UPDATE recordings SET score = %s WHERE id = %s;"""
         cursor.execute(update_query, (score, recording_id))
+        self.refresh_user_track_stats_for_recording(cursor, recording_id)
         self.connection.commit()
 
     def get_total_duration_by_track(self, user_id, track_id):
@@ -361,6 +524,27 @@ class RecordingRepository:
         results = cursor.fetchall()
         return list(results) if results else []
 
+    def get_submissions_by_users_and_timeframe(self, user_ids, time_frame: TimeFrame = TimeFrame.PREVIOUS_WEEK):
+        """Same as get_submissions_by_timeframe for several users at once, with a user_id column."""
+        if not user_ids:
+            return []
+
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        query = f"""
+        SELECT r.user_id, r.timestamp, t.name AS track_name, r.blob_url AS recording_audio_url,
+               t.track_path AS track_audio_url, r.duration,
+               r.remarks AS teacher_remarks, r.score, t.id as track_id, r.id as recording_id
+        FROM recordings r
+        JOIN tracks t ON r.track_id = t.id
+        WHERE r.user_id IN ({placeholders}) AND r.timestamp between %s and %s
+        ORDER BY r.user_id, r.timestamp DESC
+        """
+        start_date, end_date = time_frame.get_date_range()
+        cursor.execute(query, (*user_ids, start_date, end_date))
+        results = cursor.fetchall()
+        return list(results) if results else []
+
     def get_latest_recording_remarks_by_user(self, user_id, track_ids=None):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
 
@@ -403,6 +587,45 @@ class RecordingRepository:
         self.connection.commit()
         return cursor.lastrowid
 
+    def add_user_track_recommendations(self, recommendations):
+        """
+        Persist the first recommendation date of several tracks in one round-trip.
+
+        :param recommendations: List of (user_id, track_id, first_recommended_on) tuples.
+        """
+        cursor = self.connection.cursor()
+        add_query = """INSERT IGNORE INTO user_track (user_id, track_id, first_recommended_on)
+                       VALUES (%s, %s, %s);"""
+        cursor.executemany(add_query, recommendations)
+        self.connection.commit()
+
+    def get_first_recommendation_dates(self, user_id):
+        """
+        Retrieve the first recommendation date of every track recommended to a user.
+
+        :param user_id: The user the tracks were recommended to.
+        :return: Dictionary of track ID to first recommendation date.
+        """
+        cursor = self.connection.cursor()
+        query = """SELECT track_id, first_recommended_on FROM user_track
+                   WHERE user_id = %s;"""
+        cursor.execute(query, (user_id,))
+        return {track_id: first_recommended_on for track_id, first_recommended_on in cursor.fetchall()}
+
+    def get_first_recommendation_dates_by_users(self, user_ids):
+        """
+        Retrieve the first recommendation dates of several users in one query.
+
+        :param user_ids: The users the tracks were recommended to.
+        :return: List of dictionaries with user_id, track_id and first_recommended_on.
+        """
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        query = f"""SELECT user_id, track_id, first_recommended_on FROM user_track
+                    WHERE user_id IN ({placeholders});"""
+        cursor.execute(query, tuple(user_ids))
+        return cursor.fetchall()
+
     def get_first_recommendation_date(self, user_id, track_id):
         cursor = self.connection.cursor()
         query = """SELECT first_recommended_on FROM user_track
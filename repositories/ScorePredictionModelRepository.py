@@ -1,5 +1,27 @@
+import hashlib
+import io
+import os
+import tempfile
+
+import numpy as np
 import pymysql.cursors
 
+from components.LocalFileCache import LocalFileCache
+
+TRAINING_SET_FEATURES = ['level', 'offset', 'duration', 'distance']
+TRAINING_SET_COLUMNS = {
+    'track_id': np.int64,
+    'recording_id': np.int64,
+    'level': np.float32,
+    'offset': np.float32,
+    'duration': np.float32,
+    'distance': np.float32,
+    'score': np.float32,
+}
+TRAINING_SET_BATCH_SIZE = 5000  # Rows fetched per round-trip when streaming the training set
+TRAINING_SET_SNAPSHOT_DIR = os.path.join(tempfile.gettempdir(), "stringsync", "training_sets")
+TRAINING_SET_SNAPSHOTS_KEPT = 5  # Most recently used snapshots kept on disk, the older ones are removed
+
 
 class ScorePredictionModelRepository:
     def __init__(self, connection):
@@ -8,10 +30,99 @@ class ScorePredictionModelRepository:
     def get_training_set(self, track_ids=None, rebuild_only=False):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
 
-        # Base query
-        query = """
+        query, params = self.build_training_set_query("""
             SELECT t.id as track_id, t.name as track_name, raga.name as raga_name,
-                   t.level, t.offset, rec.id as recording_id, rec.duration, rec.distance, rec.score 
+                   t.level, t.offset, rec.id as recording_id, rec.duration, rec.distance, rec.score
+        """, track_ids, rebuild_only)
+        cursor.execute(query, params or None)
+
+        results = cursor.fetchall()
+        return results
+
+    def get_training_arrays(self, track_ids=None, rebuild_only=False, use_snapshot=True,
+                            snapshot_dir=TRAINING_SET_SNAPSHOT_DIR, batch_size=TRAINING_SET_BATCH_SIZE):
+        """
+        Return the training set as a dictionary of typed NumPy columns (see TRAINING_SET_COLUMNS).
+
+        Rows are streamed through an unbuffered cursor straight into preallocated
+        arrays, so no per-row Python objects are kept around. When use_snapshot is
+        set, the arrays are stored in a local NPZ file keyed by a fingerprint of the
+        training set, and later calls with an unchanged training set read that file
+        instead of extracting the rows again. Only the TRAINING_SET_SNAPSHOTS_KEPT
+        most recently used snapshots are kept.
+        """
+        row_count, training_set_hash = self.get_training_set_fingerprint(track_ids, rebuild_only)
+
+        snapshot_path = os.path.join(snapshot_dir, f"{training_set_hash}.npz") if use_snapshot else None
+        if snapshot_path and os.path.exists(snapshot_path):
+            with np.load(snapshot_path) as snapshot:
+                arrays = {column: snapshot[column] for column in TRAINING_SET_COLUMNS}
+            # Mark the snapshot as recently used, so pruning keeps it
+            os.utime(snapshot_path)
+            return arrays
+
+        arrays = self.stream_training_arrays(row_count, track_ids, rebuild_only, batch_size)
+
+        if snapshot_path:
+            buffer = io.BytesIO()
+            np.savez(buffer, **arrays)
+            LocalFileCache.write_atomically(snapshot_path, buffer.getvalue())
+            self.prune_snapshots(snapshot_dir)
+
+        return arrays
+
+    @staticmethod
+    def prune_snapshots(snapshot_dir, keep=TRAINING_SET_SNAPSHOTS_KEPT):
+        """Remove all but the most recently used training set snapshots."""
+        LocalFileCache.prune(snapshot_dir, keep, suffix=".npz")
+
+    def get_training_set_fingerprint(self, track_ids=None, rebuild_only=False):
+        """
+        Return the number of training rows and a hash that changes whenever any
+        training row is added, removed or has one of its columns modified.
+        """
+        with self.connection.cursor() as cursor:
+            query, params = self.build_training_set_query("""
+                SELECT COUNT(*),
+                       COALESCE(BIT_XOR(CRC32(CONCAT_WS(',', t.id, rec.id, t.level, t.offset,
+                                                        rec.duration, rec.distance, rec.score))), 0)
+            """, track_ids, rebuild_only)
+            cursor.execute(query, params or None)
+            row_count, checksum = cursor.fetchone()
+
+        key = f"{row_count}:{checksum}:{sorted(track_ids or [])}:{rebuild_only}"
+        return int(row_count), hashlib.sha1(key.encode()).hexdigest()
+
+    def stream_training_arrays(self, row_count, track_ids=None, rebuild_only=False,
+                               batch_size=TRAINING_SET_BATCH_SIZE):
+        columns = list(TRAINING_SET_COLUMNS)
+        arrays = {column: np.empty(row_count, dtype=dtype) for column, dtype in TRAINING_SET_COLUMNS.items()}
+
+        with self.connection.cursor(pymysql.cursors.SSCursor) as cursor:
+            query, params = self.build_training_set_query("""
+                SELECT t.id, rec.id, t.level, t.offset, rec.duration, rec.distance, rec.score
+            """, track_ids, rebuild_only)
+            cursor.execute(query, params or None)
+
+            size = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                # Rows may have been added since the row count was taken
+                if size + len(rows) > len(arrays[columns[0]]):
+                    capacity = max(size + len(rows), 2 * len(arrays[columns[0]]))
+                    arrays = {column: np.resize(array, capacity) for column, array in arrays.items()}
+                for column, values in zip(columns, zip(*rows)):
+                    arrays[column][size:size + len(rows)] = values
+                size += len(rows)
+
+        return {column: array[:size] for column, array in arrays.items()}
+
+    @staticmethod
+    def build_training_set_query(select_clause, track_ids=None, rebuild_only=False):
+        # Base query
+        query = select_clause + """
             FROM recordings rec
             INNER JOIN tracks t ON rec.track_id = t.id
             INNER JOIN ragas raga ON t.ragam_id = raga.id
@@ -20,6 +131,7 @@ class ScorePredictionModelRepository:
             AND t.offset IS NOT NULL
             AND rec.duration IS NOT NULL
         """
+        params = []
 
         # Include rebuild condition based on the flag
         if rebuild_only:
@@ -30,11 +142,6 @@ class ScorePredictionModelRepository:
             # Format a string of placeholders for the SQL query
             placeholders = ', '.join(['%s'] * len(track_ids))
             query += f" AND t.id IN ({placeholders})"
-            cursor.execute(query, track_ids)
-        else:
-            cursor.execute(query)
-
-        results = cursor.fetchall()
-        return results
-
+            params.extend(track_ids)
 
+        return query, params
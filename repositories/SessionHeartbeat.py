@@ -0,0 +1,185 @@
+import atexit
+import threading
+import time
+from datetime import timedelta
+
+from repositories.DatabaseManager import DatabaseManager
+
+HEARTBEAT_FLUSH_INTERVAL = 60  # Seconds between batched writes of session activity
+HEARTBEAT_FLUSH_BATCH_SIZE = 500  # Sessions updated per UPDATE statement
+HEARTBEAT_IDLE_EVICTION = 600  # Seconds without activity after which a flushed session is dropped from memory
+HEARTBEAT_CLOCK_SYNC_INTERVAL = 3600  # Seconds between reads of the DB clock
+
+
+class SessionHeartbeat:
+    """
+    In-process record of the last activity time of every active session, shared
+    by all sessions of the app.
+
+    Activity is only kept in memory. A background thread with its own
+    connection writes the pending sessions to user_sessions in batched UPDATEs
+    every HEARTBEAT_FLUSH_INTERVAL seconds and once more when the process
+    exits. A single session is also written when it closes.
+    Sessions that were flushed and stayed idle for HEARTBEAT_IDLE_EVICTION
+    seconds, e.g. because their tab was closed, are dropped from memory.
+
+    Activity times are on the DB clock (CURRENT_TIMESTAMP), like the
+    timestamps of user_activities they are compared with. The DB clock is read
+    once per HEARTBEAT_CLOCK_SYNC_INTERVAL and advanced with the monotonic clock.
+    """
+
+    def __init__(self, connection_factory=DatabaseManager, flush_interval=HEARTBEAT_FLUSH_INTERVAL,
+                 batch_size=HEARTBEAT_FLUSH_BATCH_SIZE, idle_eviction=HEARTBEAT_IDLE_EVICTION,
+                 clock_sync_interval=HEARTBEAT_CLOCK_SYNC_INTERVAL):
+        self.connection_factory = connection_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.idle_eviction = idle_eviction
+        self.clock_sync_interval = clock_sync_interval
+        self.lock = threading.Lock()
+        self.last_activity_times = {}
+        self.beaten_at = {}
+        self.pending = set()
+        self.db_clock = None
+        self.thread = None
+        self.stopping = threading.Event()
+        self.database_manager = None
+
+    def beat(self, connection, session_id, timestamp=None):
+        """Record activity for the session, the background thread writes it within the flush interval."""
+        self.start()
+        timestamp = timestamp or self.get_db_time(connection)
+        with self.lock:
+            self.last_activity_times[session_id] = timestamp
+            self.beaten_at[session_id] = time.monotonic()
+            self.pending.add(session_id)
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='SessionHeartbeat', daemon=True)
+                self.thread.start()
+                atexit.register(self.close)
+
+    def run(self):
+        while not self.stopping.wait(self.flush_interval):
+            self.flush_pending()
+        # Write whatever is still pending before the process exits
+        self.flush_pending()
+        self.close_connection()
+
+    def flush_pending(self):
+        try:
+            connection = self.get_connection()
+        except Exception as e:
+            print(f"Error while connecting to flush session activity: {e}")
+            return 0
+        flushed = self.flush(connection)
+        if not flushed and self.has_pending():
+            # The write failed, reconnect before the next one
+            self.close_connection()
+        return flushed
+
+    def has_pending(self):
+        with self.lock:
+            return bool(self.pending)
+
+    def get_connection(self):
+        if self.database_manager is None:
+            self.database_manager = self.connection_factory()
+        return self.database_manager.connection
+
+    def close_connection(self):
+        if self.database_manager is not None:
+            self.database_manager.close()
+            self.database_manager = None
+
+    def close(self, timeout=30):
+        """Stop the background thread after it has written the pending sessions."""
+        self.stopping.set()
+        with self.lock:
+            thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def get_db_time(self, connection):
+        """:return: The current time on the DB clock, reading the clock if the last read is too old."""
+        now = time.monotonic()
+        db_clock = self.db_clock
+        if db_clock is None or now - db_clock[1] >= self.clock_sync_interval:
+            cursor = connection.cursor()
+            cursor.execute("SELECT CURRENT_TIMESTAMP;")
+            db_clock = (cursor.fetchone()[0], time.monotonic())
+            self.db_clock = db_clock
+        return db_clock[0] + timedelta(seconds=int(now - db_clock[1]))
+
+    def get_last_activity_time(self, session_id):
+        """:return: The last recorded activity time of the session, or None if unknown in this process."""
+        with self.lock:
+            return self.last_activity_times.get(session_id)
+
+    def flush(self, connection, session_ids=None):
+        """
+        Write the pending activity times, of all sessions or only the given ones.
+
+        :return: Number of sessions written.
+        """
+        with self.lock:
+            if session_ids is None:
+                flushed_ids = list(self.pending)
+            else:
+                flushed_ids = [session_id for session_id in session_ids if session_id in self.pending]
+            self.pending.difference_update(flushed_ids)
+            activity_times = [(session_id, self.last_activity_times[session_id]) for session_id in flushed_ids]
+
+        if not activity_times:
+            return 0
+
+        try:
+            cursor = connection.cursor()
+            for start in range(0, len(activity_times), self.batch_size):
+                query, params = self.get_flush_query(activity_times[start:start + self.batch_size])
+                cursor.execute(query, params)
+            connection.commit()
+        except Exception as e:
+            print(f"Error while flushing session activity: {e}")
+            with self.lock:
+                self.pending.update(flushed_ids)
+            return 0
+
+        self.evict_idle_sessions()
+        return len(activity_times)
+
+    def evict_idle_sessions(self):
+        # Only flushed sessions are evicted; their activity time is in the DB
+        with self.lock:
+            cutoff = time.monotonic() - self.idle_eviction
+            idle_ids = [session_id for session_id, beaten_at in self.beaten_at.items()
+                        if beaten_at < cutoff and session_id not in self.pending]
+            for session_id in idle_ids:
+                self.last_activity_times.pop(session_id, None)
+                self.beaten_at.pop(session_id, None)
+
+    def forget(self, session_id):
+        with self.lock:
+            self.last_activity_times.pop(session_id, None)
+            self.beaten_at.pop(session_id, None)
+            self.pending.discard(session_id)
+
+    @staticmethod
+    def get_flush_query(activity_times):
+        # The assignments run left to right, so session_duration sees the new last_activity_time
+        cases = ' '.join(['WHEN %s THEN %s'] * len(activity_times))
+        placeholders = ', '.join(['%s'] * len(activity_times))
+        query = f"""
+            UPDATE user_sessions
+            SET last_activity_time = CASE session_id {cases} END,
+                session_duration = TIMESTAMPDIFF(SECOND, open_session_time, last_activity_time)
+            WHERE session_id IN ({placeholders});
+        """
+        params = [value for activity_time in activity_times for value in activity_time]
+        params.extend(session_id for session_id, _ in activity_times)
+        return query, params
+
+
+shared_session_heartbeat = SessionHeartbeat()
@@ -80,6 +80,18 @@ class StorageRepository:
         with open(filename, "wb") as f:
             f.write(data)
 
+    def get_manifest(self, prefix):
+        """
+        List the files under a folder of the bucket.
+
+        :param prefix: Folder name, e.g. 'badges'.
+        :return: List of dictionaries with the blob name, its base64 encoded MD5
+            hash (None for composite objects) and size.
+        """
+        blobs = self.storage_client.list_blobs(self.bucket_name, prefix=f"{prefix.rstrip('/')}/")
+        return [{'name': blob.name, 'md5_hash': blob.md5_hash, 'size': blob.size}
+                for blob in blobs if not blob.name.endswith('/')]
+
     def download_blob_by_url(self, blob_url):
         blob_name = self.get_blob_name(blob_url)
         bucket = self.get_bucket()
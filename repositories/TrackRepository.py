@@ -1,10 +1,13 @@
 import pymysql
 import pymysql.cursors
 
+from repositories.CatalogCache import shared_catalog_cache
+
 
 class TrackRepository:
-    def __init__(self, connection):
+    def __init__(self, connection, catalog_cache=shared_catalog_cache):
         self.connection = connection
+        self.catalog_cache = catalog_cache
         # self.create_tables()
 
     def create_tables(self):
@@ -48,9 +51,7 @@ class TrackRepository:
         self.connection.commit()
 
     def get_all_tracks(self):
-        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
-        cursor.execute("SELECT * FROM tracks")
-        return cursor.fetchall()
+        return [dict(track) for track in self.catalog_cache.get(self.connection)['tracks']]
 
     def get_track_by_id(self, track_id):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
@@ -71,14 +72,10 @@ class TrackRepository:
         return cursor.fetchone()
 
     def get_all_tags(self):
-        cursor = self.connection.cursor()
-        cursor.execute("SELECT DISTINCT tag_name FROM tags")
-        return [row[0] for row in cursor.fetchall()]
+        return list(self.catalog_cache.get(self.connection)['tags'])
 
     def get_all_levels(self):
-        cursor = self.connection.cursor()
-        cursor.execute("SELECT DISTINCT level FROM tracks")
-        return [row[0] for row in cursor.fetchall()]
+        return list(self.catalog_cache.get(self.connection)['levels'])
 
     def get_tags_by_track_id(self, track_id):
         cursor = self.connection.cursor()
@@ -122,6 +119,7 @@ class TrackRepository:
             cursor.execute("INSERT INTO track_tags (track_id, tag_id) VALUES (%s, %s)", (track_id, tag_id))
 
         self.connection.commit()
+        self.catalog_cache.invalidate()
 
     def remove_track_by_id(self, track_id):
         cursor = self.connection.cursor()
@@ -135,6 +133,7 @@ class TrackRepository:
             cursor.execute(delete_from_tracks_query, (track_id,))
 
             self.connection.commit()
+            self.catalog_cache.invalidate()
             cursor.close()
             return True
         except Exception as e:
@@ -158,53 +157,13 @@ class TrackRepository:
         return count > 0
 
     def search_tracks(self, name=None, raga=None, level=None, tags=None, limit=100):
-        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        """
+        Search the cached catalog through its TrackSearchIndex, without querying MySQL.
 
-        query = """
-            SELECT 
-                tracks.id, 
-                tracks.name as track_name, 
-                tracks.description,
-                tracks.track_path, 
-                tracks.track_ref_path, 
-                tracks.notation_path, 
-                tracks.level, 
-                ragas.id as ragam_id,
-                ragas.name as ragam,  
-                tracks.offset 
-            FROM tracks
-            JOIN ragas ON tracks.ragam_id = ragas.id  
+        :param name: Exact, partial or misspelled track name.
+        :param tags: Tags the tracks must all have.
         """
-        params = []
-
-        joins = []
-        if tags:
-            joins.append("JOIN track_tags ON tracks.id = track_tags.track_id")
-            joins.append("JOIN tags ON track_tags.tag_id = tags.id")
-
-        where_clauses = []
-        if name:
-            where_clauses.append("tracks.name = %s")
-            params.append(f"{name}")
-        if raga:
-            where_clauses.append("ragas.name = %s")
-            params.append(raga)
-        if level:
-            where_clauses.append("tracks.level = %s")
-            params.append(level)
-        if tags:
-            where_clauses.append(f"tags.tag_name IN ({', '.join(['%s'] * len(tags))})")
-            params.extend(tags)
-
-        query += f" {' '.join(joins)} {' WHERE ' + ' AND '.join(where_clauses) if where_clauses else ''}"
-
-        if tags:
-            query += " GROUP BY tracks.id HAVING COUNT(DISTINCT tags.id) = %s"
-            params.append(len(tags))
-
-        query += f" LIMIT {limit}"
-        cursor.execute(query, params)
-        return cursor.fetchall()
+        return self.catalog_cache.get(self.connection)['search_index'].search(name, raga, level, tags, limit)
 
     def update_model_path(self, track_id, model_path):
         """
@@ -220,6 +179,7 @@ class TrackRepository:
                           WHERE id = %s;"""
         cursor.execute(update_query, (model_path, track_id))
         self.connection.commit()
+        self.catalog_cache.invalidate()
 
     def flag_model_rebuild(self, track_id):
         """
@@ -231,3 +191,4 @@ class TrackRepository:
         update_query = "UPDATE tracks SET requires_model_rebuild = TRUE WHERE id = %s;"
         cursor.execute(update_query, (track_id,))
         self.connection.commit()
+        self.catalog_cache.invalidate()
@@ -0,0 +1,119 @@
+TRIGRAM_SIMILARITY_THRESHOLD = 0.3  # Minimum trigram similarity for a fuzzy name match
+
+
+class TrackSearchIndex:
+    """
+    In-memory search index over the track catalog.
+
+    Every searchable track gets a bit position, and tags, ragas, levels and name
+    trigrams each map to an integer bitset of the tracks they occur in, so the
+    filters of a query combine with a few bitwise ANDs. Only tracks with a raga
+    are indexed, like the JOIN on ragas the SQL search used to do.
+    """
+
+    def __init__(self, tracks, ragas, tags_by_track_id):
+        ragas_by_id = {raga['id']: raga for raga in ragas}
+
+        self.rows = []
+        self.names = []
+        self.name_trigrams = []
+        self.tag_bits = {}
+        self.raga_bits = {}
+        self.level_bits = {}
+        self.trigram_bits = {}
+
+        for track in tracks:
+            raga = ragas_by_id.get(track['ragam_id'])
+            if raga is None:
+                continue
+
+            bit = 1 << len(self.rows)
+            self.rows.append({
+                'id': track['id'],
+                'track_name': track['name'],
+                'description': track['description'],
+                'track_path': track['track_path'],
+                'track_ref_path': track['track_ref_path'],
+                'notation_path': track['notation_path'],
+                'level': track['level'],
+                'ragam_id': raga['id'],
+                'ragam': raga['name'],
+                'offset': track['offset'],
+            })
+
+            name = (track['name'] or '').casefold()
+            trigrams = self.get_trigrams(name)
+            self.names.append(name)
+            self.name_trigrams.append(trigrams)
+            for trigram in trigrams:
+                self.trigram_bits[trigram] = self.trigram_bits.get(trigram, 0) | bit
+
+            raga_name = raga['name'].casefold()
+            self.raga_bits[raga_name] = self.raga_bits.get(raga_name, 0) | bit
+            level = str(track['level'])
+            self.level_bits[level] = self.level_bits.get(level, 0) | bit
+            for tag in {tag.casefold() for tag in tags_by_track_id.get(track['id'], [])}:
+                self.tag_bits[tag] = self.tag_bits.get(tag, 0) | bit
+
+        self.all_bits = (1 << len(self.rows)) - 1
+
+    def search(self, name=None, raga=None, level=None, tags=None, limit=100):
+        """
+        Return the tracks matching all of the given filters, as search result rows.
+
+        Raga, level and tags (a track must have all of them) are exact, case-insensitive
+        filters. A name matches exact names first, then names containing it or similar
+        to it by trigrams, best matches first.
+        """
+        bits = self.all_bits
+        if raga:
+            bits &= self.raga_bits.get(raga.casefold(), 0)
+        if level:
+            bits &= self.level_bits.get(str(level), 0)
+        for tag in tags or []:
+            bits &= self.tag_bits.get(tag.casefold(), 0)
+
+        if name:
+            positions = self.match_name(name.casefold(), bits)
+        else:
+            positions = self.iter_bits(bits)
+
+        rows = []
+        for position in positions:
+            rows.append(dict(self.rows[position]))
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def match_name(self, name, bits):
+        trigrams = self.get_trigrams(name)
+        if len(name) >= 3:
+            candidates = 0
+            for trigram in trigrams:
+                candidates |= self.trigram_bits.get(trigram, 0)
+            bits &= candidates
+
+        matches = []
+        for position in self.iter_bits(bits):
+            track_name = self.names[position]
+            common = len(trigrams & self.name_trigrams[position])
+            similarity = common / len(trigrams | self.name_trigrams[position]) if trigrams else 0
+            if track_name == name or name in track_name or similarity >= TRIGRAM_SIMILARITY_THRESHOLD:
+                matches.append((track_name != name, name not in track_name, -similarity, position))
+        return [position for *_, position in sorted(matches)]
+
+    @staticmethod
+    def get_trigrams(text):
+        """Trigrams of every word, padded with two spaces in front and one behind."""
+        trigrams = set()
+        for word in text.casefold().split():
+            padded = f"  {word} "
+            trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return trigrams
+
+    @staticmethod
+    def iter_bits(bits):
+        while bits:
+            lowest = bits & -bits
+            yield lowest.bit_length() - 1
+            bits ^= lowest
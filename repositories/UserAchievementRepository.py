@@ -2,11 +2,13 @@ import datetime
 import pymysql.cursors
 from enums.Badges import UserBadges, TrackBadges
 from enums.TimeFrame import TimeFrame
+from repositories.UserDailyStatsRepository import UserDailyStatsRepository
 
 
 class UserAchievementRepository:
     def __init__(self, connection):
         self.connection = connection
+        self.user_daily_stats_repo = UserDailyStatsRepository(connection)
         #self.create_achievements_table()
 
     def create_achievements_table(self):
@@ -49,6 +51,7 @@ class UserAchievementRepository:
                 "INSERT INTO user_achievements (user_id, badge, timestamp, value) VALUES (%s, %s, %s, %s)",
                 (user_id, badge.value, end_date, value)
             )
+            self.user_daily_stats_repo.refresh_user_daily_stats(cursor, user_id, end_date)
         else:
             # If badge exists, update the record
             cursor.execute(
@@ -86,6 +89,7 @@ class UserAchievementRepository:
                 "INSERT INTO user_achievements (user_id, badge, timestamp) VALUES (%s, %s, %s)",
                 (user_id, badge.value, timestamp)
             )
+            self.user_daily_stats_repo.refresh_user_daily_stats(cursor, user_id, timestamp)
             self.connection.commit()
             return True, f"Awarded {badge.name} to user with ID {user_id}"
         else:
@@ -109,6 +113,7 @@ class UserAchievementRepository:
                 "VALUES (%s, %s, %s, %s)",
                 (user_id, badge.value, recording_id, timestamp)
             )
+            self.user_daily_stats_repo.refresh_user_daily_stats(cursor, user_id, timestamp)
             self.connection.commit()
             return True, f"Awarded {badge.value} to user with ID {user_id}"
         else:
@@ -175,6 +180,20 @@ class UserAchievementRepository:
         results = cursor.fetchall()
         return list(results) if results else []
 
+    def get_user_achievements_by_users_and_timeframe(
+            self, user_ids, time_frame: TimeFrame = TimeFrame.PREVIOUS_WEEK):
+        if not user_ids:
+            return []
+
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        start_date, end_date = time_frame.get_date_range()
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        cursor.execute(f"SELECT * FROM user_achievements "
+                       f"WHERE user_id IN ({placeholders}) AND timestamp BETWEEN %s AND %s",
+                       (*user_ids, start_date, end_date))
+        results = cursor.fetchall()
+        return list(results) if results else []
+
     def get_user_achievements_after_timestamp(self, user_id, timestamp):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
 
@@ -4,11 +4,13 @@ import pymysql
 
 from enums.ActivityType import ActivityType
 from enums.TimeFrame import TimeFrame
+from repositories.ActivitySink import ActivitySink, shared_activity_sink
 
 
 class UserActivityRepository:
-    def __init__(self, connection):
+    def __init__(self, connection, activity_sink: ActivitySink = shared_activity_sink):
         self.connection = connection
+        self.activity_sink = activity_sink
         #self.create_activities_table()
 
     def create_activities_table(self):
@@ -21,27 +23,49 @@ class UserActivityRepository:
                 activity_type VARCHAR(255),
                 additional_params JSON,
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES `users`(id)
+                FOREIGN KEY (user_id) REFERENCES `users`(id),
+                INDEX idx_user_activities_timestamp (timestamp)
             );
         """
 
         cursor.execute(create_table_query)
         self.connection.commit()
 
+    def add_timestamp_index(self):
+        """Add the timestamp index to user_activities tables created before it existed."""
+        with self.connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT COUNT(*) FROM information_schema.statistics
+                WHERE table_schema = DATABASE()
+                AND table_name = 'user_activities'
+                AND index_name = 'idx_user_activities_timestamp';
+            """)
+            if cursor.fetchone()[0]:
+                return
+            cursor.execute("CREATE INDEX idx_user_activities_timestamp ON user_activities (timestamp);")
+            self.connection.commit()
+
     def log_activity(self, user_id, session_id, activity_type: ActivityType, additional_params=None):
+        """
+        Log an activity. It is queued and written in the background by the
+        activity sink, and only written directly if the sink cannot take it.
+        """
         if additional_params is None:
             additional_params = {}
 
         # Add the session_id to the additional_params
         additional_params['session_id'] = session_id
 
+        # Convert the additional_params dictionary to a JSON string
+        additional_params_json = json.dumps(additional_params)
+        if self.activity_sink.log(user_id, session_id, activity_type.value, additional_params_json):
+            return
+
         cursor = self.connection.cursor()
         insert_activity_query = """
             INSERT INTO user_activities (user_id, session_id, activity_type, additional_params)
             VALUES (%s, %s, %s, %s);
         """
-        # Convert the additional_params dictionary to a JSON string
-        additional_params_json = json.dumps(additional_params)
         cursor.execute(insert_activity_query,
                        (user_id, session_id, activity_type.value, additional_params_json))
         self.connection.commit()
@@ -56,6 +56,23 @@ class UserAssessmentRepository:
             result = cursor.fetchone()
             return result[0] == 1
 
+    def get_assessed_user_ids(self, user_ids, time_frame: TimeFrame):
+        """Returns the IDs of the given users that already have an assessment within the timeframe."""
+        if not user_ids:
+            return set()
+
+        start_date, end_date = time_frame.get_date_range()
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        with self.connection.cursor() as cursor:
+            query = f"""
+            SELECT DISTINCT user_id FROM user_assessments
+            WHERE user_id IN ({placeholders}) AND
+                  assessment_start_date >= %s AND
+                  assessment_end_date <= %s;
+            """
+            cursor.execute(query, (*user_ids, start_date, end_date))
+            return {row[0] for row in cursor.fetchall()}
+
     def get_assessments_by_group(self, group_id, time_frame: TimeFrame):
         """Retrieves all assessments for users in a given group and timeframe."""
         start_date, end_date = time_frame.get_date_range()
@@ -0,0 +1,105 @@
+class UserDailyStatsRepository:
+    """
+    Daily per-user rollups of recordings, practice logs and badges.
+
+    Time frame reports sum at most one row per user and day instead of scanning
+    the raw event tables. The repositories that write those events refresh the
+    affected day through refresh_user_daily_stats.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        # self.create_tables()
+
+    def create_tables(self):
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_daily_stats (
+                user_id INT,
+                activity_date DATE,
+                recordings INT DEFAULT 0,
+                recording_seconds INT DEFAULT 0,
+                score DECIMAL(10, 2) DEFAULT 0,
+                practice_minutes INT DEFAULT 0,
+                badges INT DEFAULT 0,
+                PRIMARY KEY (user_id, activity_date),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            );
+        """)
+        # Unique tracks cannot be summed across days, so the tracks of each day are kept
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_daily_tracks (
+                user_id INT,
+                activity_date DATE,
+                track_id INT,
+                PRIMARY KEY (user_id, activity_date, track_id),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+                FOREIGN KEY (track_id) REFERENCES tracks(id) ON DELETE CASCADE
+            );
+        """)
+        self.connection.commit()
+
+    def refresh_user_daily_stats(self, cursor, user_id, timestamp):
+        """
+        Recompute the rollup rows of one user for the day of the given timestamp.
+        Runs on the caller's cursor so it commits with the write that triggered it.
+        """
+        if user_id is None or timestamp is None:
+            return
+
+        day_condition = "AND user_id = %s AND timestamp >= DATE(%s) AND timestamp < DATE(%s) + INTERVAL 1 DAY"
+        day_params = (user_id, timestamp, timestamp)
+        cursor.execute("DELETE FROM user_daily_stats WHERE user_id = %s AND activity_date = DATE(%s);",
+                       (user_id, timestamp))
+        cursor.execute("DELETE FROM user_daily_tracks WHERE user_id = %s AND activity_date = DATE(%s);",
+                       (user_id, timestamp))
+        cursor.execute(self.get_user_daily_stats_query(day_condition), day_params * 3)
+        cursor.execute(self.get_user_daily_tracks_query(day_condition), day_params)
+
+    def rebuild_user_daily_stats(self):
+        """Rebuild both rollup tables from the raw event tables."""
+        cursor = self.connection.cursor()
+        cursor.execute("DELETE FROM user_daily_tracks;")
+        cursor.execute("DELETE FROM user_daily_stats;")
+        cursor.execute(self.get_user_daily_stats_query())
+        rows = cursor.rowcount
+        cursor.execute(self.get_user_daily_tracks_query())
+        self.connection.commit()
+        return rows
+
+    @staticmethod
+    def get_user_daily_stats_query(condition=""):
+        return f"""
+        INSERT INTO user_daily_stats (user_id, activity_date, recordings, recording_seconds, score,
+                                      practice_minutes, badges)
+        SELECT user_id, activity_date, SUM(recordings), SUM(recording_seconds), SUM(score),
+               SUM(practice_minutes), SUM(badges)
+        FROM (
+            SELECT user_id, DATE(timestamp) AS activity_date, COUNT(*) AS recordings,
+                   COALESCE(SUM(duration), 0) AS recording_seconds, COALESCE(SUM(score), 0) AS score,
+                   0 AS practice_minutes, 0 AS badges
+            FROM recordings
+            WHERE user_id IS NOT NULL AND timestamp IS NOT NULL {condition}
+            GROUP BY user_id, activity_date
+            UNION ALL
+            SELECT user_id, DATE(timestamp), 0, 0, 0, COALESCE(SUM(minutes), 0), 0
+            FROM user_practice_logs
+            WHERE user_id IS NOT NULL AND timestamp IS NOT NULL {condition}
+            GROUP BY user_id, DATE(timestamp)
+            UNION ALL
+            SELECT user_id, DATE(timestamp), 0, 0, 0, 0, COUNT(*)
+            FROM user_achievements
+            WHERE user_id IS NOT NULL AND timestamp IS NOT NULL {condition}
+            GROUP BY user_id, DATE(timestamp)
+        ) AS daily_activity
+        GROUP BY user_id, activity_date;
+        """
+
+    @staticmethod
+    def get_user_daily_tracks_query(condition=""):
+        return f"""
+        INSERT INTO user_daily_tracks (user_id, activity_date, track_id)
+        SELECT DISTINCT user_id, DATE(timestamp), track_id
+        FROM recordings
+        WHERE user_id IS NOT NULL AND track_id IS NOT NULL AND timestamp IS NOT NULL {condition};
+        """
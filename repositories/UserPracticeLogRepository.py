@@ -1,13 +1,19 @@
+import datetime
+import json
+from collections import Counter
+
 import pymysql
 import pymysql.cursors
 
 from enums.Badges import UserBadges
 from enums.TimeFrame import TimeFrame
+from repositories.UserDailyStatsRepository import UserDailyStatsRepository
 
 
 class UserPracticeLogRepository:
     def __init__(self, connection):
         self.connection = connection
+        self.user_daily_stats_repo = UserDailyStatsRepository(connection)
         #self.create_practice_log_table()
 
     def create_practice_log_table(self):
@@ -32,6 +38,22 @@ class UserPracticeLogRepository:
         cursor.execute(query, (user_id,))
         return cursor.fetchall()
 
+    def create_practice_streaks_table(self):
+        cursor = self.connection.cursor()
+        create_table_query = """
+            CREATE TABLE IF NOT EXISTS `user_practice_streaks` (
+                user_id INT PRIMARY KEY,
+                current_start DATE,
+                current_end DATE,
+                longest_start DATE,
+                longest_end DATE,
+                run_histogram JSON,
+                FOREIGN KEY (user_id) REFERENCES `users`(id) ON DELETE CASCADE
+            );
+        """
+        cursor.execute(create_table_query)
+        self.connection.commit()
+
     def log_practice(self, user_id, timestamp, minutes):
         cursor = self.connection.cursor()
         insert_log_query = """
@@ -39,10 +61,152 @@ class UserPracticeLogRepository:
             VALUES (%s, %s, %s);
         """
         cursor.execute(insert_log_query, (user_id, timestamp, minutes))
+        self.update_practice_streak(cursor, user_id, timestamp.date())
+        self.user_daily_stats_repo.refresh_user_daily_stats(cursor, user_id, timestamp)
         self.connection.commit()
 
-    def get_streaks(self, user_id):
+    def update_practice_streak(self, cursor, user_id, practice_date):
+        """
+        Update the user's streak row for a newly logged practice date. Practicing
+        within or right after the current run costs a single row update; a date
+        before the current run (a backfilled log) recomputes the row from all
+        practice dates. Runs on the caller's cursor, before its commit.
+        """
+        cursor.execute("""
+            SELECT current_start, current_end, longest_start, longest_end, run_histogram
+            FROM user_practice_streaks WHERE user_id = %s FOR UPDATE;
+        """, (user_id,))
+        row = cursor.fetchone()
+        if row is None:
+            streak = self.get_practice_streak_from_dates(self.fetch_practice_dates(cursor, user_id))
+        else:
+            streak = self.parse_practice_streak(row)
+            current_start, current_end = streak['current_start'], streak['current_end']
+            if current_start <= practice_date <= current_end:
+                return
+            histogram = streak['run_histogram']
+            if practice_date == current_end + datetime.timedelta(days=1):
+                # Extend the current run
+                length = (current_end - current_start).days + 1
+                histogram[length] -= 1
+                if not histogram[length]:
+                    del histogram[length]
+                histogram[length + 1] = histogram.get(length + 1, 0) + 1
+                streak['current_end'] = practice_date
+            elif practice_date > current_end:
+                # Start a new run
+                histogram[1] = histogram.get(1, 0) + 1
+                streak['current_start'] = streak['current_end'] = practice_date
+            else:
+                streak = self.get_practice_streak_from_dates(self.fetch_practice_dates(cursor, user_id))
+
+            current_length = (streak['current_end'] - streak['current_start']).days + 1
+            if current_length > (streak['longest_end'] - streak['longest_start']).days + 1:
+                streak['longest_start'], streak['longest_end'] = streak['current_start'], streak['current_end']
+
+        if streak:
+            self.save_practice_streak(cursor, user_id, streak)
+
+    def save_practice_streak(self, cursor, user_id, streak):
+        cursor.execute("""
+            INSERT INTO user_practice_streaks
+                (user_id, current_start, current_end, longest_start, longest_end, run_histogram)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                current_start = VALUES(current_start), current_end = VALUES(current_end),
+                longest_start = VALUES(longest_start), longest_end = VALUES(longest_end),
+                run_histogram = VALUES(run_histogram);
+        """, (user_id, streak['current_start'], streak['current_end'], streak['longest_start'],
+              streak['longest_end'], json.dumps(streak['run_histogram'])))
+
+    def get_practice_streak(self, user_id):
+        """
+        :return: Dictionary with the current and longest runs of consecutive
+            practice days and a histogram of run length to count, or None.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            SELECT current_start, current_end, longest_start, longest_end, run_histogram
+            FROM user_practice_streaks WHERE user_id = %s;
+        """, (user_id,))
+        row = cursor.fetchone()
+        return self.parse_practice_streak(row) if row else None
+
+    def rebuild_practice_streaks(self):
+        """Rebuild the streak rows of all users from their practice logs."""
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            SELECT DISTINCT user_id, DATE(timestamp) AS practice_date
+            FROM user_practice_logs
+            WHERE user_id IS NOT NULL AND timestamp IS NOT NULL
+            ORDER BY user_id, practice_date
+        """)
+        practice_dates_by_user = {}
+        for user_id, practice_date in cursor.fetchall():
+            practice_dates_by_user.setdefault(user_id, []).append(practice_date)
+
+        cursor.execute("DELETE FROM user_practice_streaks;")
+        for user_id, practice_dates in practice_dates_by_user.items():
+            self.save_practice_streak(cursor, user_id, self.get_practice_streak_from_dates(practice_dates))
+        self.connection.commit()
+        return len(practice_dates_by_user)
+
+    def backfill_practice_streaks(self):
+        """Fill user_practice_streaks on databases that had practice logs before the table existed."""
         cursor = self.connection.cursor()
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM user_practice_streaks);")
+        if cursor.fetchone()[0]:
+            return 0
+        return self.rebuild_practice_streaks()
+
+    @staticmethod
+    def fetch_practice_dates(cursor, user_id):
+        cursor.execute("""
+            SELECT DISTINCT DATE(timestamp) as practice_date
+            FROM user_practice_logs
+            WHERE user_id = %s AND timestamp IS NOT NULL
+            ORDER BY practice_date
+        """, (user_id,))
+        return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def parse_practice_streak(row):
+        current_start, current_end, longest_start, longest_end, run_histogram = row
+        return {
+            'current_start': current_start,
+            'current_end': current_end,
+            'longest_start': longest_start,
+            'longest_end': longest_end,
+            'run_histogram': {int(length): count for length, count in json.loads(run_histogram).items()},
+        }
+
+    @staticmethod
+    def get_runs(practice_dates):
+        """Split sorted, distinct practice dates into (start, end) runs of consecutive days."""
+        runs = []
+        for practice_date in practice_dates:
+            if runs and practice_date == runs[-1][1] + datetime.timedelta(days=1):
+                runs[-1][1] = practice_date
+            else:
+                runs.append([practice_date, practice_date])
+        return [tuple(run) for run in runs]
+
+    @classmethod
+    def get_practice_streak_from_dates(cls, practice_dates):
+        runs = cls.get_runs(practice_dates)
+        if not runs:
+            return None
+
+        longest_start, longest_end = max(runs, key=lambda run: (run[1] - run[0]).days)
+        return {
+            'current_start': runs[-1][0],
+            'current_end': runs[-1][1],
+            'longest_start': longest_start,
+            'longest_end': longest_end,
+            'run_histogram': dict(Counter((end - start).days + 1 for start, end in runs)),
+        }
+
+    def get_streaks(self, user_id):
         streaks = {
             '2_day_streak': 0,
             '3_day_streak': 0,
@@ -50,80 +214,54 @@ class UserPracticeLogRepository:
             '7_day_streak': 0,
             '10_day_streak': 0
         }
-        query = """
-            SELECT DATEDIFF(MAX(timestamp), MIN(timestamp)) + 1 AS streak_length 
-            FROM user_practice_logs 
-            WHERE user_id = %s 
-            GROUP BY DATE_SUB(timestamp, INTERVAL DATEDIFF(MAX(timestamp), timestamp) DAY)
-        """
-        cursor.execute(query, (user_id,))
-        result = cursor.fetchall()
+        streak = self.get_practice_streak(user_id)
+        if not streak:
+            return streaks
 
-        for row in result:
-            streak_length = row['streak_length']
+        for streak_length, count in streak['run_histogram'].items():
             if streak_length >= 10:
-                streaks['10_day_streak'] += 1
+                streaks['10_day_streak'] += count
             elif streak_length >= 7:
-                streaks['7_day_streak'] += 1
+                streaks['7_day_streak'] += count
             elif streak_length >= 5:
-                streaks['5_day_streak'] += 1
+                streaks['5_day_streak'] += count
             elif streak_length >= 3:
-                streaks['3_day_streak'] += 1
+                streaks['3_day_streak'] += count
             elif streak_length >= 2:
-                streaks['2_day_streak'] += 1
+                streaks['2_day_streak'] += count
 
         return streaks
 
     def get_streak(self, user_id, practice_date):
-        cursor = self.connection.cursor()
-        # Query to get all practice dates for the user
-        query = """
-                SELECT DISTINCT DATE(timestamp) as practice_date
-                FROM user_practice_logs
-                WHERE user_id = %s
-                ORDER BY DATE(timestamp)
-            """
-        cursor.execute(query, (user_id,))
-        result = cursor.fetchall()
-
-        # Convert result to a list of dates for easier manipulation
-        practice_dates = [row[0] for row in result]
-
-        if practice_date not in practice_dates:
-            return None
-
-        # Find the index of the given practice date
-        index = practice_dates.index(practice_date)
-
-        # Check backwards
-        streak = 1
-        for i in range(index - 1, -1, -1):
-            if (practice_date - practice_dates[i]).days == streak:
-                streak += 1
-            else:
-                break
-
-        # Check forwards
-        for i in range(index + 1, len(practice_dates)):
-            if (practice_dates[i] - practice_date).days == streak:
-                streak += 1
-            else:
-                break
+        streak = self.get_practice_streak(user_id)
+        if streak and streak['current_start'] <= practice_date <= streak['current_end']:
+            streak_length = (streak['current_end'] - streak['current_start']).days + 1
+        else:
+            # A date outside the current run, e.g. a backfilled log
+            streak_length = self.get_run_length(user_id, practice_date)
 
         # Determine the streak badge
-        if streak >= 10:
+        if streak_length >= 10:
             return UserBadges.TEN_DAY_STREAK
-        elif streak >= 7:
+        elif streak_length >= 7:
             return UserBadges.SEVEN_DAY_STREAK
-        elif streak >= 5:
+        elif streak_length >= 5:
             return UserBadges.FIVE_DAY_STREAK
-        elif streak >= 3:
+        elif streak_length >= 3:
             return UserBadges.THREE_DAY_STREAK
-        elif streak >= 2:
+        elif streak_length >= 2:
             return UserBadges.TWO_DAY_STREAK
         else:
             return None
 
+    def get_run_length(self, user_id, practice_date):
+        """Length of the run of consecutive practice days containing the given date, or 0 if not practiced then."""
+        cursor = self.connection.cursor()
+        for start, end in self.get_runs(self.fetch_practice_dates(cursor, user_id)):
+            if start <= practice_date <= end:
+                return (end - start).days + 1
+        return 0
+
     def fetch_daily_practice_minutes(self, user_id):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
         query = """
@@ -147,8 +285,16 @@ class UserPracticeLogRepository:
         results = cursor.fetchall()
         return list(results) if results else []
 
+    def get_user_practice_logs_by_users_and_timeframe(
+            self, user_ids, time_frame: TimeFrame = TimeFrame.PREVIOUS_WEEK):
+        if not user_ids:
+            return []
 
-
-
-
-
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        start_date, end_date = time_frame.get_date_range()
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        cursor.execute(f"SELECT * FROM user_practice_logs "
+                       f"WHERE user_id IN ({placeholders}) AND timestamp BETWEEN %s AND %s",
+                       (*user_ids, start_date, end_date))
+        results = cursor.fetchall()
+        return list(results) if results else []
@@ -12,7 +12,7 @@ class UserRepository:
         #self.create_user_groups_table()
         #self.create_avatars_table()
         #self.create_users_table()
-        self.create_root_user()
+        #self.create_root_user()
         # self.create_avatars()
 
     def create_avatars_table(self):
@@ -4,11 +4,13 @@ import pymysql
 import pytz
 
 from enums.TimeFrame import TimeFrame
+from repositories.SessionHeartbeat import SessionHeartbeat, shared_session_heartbeat
 
 
 class UserSessionRepository:
-    def __init__(self, connection):
+    def __init__(self, connection, session_heartbeat: SessionHeartbeat = shared_session_heartbeat):
         self.connection = connection
+        self.session_heartbeat = session_heartbeat
         #self.create_sessions_table()
 
     def create_sessions_table(self):
@@ -59,6 +61,10 @@ class UserSessionRepository:
         return session_id, previous_session_id, previous_session_open
 
     def close_session(self, session_id):
+        # Write the session's pending activity first, the close is computed from it
+        self.session_heartbeat.flush(self.connection, [session_id])
+        self.session_heartbeat.forget(session_id)
+
         cursor = self.connection.cursor()
         # Update the close_session_time, calculate session_duration, and set is_open to FALSE
         update_session_query = """
@@ -87,6 +93,10 @@ class UserSessionRepository:
         return session_duration
 
     def get_last_activity_time(self, session_id):
+        last_activity_time = self.session_heartbeat.get_last_activity_time(session_id)
+        if last_activity_time is not None:
+            return last_activity_time
+
         cursor = self.connection.cursor()
         get_activity_time_query = """
             SELECT last_activity_time
@@ -99,15 +109,11 @@ class UserSessionRepository:
         return result[0] if result else None
 
     def update_last_activity_time(self, session_id):
-        cursor = self.connection.cursor()
-        update_activity_time_query = """
-            UPDATE user_sessions
-            SET last_activity_time = CURRENT_TIMESTAMP,
-                session_duration = TIMESTAMPDIFF(SECOND, open_session_time, CURRENT_TIMESTAMP)
-            WHERE session_id = %s;
         """
-        cursor.execute(update_activity_time_query, (session_id,))
-        self.connection.commit()
+        Record activity for the session. The time is kept in memory and written
+        with the other active sessions in a batch, see SessionHeartbeat.
+        """
+        self.session_heartbeat.beat(self.connection, session_id)
 
     def is_session_open(self, session_id):
         cursor = self.connection.cursor()
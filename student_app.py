@@ -2,7 +2,7 @@ from portals.StudentPortal import StudentPortal
 
 
 def main():
-    student_portal = StudentPortal()
+    student_portal = StudentPortal.get_session_portal()
     student_portal.start(register=True)
 
 
@@ -0,0 +1,161 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import streamlit as st
+
+from components.AssetSync import AssetSync
+from components.InstanceMonitor import shared_instance_monitor
+from repositories.AppInstanceRepository import AppInstanceRepository
+from repositories.CatalogCache import CatalogCache
+from repositories.DatabaseManager import DatabaseManager
+from repositories.StorageRepository import StorageRepository
+
+STUDENT_APP = 'student_app.py'
+WORKER_RESTART_DELAY = 5  # Seconds before a worker that exited is started again
+SUPERVISOR_POLL_INTERVAL = 1  # Seconds between checks of the worker processes
+
+
+class StudentWorker:
+    """A student_app.py process serving one port, restarted whenever it exits."""
+
+    def __init__(self, worker_id, port, url, cache_dir):
+        self.worker_id = worker_id
+        self.port = port
+        self.url = url
+        self.cache_dir = cache_dir
+        self.process = None
+        self.exited_at = None
+
+    def get_command(self):
+        return [sys.executable, os.path.abspath(__file__), '--worker-port', str(self.port)]
+
+    def get_env(self):
+        env = dict(os.environ)
+        env['APP_INSTANCE_URL'] = self.url
+        env['APP_CACHE_DIR'] = self.cache_dir
+        return env
+
+    def start(self):
+        print(f"Starting student worker {self.worker_id} on port {self.port} ({self.url}).")
+        self.process = subprocess.Popen(self.get_command(), env=self.get_env())
+        self.exited_at = None
+
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def restart_if_exited(self):
+        if self.is_running():
+            return
+        now = time.monotonic()
+        if self.exited_at is None:
+            self.exited_at = now
+            print(f"Student worker {self.worker_id} exited with code {self.process.returncode}.")
+        elif now - self.exited_at >= WORKER_RESTART_DELAY:
+            self.start()
+
+    def stop(self):
+        if self.is_running():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the student portal as several worker processes.")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--base-port', type=int, default=8501)
+    parser.add_argument('--url-template', default='http://localhost:{port}/',
+                        help="Public URL of a worker, formatted with its port and worker id.")
+    parser.add_argument('--cache-dir', default='.app_cache',
+                        help="Local directory the workers share assets, catalog snapshots and models through.")
+    parser.add_argument('--worker-port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_port:
+        # Started by the supervisor, the environment is already set
+        run_worker(args.worker_port)
+        return
+
+    set_env()
+    cache_dir = os.path.abspath(args.cache_dir)
+    workers = []
+    for worker_id in range(1, args.workers + 1):
+        port = args.base_port + worker_id - 1
+        workers.append(StudentWorker(worker_id, port, args.url_template.format(port=port, worker_id=worker_id),
+                                     cache_dir))
+
+    warm_up(cache_dir)
+    register_workers(workers)
+    for worker in workers:
+        worker.start()
+
+    try:
+        supervise(workers)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            worker.stop()
+
+
+def warm_up(cache_dir):
+    """
+    Fill the shared cache directory before the workers start, so none of them
+    downloads the assets or queries the catalog on its first render.
+    """
+    database_manager = DatabaseManager()
+    try:
+        CatalogCache(snapshot_dir=cache_dir).get(database_manager.connection)
+    except Exception as e:
+        print(f"Error while warming up the catalog snapshot: {e}")
+    finally:
+        database_manager.close()
+    AssetSync(local_root=cache_dir).sync(StorageRepository('melodymaster'))
+
+
+def register_workers(workers):
+    # Only adds missing instances. The heartbeat comes from the workers
+    # themselves, so a hung worker goes stale even though its process is alive.
+    database_manager = DatabaseManager()
+    try:
+        AppInstanceRepository(database_manager.connection).register_instances([worker.url for worker in workers])
+    except Exception as e:
+        print(f"Error while registering the student workers: {e}")
+    finally:
+        database_manager.close()
+
+
+def supervise(workers):
+    while True:
+        time.sleep(SUPERVISOR_POLL_INTERVAL)
+        for worker in workers:
+            worker.restart_if_exited()
+
+
+def run_worker(port):
+    """
+    Serve student_app.py in this process. The instance reports its heartbeat
+    from the start, once the server answers on its port, so the load balancer
+    routes to it before it has rendered a page.
+    """
+    from streamlit.web import cli as streamlit_cli
+
+    shared_instance_monitor.start_reporting(f"http://localhost:{port}/_stcore/health")
+    sys.argv = ['streamlit', 'run', STUDENT_APP, '--server.port', str(port), '--server.headless', 'true']
+    sys.exit(streamlit_cli.main())
+
+
+def set_env():
+    env_vars = ['SQL_SERVER', 'SQL_DATABASE', 'SQL_USERNAME', 'SQL_PASSWORD', 'MYSQL_CONNECTION_STRING']
+    for var in env_vars:
+        os.environ[var] = st.secrets[var]
+    os.environ["GOOGLE_APP_CRED"] = st.secrets["GOOGLE_APPLICATION_CREDENTIALS"]
+
+
+if __name__ == "__main__":
+    main()
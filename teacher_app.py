@@ -2,7 +2,7 @@ from portals.TeacherPortal import TeacherPortal
 
 
 def main():
-    teacher_portal = TeacherPortal()
+    teacher_portal = TeacherPortal.get_session_portal()
     teacher_portal.start()
 
 
@@ -3,7 +3,7 @@ from portals.TenantPortal import TenantPortal
 
 def main():
     try:
-        tenant_portal = TenantPortal()
+        tenant_portal = TenantPortal.get_session_portal()
         tenant_portal.start()
     except Exception as e:
         print("An error has occurred: {}".format(e))
@@ -0,0 +1,85 @@
+"""
+Cold-start guard for the app entry points.
+
+Each entry point is imported in a fresh interpreter with ``python -X importtime``.
+The tests fail if one loads a heavy dependency that should only be imported on
+first use, or if its import takes longer than the budget. Run this module
+directly for a report of the slowest imports of every entry point:
+
+    PYTHONPATH=. python tests/benchmarks/ImportTime_test.py
+"""
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Imported on first use only: the LLM client, audio processing and model training
+LAZY_MODULES = ['langchain', 'librosa', 'fastdtw', 'scipy', 'sklearn', 'statsmodels', 'seaborn', 'matplotlib']
+ENTRY_POINTS = ['admin_app', 'tenant_app', 'load_balancer_app', 'student_app', 'teacher_app']
+# Milliseconds an entry point may take to import; generous, so only regressions fail
+IMPORT_TIME_BUDGET_MS = float(os.environ.get('IMPORT_TIME_BUDGET_MS', 8000))
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def measure_import(module_name):
+    """
+    Import a module in a fresh interpreter.
+
+    :return: Dictionary with the cumulative import time in milliseconds, the
+        top-level packages that were loaded and the (self ms, cumulative ms,
+        module) rows reported by -X importtime.
+    """
+    script = f"import sys; import {module_name}; print(' '.join(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', script],
+                            cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=300)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module_name} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            rows.append((int(self_us) / 1000, int(cumulative_us) / 1000, name))
+
+    cumulative_ms = next(cumulative for _, cumulative, name in rows if name == module_name)
+    return {
+        'cumulative_ms': cumulative_ms,
+        'packages': set(result.stdout.split()),
+        'rows': rows,
+    }
+
+
+@pytest.fixture(scope='module', params=ENTRY_POINTS)
+def entry_point_import(request):
+    return request.param, measure_import(request.param)
+
+
+def test_entry_point_does_not_load_lazy_modules(entry_point_import):
+    entry_point, measurement = entry_point_import
+    loaded = sorted(set(LAZY_MODULES) & measurement['packages'])
+    assert loaded == [], f"{entry_point} imports {loaded} at startup"
+
+
+def test_entry_point_import_time_within_budget(entry_point_import):
+    entry_point, measurement = entry_point_import
+    assert measurement['cumulative_ms'] <= IMPORT_TIME_BUDGET_MS, \
+        f"Importing {entry_point} took {measurement['cumulative_ms']:.0f} ms"
+
+
+def print_report(top=10):
+    for entry_point in ENTRY_POINTS:
+        measurement = measure_import(entry_point)
+        print(f"{entry_point}: {measurement['cumulative_ms']:.0f} ms")
+        for self_ms, cumulative_ms, name in sorted(measurement['rows'], reverse=True)[:top]:
+            print(f"    {self_ms:8.1f} ms self {cumulative_ms:8.1f} ms cumulative  {name}")
+
+
+if __name__ == "__main__":
+    print_report()
@@ -0,0 +1,44 @@
+import pytest
+
+from components.AssessmentGenerator import AssessmentGenerator
+from components.FakeLLM import FakeLLM
+
+
+class TestAssessmentGenerator:
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        AssessmentGenerator.clear_cache()
+        yield
+        AssessmentGenerator.clear_cache()
+
+    def test_generate_returns_response_per_key(self):
+        llm = FakeLLM()
+
+        results = AssessmentGenerator(llm).generate({1: "prompt one", 2: "prompt two"})
+
+        assert set(results) == {1, 2}
+        assert results[1] == llm("prompt one")
+
+    def test_generate_reuses_cached_responses(self):
+        llm = FakeLLM()
+        AssessmentGenerator(llm).generate({1: "prompt one"})
+
+        AssessmentGenerator(llm).generate({1: "prompt one", 2: "prompt two"})
+
+        assert llm.prompts == ["prompt one", "prompt two"]
+
+    def test_generate_retries_failed_calls(self):
+        llm = FakeLLM(failures=2)
+
+        results = AssessmentGenerator(llm, max_retries=2, retry_delay=0).generate({1: "prompt"})
+
+        assert 1 in results
+        assert len(llm.prompts) == 3
+
+    def test_generate_leaves_out_keys_that_keep_failing(self):
+        llm = FakeLLM(failures=10)
+
+        results = AssessmentGenerator(llm, max_retries=1, retry_delay=0).generate({1: "prompt"})
+
+        assert results == {}
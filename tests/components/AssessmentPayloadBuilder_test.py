@@ -0,0 +1,48 @@
+from datetime import datetime
+from decimal import Decimal
+
+from components.AssessmentPayloadBuilder import AssessmentPayloadBuilder
+
+
+def test_build_aggregates_activity():
+    recordings = [
+        {'track_name': 'Varnam', 'duration': 120, 'score': Decimal('8.50'), 'teacher_remarks': 'Good gamakas'},
+        {'track_name': 'Kriti', 'duration': 60, 'score': Decimal('7.50'), 'teacher_remarks': None},
+    ]
+    practice_logs = [
+        {'timestamp': datetime(2024, 5, 6, 7, 0), 'minutes': 20},
+        {'timestamp': datetime(2024, 5, 6, 19, 0), 'minutes': 25},
+        {'timestamp': datetime(2024, 5, 7, 7, 0), 'minutes': 30},
+    ]
+    achievements = [{'badge': 'First Note'}, {'badge': '2 Day Streak'}, {'badge': '2 Day Streak'}]
+
+    payload = AssessmentPayloadBuilder().build(recordings, practice_logs, achievements)
+
+    assert payload['practice_minutes'] == 75
+    assert payload['max_daily_practice_minutes'] == 45
+    assert payload['practice_days'] == 2
+    assert payload['recordings'] == 2
+    assert payload['recording_minutes'] == 3.0
+    assert payload['average_score'] == 8.0
+    assert payload['badges_earned'] == 3
+    assert payload['badges'] == {'First Note': 1, '2 Day Streak': 2}
+    assert payload['remarks'] == ['Varnam: Good gamakas']
+
+
+def test_remarks_are_deduplicated_and_fit_the_budget():
+    recordings = [{'track_name': 'Varnam', 'teacher_remarks': 'Keep  the tempo steady'}] * 20 + [
+        {'track_name': f'Track {i}', 'teacher_remarks': 'word ' * 100 + str(i)} for i in range(20)]
+    builder = AssessmentPayloadBuilder(remarks_token_budget=100, max_remark_tokens=30)
+
+    remarks = builder.get_remarks(recordings)
+
+    assert remarks[0] == 'Varnam: Keep the tempo steady'
+    assert remarks[1].endswith('…')
+    assert sum(builder.estimate_tokens(remark) for remark in remarks) <= 100
+
+
+def test_payload_size_grows_with_payload():
+    small = AssessmentPayloadBuilder.get_payload_size({'remarks': []})
+    large = AssessmentPayloadBuilder.get_payload_size({'remarks': ['x' * 400]})
+
+    assert large['tokens'] - small['tokens'] >= 100
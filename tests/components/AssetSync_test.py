@@ -0,0 +1,115 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from components.AssetSync import AssetSync
+from enums.SoundEffect import SoundEffect
+
+ASSETS = {
+    'badges/First Note.png': b'first note badge',
+    'avatars/avatar 1.png': b'avatar one',
+    'sound effects/notification.mp3': b'ding',
+}
+
+
+@pytest.fixture
+def storage_repo():
+    repo = MagicMock()
+    repo.get_manifest.side_effect = lambda directory: [
+        {'name': name, 'md5_hash': AssetSync.get_checksum(data), 'size': len(data)}
+        for name, data in ASSETS.items() if name.startswith(f"{directory}/")
+    ]
+    repo.download_blob_by_name.side_effect = lambda name: ASSETS[name]
+    return repo
+
+
+@pytest.fixture
+def asset_sync(tmp_path):
+    return AssetSync(local_root=str(tmp_path), max_workers=2)
+
+
+def test_sync_downloads_missing_assets_and_indexes_them(asset_sync, storage_repo, tmp_path):
+    asset_sync.sync(storage_repo)
+
+    assert storage_repo.download_blob_by_name.call_count == 3
+    badge_path = asset_sync.get_badge('First Note')
+    assert badge_path == str(tmp_path / 'badges' / 'First Note.png')
+    with open(badge_path, 'rb') as f:
+        assert f.read() == b'first note badge'
+    assert asset_sync.get_avatar('avatar 1') == str(tmp_path / 'avatars' / 'avatar 1.png')
+    assert asset_sync.get_sound_effect(SoundEffect.NOTIFICATION) == \
+        str(tmp_path / 'sound effects' / 'notification.mp3')
+
+
+def test_sync_runs_once_and_skips_current_files(asset_sync, storage_repo, tmp_path):
+    (tmp_path / 'badges').mkdir()
+    (tmp_path / 'badges' / 'First Note.png').write_bytes(b'first note badge')
+    (tmp_path / 'avatars').mkdir()
+    (tmp_path / 'avatars' / 'avatar 1.png').write_bytes(b'outdated avatar')
+
+    asset_sync.sync(storage_repo)
+    asset_sync.sync(storage_repo)
+
+    downloaded = [call.args[0] for call in storage_repo.download_blob_by_name.call_args_list]
+    assert sorted(downloaded) == ['avatars/avatar 1.png', 'sound effects/notification.mp3']
+    assert storage_repo.get_manifest.call_count == 3
+    assert (tmp_path / 'avatars' / 'avatar 1.png').read_bytes() == b'avatar one'
+
+
+def test_sync_skips_assets_failing_checksum(asset_sync, storage_repo, tmp_path):
+    storage_repo.download_blob_by_name.side_effect = lambda name: b'corrupted'
+
+    asset_sync.sync(storage_repo)
+
+    assert asset_sync.index == {}
+    assert not (tmp_path / 'badges' / 'First Note.png').exists()
+
+
+def test_get_path_downloads_unindexed_asset_once(asset_sync, storage_repo):
+    asset_sync.sync(storage_repo)
+    storage_repo.download_blob_by_name.reset_mock()
+    storage_repo.download_blob_by_name.side_effect = Exception("Not found")
+
+    assert asset_sync.get_badge('Unknown') is None
+    assert asset_sync.get_badge('Unknown') is None
+    storage_repo.download_blob_by_name.assert_called_once_with('badges/Unknown.png')
+
+
+def test_get_path_retries_failed_download_after_interval(asset_sync, storage_repo):
+    asset_sync.sync(storage_repo)
+    storage_repo.download_blob_by_name.side_effect = Exception("Not found")
+    assert asset_sync.get_badge('Late Upload') is None
+
+    asset_sync.misses['badges/Late Upload.png'] -= asset_sync.miss_retry_interval
+    storage_repo.download_blob_by_name.side_effect = lambda name: b'late upload badge'
+
+    assert asset_sync.get_badge('Late Upload').endswith('Late Upload.png')
+
+
+def test_sync_survives_asset_write_errors(asset_sync, storage_repo, tmp_path):
+    assets = dict(ASSETS, **{'badges/seasonal/Winter.png': b'winter badge'})
+    storage_repo.get_manifest.side_effect = lambda directory: [
+        {'name': name, 'md5_hash': AssetSync.get_checksum(data), 'size': len(data)}
+        for name, data in assets.items() if name.startswith(f"{directory}/")
+    ]
+    storage_repo.download_blob_by_name.side_effect = lambda name: assets[name]
+    # A file where the avatars folder should be makes writing the avatar fail
+    (tmp_path / 'avatars').write_bytes(b'')
+
+    asset_sync.sync(storage_repo)
+
+    assert asset_sync.synced
+    winter_badge_path = str(tmp_path / 'badges' / 'seasonal' / 'Winter.png')
+    assert asset_sync.get_path('badges/seasonal', 'Winter.png') == winter_badge_path
+    assert 'avatars/avatar 1.png' not in asset_sync.index
+
+
+def test_sync_falls_back_to_local_files_without_manifest(asset_sync, storage_repo, tmp_path):
+    storage_repo.get_manifest.side_effect = Exception("Offline")
+    (tmp_path / 'badges').mkdir()
+    (tmp_path / 'badges' / 'First Note.png').write_bytes(b'first note badge')
+
+    asset_sync.sync(storage_repo)
+
+    assert asset_sync.get_badge('First Note') == str(tmp_path / 'badges' / 'First Note.png')
+    storage_repo.download_blob_by_name.assert_not_called()
@@ -0,0 +1,69 @@
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from components.HyperparameterTuner import HyperparameterTuner
+from enums.LearningModels import LearningModels
+
+
+@pytest.fixture
+def score_prediction_model_repo():
+    rng = np.random.default_rng(0)
+    n = 60
+    repo = MagicMock()
+    repo.get_training_arrays.return_value = {
+        'level': rng.integers(1, 5, n).astype(np.float32),
+        'offset': rng.normal(size=n).astype(np.float32),
+        'duration': rng.uniform(20, 60, n).astype(np.float32),
+        'distance': rng.uniform(0, 1, n).astype(np.float32),
+        'score': rng.uniform(0, 10, n).astype(np.float32),
+    }
+    return repo
+
+
+def test_get_candidate_params_uses_grid_when_small():
+    candidates = HyperparameterTuner.get_candidate_params(LearningModels.KNNPredictionModel, 20)
+    assert len(candidates) == 10
+
+    candidates = HyperparameterTuner.get_candidate_params(
+        LearningModels.RandomForestRegressorScorePredictionModel, 5)
+    assert len(candidates) == 5
+
+
+def test_objective_penalizes_inference_cost():
+    assert HyperparameterTuner.get_objective(1.0, 10) < HyperparameterTuner.get_objective(1.0, 1000)
+
+
+def test_tune_records_every_trial_and_stores_best(score_prediction_model_repo):
+    model_performance_repo = MagicMock()
+    model_performance_repo.record_tuning_trial.side_effect = range(1, 100)
+    tuner = HyperparameterTuner(score_prediction_model_repo, model_performance_repo)
+
+    best_trials = tuner.tune([LearningModels.DecisionTreeScorePredictionModel], trials_per_model=4,
+                             time_budget=60, max_workers=2)
+
+    assert model_performance_repo.record_tuning_trial.call_count == 4
+    model_name = LearningModels.DecisionTreeScorePredictionModel.name
+    best = best_trials[model_name]
+    model_performance_repo.save_best_params.assert_called_once_with(
+        model_name, best['params'], best['objective'], best['model_performance_id'])
+
+
+def slow_trial(model_name, params, features, target):
+    time.sleep(60)
+
+
+def test_tune_stops_running_trials_at_time_budget(score_prediction_model_repo, monkeypatch):
+    monkeypatch.setattr('components.HyperparameterTuner.run_trial', slow_trial)
+    model_performance_repo = MagicMock()
+    tuner = HyperparameterTuner(score_prediction_model_repo, model_performance_repo)
+
+    start = time.monotonic()
+    best_trials = tuner.tune([LearningModels.DecisionTreeScorePredictionModel], trials_per_model=4,
+                             time_budget=1, max_workers=2)
+
+    assert time.monotonic() - start < 10
+    assert best_trials == {}
+    model_performance_repo.record_tuning_trial.assert_not_called()
@@ -0,0 +1,41 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+from components.InstanceMonitor import InstanceMonitor
+
+
+def test_p95_render_ms_and_active_sessions():
+    monitor = InstanceMonitor()
+    for i in range(100):
+        monitor.record_render(i % 3, (i + 1) / 1000)
+
+    assert monitor.get_p95_render_ms() == 96
+    assert monitor.get_active_sessions() == 3
+
+
+def test_reporting_thread_reports_once_server_is_serving(monkeypatch):
+    serving = threading.Event()
+    monkeypatch.setattr(InstanceMonitor, 'is_serving', staticmethod(lambda health_url: serving.is_set()))
+    database_manager = MagicMock()
+    reported = threading.Event()
+    cursor = database_manager.connection.cursor.return_value
+    cursor.execute.side_effect = lambda *args: reported.set()
+    monitor = InstanceMonitor(report_interval=3600, connection_factory=lambda: database_manager)
+    monitor.record_render('session', 0.25)
+
+    assert monitor.start_reporting('http://localhost:8501/_stcore/health', 'https://instance-1/')
+    time.sleep(0.2)
+    cursor.execute.assert_not_called()
+
+    serving.set()
+    assert reported.wait(5)
+    assert cursor.execute.call_args[0][1] == ('https://instance-1/', 1, 250)
+
+
+def test_reporting_is_disabled_without_instance_url(monkeypatch):
+    monkeypatch.delenv('APP_INSTANCE_URL', raising=False)
+    monitor = InstanceMonitor()
+
+    assert not monitor.start_reporting('http://localhost:8501/_stcore/health')
+    assert monitor.thread is None
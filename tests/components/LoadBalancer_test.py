@@ -0,0 +1,63 @@
+import random
+from unittest.mock import MagicMock
+
+import pytest
+
+from components.LoadBalancer import LoadBalancer
+
+
+def instance(instance_id, heartbeat_age=10):
+    return {'id': instance_id, 'url': f'https://instance-{instance_id}/', 'heartbeat_age': heartbeat_age,
+            'active_sessions': 0, 'p95_render_ms': 200, 'last_used': None}
+
+
+@pytest.fixture
+def app_instance_repo():
+    repo = MagicMock()
+    repo.claim_instance.side_effect = lambda ids, default_render_ms: {'id': ids[0] if ids else 0, 'url': ''}
+    return repo
+
+
+def test_claim_samples_two_healthy_instances(app_instance_repo):
+    app_instance_repo.get_instances.return_value = [
+        instance(1, heartbeat_age=600), instance(2, heartbeat_age=None), instance(3), instance(4), instance(5)]
+
+    LoadBalancer(rng=random.Random(0)).claim(app_instance_repo)
+
+    candidate_ids = app_instance_repo.claim_instance.call_args[0][0]
+    assert len(candidate_ids) == 2
+    assert set(candidate_ids) <= {3, 4, 5}
+
+
+def test_claim_returns_pinned_instance_while_healthy(app_instance_repo):
+    app_instance_repo.get_instances.return_value = [instance(1), instance(2), instance(3)]
+
+    assert LoadBalancer().claim(app_instance_repo, pinned_instance_id=1)['id'] == 1
+    app_instance_repo.claim_instance.assert_called_once_with([1], 500)
+
+
+def test_claim_ignores_stale_pinned_instance(app_instance_repo):
+    app_instance_repo.get_instances.return_value = [instance(1, heartbeat_age=600), instance(2)]
+
+    assert LoadBalancer().claim(app_instance_repo, pinned_instance_id=1)['id'] == 2
+
+
+def test_claim_falls_back_to_all_instances_without_heartbeats(app_instance_repo):
+    app_instance_repo.get_instances.return_value = [instance(1, heartbeat_age=None), instance(2, heartbeat_age=None)]
+
+    LoadBalancer().claim(app_instance_repo)
+
+    app_instance_repo.claim_instance.assert_called_once_with(None, 500)
+
+
+def test_claim_stays_among_healthy_instances_when_claims_fail(app_instance_repo):
+    app_instance_repo.get_instances.return_value = [
+        instance(1, heartbeat_age=None), instance(2), instance(3), instance(4)]
+    app_instance_repo.claim_instance.side_effect = None
+    app_instance_repo.claim_instance.return_value = None
+
+    assert LoadBalancer(rng=random.Random(0)).claim(app_instance_repo) is None
+
+    claimed_ids = [call[0][0] for call in app_instance_repo.claim_instance.call_args_list]
+    assert None not in claimed_ids
+    assert claimed_ids[-1] == [2, 3, 4]
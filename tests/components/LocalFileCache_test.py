@@ -0,0 +1,46 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from components.LocalFileCache import LocalFileCache
+
+
+def test_write_atomically_creates_directories_and_leaves_no_temp_file(tmp_path):
+    path = tmp_path / 'models' / 'model.joblib'
+
+    LocalFileCache.write_atomically(str(path), b'model')
+
+    assert path.read_bytes() == b'model'
+    assert os.listdir(str(tmp_path / 'models')) == ['model.joblib']
+
+
+def test_write_atomically_keeps_previous_file_when_write_fails(tmp_path):
+    path = tmp_path / 'catalog.pickle'
+    path.write_bytes(b'old')
+
+    with patch('components.LocalFileCache.os.replace', side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            LocalFileCache.write_atomically(str(path), b'new')
+
+    assert path.read_bytes() == b'old'
+    assert os.listdir(str(tmp_path)) == ['catalog.pickle']
+
+
+def test_prune_keeps_most_recent_matching_files(tmp_path):
+    for i in range(4):
+        path = tmp_path / f"model.joblib.{i}"
+        path.write_bytes(b'model')
+        os.utime(str(path), (i, i))
+    (tmp_path / 'other.joblib.0').write_bytes(b'other')
+    (tmp_path / 'model.joblib.9.123.456.tmp').write_bytes(b'partial')
+
+    removed = LocalFileCache.prune(str(tmp_path), keep=2, prefix='model.joblib.')
+
+    assert sorted(os.path.basename(path) for path in removed) == ['model.joblib.0', 'model.joblib.1']
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'model.joblib.2', 'model.joblib.3', 'model.joblib.9.123.456.tmp', 'other.joblib.0']
+
+
+def test_prune_ignores_missing_directory(tmp_path):
+    assert LocalFileCache.prune(str(tmp_path / 'missing'), keep=1) == []
@@ -0,0 +1,20 @@
+import numpy as np
+
+from components.ModelDiagnosticsDisplay import ModelDiagnosticsDisplay
+
+
+def test_downsample_keeps_all_points_below_limit():
+    display = ModelDiagnosticsDisplay(max_points=10)
+    np.testing.assert_array_equal(display.downsample(list(range(5)), set()), np.arange(5))
+
+
+def test_downsample_caps_points_and_keeps_influential_ids():
+    display = ModelDiagnosticsDisplay(max_points=50)
+    ids = list(range(1000, 2000))
+
+    indices = display.downsample(ids, {1999, 1500})
+
+    assert len(indices) <= 50
+    assert 999 in indices
+    assert 500 in indices
+    assert np.all(np.diff(indices) > 0)
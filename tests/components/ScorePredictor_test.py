@@ -0,0 +1,98 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from sklearn.ensemble import RandomForestRegressor
+
+from components.ScorePredictor import ScorePredictor
+from models.CompactTreeEnsemble import CompactTreeEnsemble
+
+
+@pytest.fixture
+def training_data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(50, 4)), columns=['level', 'offset', 'duration', 'distance'])
+    y = pd.Series(X.sum(axis=1) + rng.normal(scale=0.5, size=50))
+    ids = pd.Series(np.arange(100, 150))
+    return X, y, ids
+
+
+def test_influence_diagnostics_match_statsmodels(training_data):
+    X, y, ids = training_data
+    influence = sm.OLS(y, sm.add_constant(X)).fit().get_influence()
+
+    diagnostics = ScorePredictor.compute_influence_diagnostics(X, y, ids)
+
+    np.testing.assert_allclose(diagnostics['leverage'], influence.hat_matrix_diag)
+    np.testing.assert_allclose(diagnostics['cooks_distance'], influence.cooks_distance[0])
+    np.testing.assert_allclose(diagnostics['residuals'], influence.resid)
+
+
+def test_influence_diagnostics_are_cached_per_snapshot(training_data):
+    X, y, ids = training_data
+
+    first = ScorePredictor.get_influence_diagnostics(X, y, ids)
+    second = ScorePredictor.get_influence_diagnostics(X.copy(), y.copy(), ids.copy())
+    changed = ScorePredictor.get_influence_diagnostics(X, y + 1, ids)
+
+    assert first is second
+    assert changed is not first
+
+
+def test_identify_influential_ids(training_data):
+    X, y, ids = training_data
+    y = y.copy()
+    y.iloc[7] += 25
+
+    diagnostics = ScorePredictor.compute_influence_diagnostics(X, y, ids)
+
+    assert 107 in ScorePredictor.identify_influential_ids(diagnostics)
+
+
+def test_diagnostics_artifact_is_json_serializable(training_data):
+    X, y, ids = training_data
+    diagnostics = ScorePredictor.compute_influence_diagnostics(X, y, ids)
+    metrics = ScorePredictor.get_evaluation_metrics(y, y * 0.9)
+
+    artifact = ScorePredictor.build_diagnostics_artifact(
+        'RandomForestRegressorScorePredictionModel', 1, metrics, ids, y * 0.9, y * 0.1,
+        diagnostics, [ids.iloc[0]])
+
+    restored = json.loads(json.dumps(artifact))
+    assert restored['influential_ids'] == [100]
+    assert len(restored['train']['leverage']) == len(X)
+    assert restored['metrics'].keys() == {'mse', 'mae', 'r2'}
+
+
+@patch("components.ScorePredictor.ModelStorageRepository")
+def test_predict_score_uses_cached_compact_model(mock_storage_class, training_data):
+    X, y, ids = training_data
+    model = RandomForestRegressor(n_estimators=5, random_state=0).fit(X, y)
+    mock_storage = mock_storage_class.return_value
+    mock_storage.load_compact_model.return_value = CompactTreeEnsemble.from_model(model)
+    score_predictor = ScorePredictor(MagicMock(), MagicMock(), MagicMock(), "compact-test-bucket")
+
+    scores = [score_predictor.predict_score(*X.iloc[0]) for _ in range(3)]
+
+    expected = round(max(0, min(model.predict(X.iloc[:1])[0], 10)), 2)
+    assert scores == [expected] * 3
+    mock_storage.load_compact_model.assert_called_once()
+    mock_storage.load_model.assert_not_called()
+
+
+@patch("components.ScorePredictor.COMPACT_MODEL_VERSION_CHECK_INTERVAL", 0)
+@patch("components.ScorePredictor.ModelStorageRepository")
+def test_get_compact_model_reloads_retrained_model(mock_storage_class):
+    mock_storage = mock_storage_class.return_value
+    mock_storage.get_compact_model_version.side_effect = ['md5-1', 'md5-1', None, 'md5-2']
+    mock_storage.load_compact_model.side_effect = ['model-1', 'model-2']
+    score_predictor = ScorePredictor(MagicMock(), MagicMock(), MagicMock(), "retrain-test-bucket")
+
+    models = [score_predictor.get_compact_model('generic') for _ in range(4)]
+
+    # An unreadable version keeps the loaded copy, a new one loads the retrained model
+    assert models == ['model-1', 'model-1', 'model-1', 'model-2']
+    assert mock_storage.load_compact_model.call_count == 2
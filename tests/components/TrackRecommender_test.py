@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from components.TrackRecommender import TrackRecommender
+
+
+@pytest.fixture
+def recording_repo():
+    repo = MagicMock()
+    repo.get_track_statistics_by_user.return_value = [
+        {'track_id': 1, 'max_score': 6, 'earliest_recording_date': datetime.now() - timedelta(days=3),
+         'latest_recording_date': datetime.now()}
+    ]
+    repo.get_average_track_scores_by_user.return_value = [{'track_id': 1, 'avg_score': 5}]
+    repo.get_latest_recording_remarks_by_user.return_value = [{'track_id': 1, 'latest_remarks': 'Good'}]
+    repo.get_all_track_statistics.return_value = [
+        {'track_id': track_id, 'name': f'Track {track_id}', 'level': 1, 'ordering_rank': track_id,
+         'recommendation_threshold_score': 7, 'max_score': 8}
+        for track_id in range(1, 50)
+    ]
+    repo.get_average_track_scores.return_value = [{'track_id': 1, 'avg_score': 6}]
+    repo.get_first_recommendation_dates.return_value = {2: datetime.now() - timedelta(days=10)}
+    return repo
+
+
+def test_recommend_tracks_uses_set_based_queries(recording_repo):
+    recommender = TrackRecommender(recording_repo, MagicMock())
+
+    recommendations = recommender.recommend_tracks(42)
+
+    assert [track['track_id'] for track in recommendations] == [1, 2, 3, 4, 5]
+    assert recommendations[0]['days_on_track'] == 3
+    assert recommendations[1]['days_on_track'] == 10
+    assert recommendations[0]['last_remark'] == 'Good'
+    recording_repo.get_first_recommendation_date.assert_not_called()
+    recording_repo.add_user_track_recommendation.assert_not_called()
+    recording_repo.add_user_track_recommendations.assert_called_once()
+    new_recommendations = recording_repo.add_user_track_recommendations.call_args[0][0]
+    assert [(user_id, track_id) for user_id, track_id, _ in new_recommendations] == [
+        (42, 1), (42, 3), (42, 4), (42, 5)]
+
+
+def test_recommend_tracks_skips_insert_when_all_known(recording_repo):
+    recording_repo.get_first_recommendation_dates.return_value = {
+        track_id: datetime.now() for track_id in range(1, 50)}
+    recommender = TrackRecommender(recording_repo, MagicMock())
+
+    recommender.recommend_tracks(42)
+
+    recording_repo.add_user_track_recommendations.assert_not_called()
+
+
+@pytest.fixture
+def group_recording_repo(recording_repo):
+    recording_repo.get_all_track_statistics.return_value = [
+        {'track_id': track_id, 'name': f'Track {track_id}', 'level': (track_id + 1) // 2,
+         'ordering_rank': track_id, 'recommendation_threshold_score': Decimal('7.00'), 'max_score': 8}
+        for track_id in range(1, 9)
+    ]
+    # User 1 has mastered tracks 1-3, user 2 tracks 1-5, user 3 nothing
+    recording_repo.get_average_track_scores_by_users.return_value = (
+        [{'user_id': 1, 'track_id': track_id, 'avg_score': Decimal('8.5')} for track_id in range(1, 4)] +
+        [{'user_id': 2, 'track_id': track_id, 'avg_score': Decimal('9.0')} for track_id in range(1, 6)] +
+        [{'user_id': 2, 'track_id': 6, 'avg_score': Decimal('3.0')}]
+    )
+    recording_repo.get_track_statistics_by_users.return_value = [
+        {'user_id': 2, 'track_id': 6, 'earliest_recording_date': datetime.now() - timedelta(days=4)}
+    ]
+    recording_repo.get_first_recommendation_dates_by_users.return_value = [
+        {'user_id': 1, 'track_id': 4, 'first_recommended_on': datetime.now() - timedelta(days=9)}
+    ]
+    return recording_repo
+
+
+@pytest.fixture
+def user_repo():
+    repo = MagicMock()
+    repo.get_users_by_group.return_value = [{'user_id': 1}, {'user_id': 2}, {'user_id': 3}]
+    return repo
+
+
+def test_recommend_tracks_for_users(group_recording_repo, user_repo):
+    recommender = TrackRecommender(group_recording_repo, user_repo)
+
+    recommendations = recommender.recommend_tracks_for_users([1, 2, 3])
+
+    assert [track['track_id'] for track in recommendations[1]] == [4, 5, 6, 7, 8]
+    assert [track['track_id'] for track in recommendations[2]] == [6, 7, 8]
+    assert [track['track_id'] for track in recommendations[3]] == [1, 2, 3, 4, 5]
+    assert recommendations[1][0]['days_on_track'] == 9
+    assert recommendations[2][0]['days_on_track'] == 4
+    group_recording_repo.add_user_track_recommendations.assert_called_once()
+    new_recommendations = group_recording_repo.add_user_track_recommendations.call_args[0][0]
+    # Tracks already known or beyond the fifth recommendation are not persisted
+    assert [(user_id, track_id) for user_id, track_id, _ in new_recommendations] == (
+        [(1, track_id) for track_id in (1, 2, 3, 5, 6, 7, 8)] +
+        [(2, track_id) for track_id in range(1, 9)] +
+        [(3, track_id) for track_id in range(1, 6)])
+
+
+def test_get_group_recommendations_shares_one_computation(group_recording_repo, user_repo):
+    recommender = TrackRecommender(group_recording_repo, user_repo)
+
+    group_recommendations = recommender.get_group_recommendations(10)
+
+    assert group_recording_repo.get_all_track_statistics.call_count == 1
+    # Ties in frequency keep the order in which tracks were first recommended
+    assert group_recommendations['common_tracks'][0] == {'name': 'Track 4', 'level': 2, 'ordering_rank': 4}
+    assert [(track['level'], track['ordering_rank']) for track in group_recommendations['advanced_tracks']] == [
+        (4, 8), (4, 8), (4, 7), (4, 7), (3, 6)]
+    assert group_recommendations['top_performer_id'] in (1, 2)
+    assert recommender.find_top_performer_in_group(10) == group_recommendations['top_performer_id']
+
+
+def test_group_recommendations_keep_tracks_without_level(group_recording_repo, user_repo):
+    group_recording_repo.get_all_track_statistics.return_value[7]['level'] = None
+    recommender = TrackRecommender(group_recording_repo, user_repo)
+
+    group_recommendations = recommender.get_group_recommendations(10)
+
+    track_8 = next(track for track in group_recommendations['recommendations'][1] if track['track_id'] == 8)
+    assert track_8['level'] is None
+    assert [(track['level'], track['ordering_rank']) for track in group_recommendations['advanced_tracks']] == [
+        (4, 7), (4, 7), (3, 6), (3, 6), (3, 5)]
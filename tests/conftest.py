@@ -0,0 +1,33 @@
+import os
+
+import pymysql
+import pytest
+
+
+@pytest.fixture
+def local_db():
+    """
+    Factory for connections to a scratch MySQL database, e.g.
+    docker run -e MYSQL_ROOT_PASSWORD=... -e MYSQL_DATABASE=... mysql:8
+
+    The test is skipped unless TEST_MYSQL_HOST is set. Connections opened
+    through the factory are closed when the test ends.
+    """
+    if 'TEST_MYSQL_HOST' not in os.environ:
+        pytest.skip("Needs a local MySQL database (TEST_MYSQL_*)")
+
+    connections = []
+
+    def connect():
+        connection = pymysql.connect(host=os.environ['TEST_MYSQL_HOST'],
+                                     port=int(os.environ.get('TEST_MYSQL_PORT', 3306)),
+                                     user=os.environ['TEST_MYSQL_USER'],
+                                     password=os.environ.get('TEST_MYSQL_PASSWORD', ''),
+                                     database=os.environ['TEST_MYSQL_DATABASE'])
+        connections.append(connection)
+        return connection
+
+    yield connect
+    for connection in connections:
+        if connection.open:
+            connection.close()
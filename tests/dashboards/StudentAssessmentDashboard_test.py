@@ -0,0 +1,50 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from components.AssessmentGenerator import AssessmentGenerator
+from components.FakeLLM import FakeLLM
+from dashboards.StudentAssessmentDashboard import StudentAssessmentDashboard
+from enums.TimeFrame import TimeFrame
+
+
+@pytest.fixture
+def dashboard():
+    AssessmentGenerator.clear_cache()
+    repos = {name: MagicMock() for name in [
+        'user_repo', 'recording_repo', 'user_activity_repo', 'user_session_repo', 'user_practice_log_repo',
+        'user_achievement_repo', 'user_assessment_repo', 'portal_repo']}
+    repos['user_repo'].get_users_by_group.return_value = [
+        {'user_id': 1, 'name': 'Asha'}, {'user_id': 2, 'name': 'Ravi'}, {'user_id': 3, 'name': 'Meera'}]
+    repos['user_assessment_repo'].get_assessed_user_ids.return_value = {3}
+    repos['recording_repo'].get_submissions_by_users_and_timeframe.return_value = [
+        {'user_id': 1, 'track_name': 'Varnam', 'score': 8, 'duration': 90, 'teacher_remarks': 'Watch the tempo',
+         'recording_id': 10, 'timestamp': datetime(2024, 5, 6, 18, 30)}]
+    repos['user_practice_log_repo'].get_user_practice_logs_by_users_and_timeframe.return_value = [
+        {'log_id': 5, 'user_id': 2, 'minutes': 30, 'timestamp': datetime(2024, 5, 6, 7, 0)}]
+    repos['user_achievement_repo'].get_user_achievements_by_users_and_timeframe.return_value = []
+    yield StudentAssessmentDashboard(**repos)
+    AssessmentGenerator.clear_cache()
+
+
+def test_get_students_data_builds_payload_per_user(dashboard):
+    data = dashboard.get_students_data([1, 2], TimeFrame.PREVIOUS_WEEK)
+
+    assert data[1]['recordings'] == 1
+    assert data[1]['recording_minutes'] == 1.5
+    assert data[1]['remarks'] == ['Varnam: Watch the tempo']
+    assert data[2]['practice_minutes'] == 30
+    assert data[2]['recordings'] == 0
+
+
+def test_generate_assessments_skips_assessed_users(dashboard):
+    llm = FakeLLM()
+
+    dashboard.generate_assessments(42, llm, TimeFrame.PREVIOUS_WEEK)
+
+    dashboard.recording_repo.get_submissions_by_users_and_timeframe.assert_called_once_with(
+        [1, 2], TimeFrame.PREVIOUS_WEEK)
+    assert len(llm.prompts) == 2
+    created_user_ids = sorted(call.args[0] for call in dashboard.user_assessment_repo.create_assessment.call_args_list)
+    assert created_user_ids == [1, 2]
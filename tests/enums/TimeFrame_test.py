@@ -45,3 +45,18 @@ def test_time_frame_ranges(time_frame, expected_start, expected_end):
     actual_start, actual_end = time_frame.get_date_range()
     assert actual_start == expected_start
     assert actual_end == expected_end
+
+
+@pytest.mark.parametrize("time_frame", [TimeFrame.CURRENT_WEEK, TimeFrame.PREVIOUS_WEEK])
+def test_get_date_bounds_ends_weeks_on_next_monday(time_frame):
+    start_date, end_date = time_frame.get_date_bounds()
+    assert end_date - start_date == datetime.timedelta(days=7)
+    assert end_date.weekday() == 0
+
+
+@pytest.mark.parametrize("time_frame", [TimeFrame.CURRENT_MONTH, TimeFrame.PREVIOUS_MONTH,
+                                        TimeFrame.CURRENT_YEAR, TimeFrame.PREVIOUS_YEAR])
+def test_get_date_bounds_ends_months_and_years_on_next_first_day(time_frame):
+    start_date, end_date = time_frame.get_date_bounds()
+    assert end_date.day == 1 and end_date > start_date
+    assert not isinstance(end_date, datetime.datetime)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+
+from models.CompactTreeEnsemble import CompactTreeEnsemble
+
+
+@pytest.fixture
+def training_data():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.integers(1, 6, 300),
+        rng.normal(3, 1, 300),
+        rng.uniform(20, 60, 300),
+        rng.uniform(0, 1, 300),
+    ])
+    y = X[:, 0] + 5 * X[:, 3] + rng.normal(scale=0.5, size=300)
+    return X, y
+
+
+@pytest.mark.parametrize("model", [
+    DecisionTreeRegressor(random_state=0),
+    RandomForestRegressor(n_estimators=20, random_state=0),
+    GradientBoostingRegressor(n_estimators=30, random_state=0),
+])
+def test_predict_matches_sklearn(model, training_data):
+    X, y = training_data
+    model.fit(X, y)
+    compact = CompactTreeEnsemble.from_model(model)
+
+    np.testing.assert_allclose(compact.predict(X), model.predict(X), rtol=1e-10, atol=1e-10)
+    assert compact.predict(X[0]) == pytest.approx(model.predict(X[:1])[0])
+
+
+def test_round_trip_through_bytes(training_data):
+    X, y = training_data
+    model = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y)
+
+    restored = CompactTreeEnsemble.from_bytes(CompactTreeEnsemble.from_model(model).to_bytes())
+
+    np.testing.assert_allclose(restored.predict(X), model.predict(X), rtol=1e-10, atol=1e-10)
+
+
+def test_supports_only_tree_models(training_data):
+    X, y = training_data
+    assert CompactTreeEnsemble.supports(RandomForestRegressor(n_estimators=2).fit(X, y))
+    assert not CompactTreeEnsemble.supports(LinearRegression().fit(X, y))
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from portals.StudentPortal import StudentPortal
+
+
+def build_portal(connection):
+    # A portal around the given connection, without connecting to Cloud SQL
+    portal = StudentPortal.__new__(StudentPortal)
+    portal.database_manager = SimpleNamespace(connection=connection)
+    return portal
+
+
+def test_end_read_snapshot_rolls_back_session_connection():
+    connection = MagicMock()
+
+    build_portal(connection).end_read_snapshot()
+
+    connection.rollback.assert_called_once()
+    connection.commit.assert_not_called()
+
+
+def test_reused_portal_sees_rows_committed_by_other_connections(local_db):
+    session_connection = local_db()
+    other_connection = local_db()
+    try:
+        with other_connection.cursor() as cursor:
+            cursor.execute("CREATE TABLE IF NOT EXISTS portal_snapshot_test (id INT PRIMARY KEY)")
+            cursor.execute("DELETE FROM portal_snapshot_test")
+        other_connection.commit()
+        portal = build_portal(session_connection)
+
+        # First rerun reads, which opens the session's snapshot
+        portal.end_read_snapshot()
+        with session_connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM portal_snapshot_test")
+            assert cursor.fetchone()[0] == 0
+
+        with other_connection.cursor() as cursor:
+            cursor.execute("INSERT INTO portal_snapshot_test (id) VALUES (1)")
+        other_connection.commit()
+
+        # The next rerun of the same portal sees the committed row
+        portal.end_read_snapshot()
+        with session_connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM portal_snapshot_test")
+            assert cursor.fetchone()[0] == 1
+    finally:
+        session_connection.rollback()
+        with other_connection.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS portal_snapshot_test")
+        other_connection.commit()
@@ -0,0 +1,84 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from enums.ActivityType import ActivityType
+from repositories.ActivitySink import ActivitySink
+from repositories.UserActivityRepository import UserActivityRepository
+
+
+@pytest.fixture
+def database_manager():
+    return MagicMock()
+
+
+@pytest.fixture
+def sink(database_manager):
+    sink = ActivitySink(connection_factory=lambda: database_manager, batch_size=3, flush_interval=0.05)
+    yield sink
+    sink.close()
+
+
+def get_written_batches(database_manager):
+    cursor = database_manager.connection.cursor.return_value.__enter__.return_value
+    return [call.args[1] for call in cursor.executemany.call_args_list]
+
+
+def test_close_drains_queue_in_multi_row_batches(sink, database_manager):
+    for i in range(7):
+        assert sink.log(i, f'session-{i}', 'Play Track', '{}')
+
+    sink.close()
+
+    batches = get_written_batches(database_manager)
+    assert sum(len(batch) for batch in batches) == 7
+    assert max(len(batch) for batch in batches) <= 3
+    assert batches[0][0] == (0, 'session-0', 'Play Track', '{}')
+    metrics = sink.get_metrics()
+    assert metrics['events_written'] == 7
+    assert metrics['queue_depth'] == 0
+    assert metrics['flushes'] == len(batches)
+    database_manager.close.assert_called()
+
+
+def test_log_is_refused_after_close(sink):
+    sink.close()
+
+    assert not sink.log(1, 'session-1', 'Play Track', '{}')
+
+
+def test_failed_flush_is_retried_then_dropped(sink, database_manager):
+    database_manager.connection.commit.side_effect = Exception("Lost connection")
+
+    sink.log(1, 'session-1', 'Play Track', '{}')
+    sink.close()
+
+    metrics = sink.get_metrics()
+    assert metrics['flush_failures'] == sink.max_retries
+    assert metrics['events_dropped'] == 1
+    assert metrics['events_written'] == 0
+
+
+def test_log_activity_writes_directly_when_sink_refuses():
+    connection = MagicMock()
+    activity_sink = MagicMock()
+    activity_sink.log.return_value = False
+    repo = UserActivityRepository(connection, activity_sink)
+
+    repo.log_activity(1, 'session-1', ActivityType.PLAY_TRACK, {'track_name': 'Track'})
+
+    connection.cursor.return_value.execute.assert_called_once()
+    connection.commit.assert_called_once()
+
+
+def test_log_activity_queues_without_touching_the_connection():
+    connection = MagicMock()
+    activity_sink = MagicMock()
+    activity_sink.log.return_value = True
+    repo = UserActivityRepository(connection, activity_sink)
+
+    repo.log_activity(1, 'session-1', ActivityType.PLAY_TRACK)
+
+    activity_sink.log.assert_called_once_with(
+        1, 'session-1', ActivityType.PLAY_TRACK.value, '{"session_id": "session-1"}')
+    connection.cursor.assert_not_called()
@@ -0,0 +1,110 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pymysql
+
+from repositories.AppInstanceRepository import AppInstanceRepository
+
+CLAIM_TEST_URL_PREFIX = 'https://claim-test-'
+
+
+def test_claim_instance_picks_and_updates_in_one_statement():
+    connection = MagicMock()
+    cursor = connection.cursor.return_value
+    cursor.rowcount = 1
+    cursor.fetchone.return_value = (2, 'https://instance-2/')
+
+    instance = AppInstanceRepository(connection).claim_instance([1, 2], 500)
+
+    assert instance == {'id': 2, 'url': 'https://instance-2/'}
+    claim_query, params = cursor.execute.call_args_list[0][0]
+    assert 'LAST_INSERT_ID(id)' in claim_query and 'LIMIT 1' in claim_query
+    assert params == [1, 2, 500]
+    connection.commit.assert_called_once()
+
+
+def test_claim_instance_returns_none_when_nothing_matches():
+    connection = MagicMock()
+    connection.cursor.return_value.rowcount = 0
+
+    assert AppInstanceRepository(connection).claim_instance([7]) is None
+
+
+@patch('repositories.AppInstanceRepository.time.sleep')
+def test_claim_instance_retries_deadlock(mock_sleep):
+    connection = MagicMock()
+    cursor = connection.cursor.return_value
+    cursor.rowcount = 1
+    cursor.execute.side_effect = [pymysql.err.OperationalError(1213, "Deadlock found"), None, None]
+    cursor.fetchone.return_value = (2, 'https://instance-2/')
+
+    instance = AppInstanceRepository(connection).claim_instance([1, 2], 500)
+
+    assert instance == {'id': 2, 'url': 'https://instance-2/'}
+    connection.rollback.assert_called_once()
+    connection.commit.assert_called_once()
+    mock_sleep.assert_called_once()
+
+
+@patch('repositories.AppInstanceRepository.time.sleep')
+def test_claim_instance_gives_up_after_repeated_lock_waits(mock_sleep):
+    connection = MagicMock()
+    connection.cursor.return_value.execute.side_effect = pymysql.err.OperationalError(1205, "Lock wait timeout")
+
+    assert AppInstanceRepository(connection).claim_instance([1, 2], 500) is None
+    assert connection.rollback.call_count == 3
+
+
+def test_claim_instance_does_not_retry_other_errors():
+    connection = MagicMock()
+    connection.cursor.return_value.execute.side_effect = pymysql.err.OperationalError(2013, "Lost connection")
+
+    assert AppInstanceRepository(connection).claim_instance([1, 2], 500) is None
+    connection.cursor.return_value.execute.assert_called_once()
+
+
+def test_register_instances_only_inserts_missing_urls():
+    connection = MagicMock()
+    cursor = connection.cursor.return_value
+
+    AppInstanceRepository(connection).register_instances(['http://localhost:8501/', 'http://localhost:8502/'])
+
+    register_query, params = cursor.executemany.call_args[0]
+    assert 'INSERT IGNORE' in register_query
+    assert 'heartbeat_at' not in register_query
+    assert params == [('http://localhost:8501/',), ('http://localhost:8502/',)]
+
+
+def test_parallel_claims_spread_evenly_across_instances(local_db):
+    instances, claims = 4, 400
+    connection = local_db()
+    repo = AppInstanceRepository(connection)
+    repo.create_instances_table()
+    repo.add_health_columns()
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM app_instances WHERE url LIKE %s", (f'{CLAIM_TEST_URL_PREFIX}%',))
+        cursor.executemany("INSERT INTO app_instances (url, active_sessions) VALUES (%s, 0)",
+                           [(f'{CLAIM_TEST_URL_PREFIX}{i}/',) for i in range(instances)])
+        cursor.execute("SELECT id FROM app_instances WHERE url LIKE %s", (f'{CLAIM_TEST_URL_PREFIX}%',))
+        instance_ids = [row[0] for row in cursor.fetchall()]
+    connection.commit()
+
+    def claim(_):
+        claim_connection = local_db()
+        try:
+            return AppInstanceRepository(claim_connection).claim_instance(instance_ids)['id']
+        finally:
+            claim_connection.close()
+
+    try:
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            distribution = Counter(executor.map(claim, range(claims)))
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM app_instances WHERE url LIKE %s", (f'{CLAIM_TEST_URL_PREFIX}%',))
+        connection.commit()
+
+    assert sum(distribution.values()) == claims
+    # Every claim sees the sessions counted by the ones before it
+    assert max(distribution.values()) - min(distribution.values()) <= 1
@@ -0,0 +1,116 @@
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from repositories.CatalogCache import CATALOG_SNAPSHOTS_KEPT, CatalogCache
+from repositories.TrackSearchIndex import TrackSearchIndex
+from repositories.TrackRepository import TrackRepository
+
+
+class TestCatalogCache:
+
+    @pytest.fixture
+    def catalog(self):
+        catalog = {
+            'tracks': [
+                {'id': 1, 'name': 'Varnam', 'description': '', 'track_path': 'a', 'track_ref_path': 'a_ref',
+                 'notation_path': None, 'level': 1, 'ragam_id': 10, 'offset': 0},
+                {'id': 2, 'name': 'Kriti', 'description': '', 'track_path': 'b', 'track_ref_path': 'b_ref',
+                 'notation_path': None, 'level': 2, 'ragam_id': 11, 'offset': 5},
+                {'id': 3, 'name': 'Geetham', 'description': '', 'track_path': 'c', 'track_ref_path': 'c_ref',
+                 'notation_path': None, 'level': 1, 'ragam_id': 10, 'offset': 2},
+            ],
+            'ragas': [{'id': 10, 'name': 'Mohanam'}, {'id': 11, 'name': 'Kalyani'}],
+            'tags': ['Beginner', 'Fast'],
+            'levels': [1, 2],
+            'tags_by_track_id': {1: ['Beginner', 'Fast'], 3: ['Beginner']},
+        }
+        catalog['search_index'] = TrackSearchIndex(catalog['tracks'], catalog['ragas'], catalog['tags_by_track_id'])
+        return catalog
+
+    @pytest.fixture
+    def catalog_cache(self, catalog):
+        cache = CatalogCache(version_check_interval=60)
+        cache.get_version = MagicMock(return_value=('v1',))
+        cache.load = MagicMock(return_value=catalog)
+        return cache
+
+    @pytest.fixture
+    def track_repo(self, catalog_cache):
+        return TrackRepository(MagicMock(), catalog_cache)
+
+    def test_get_loads_once_within_check_interval(self, catalog_cache):
+        connection = MagicMock()
+
+        catalog_cache.get(connection)
+        catalog_cache.get(connection)
+
+        catalog_cache.load.assert_called_once()
+        catalog_cache.get_version.assert_called_once()
+
+    def test_get_reloads_when_version_changes(self, catalog_cache):
+        catalog_cache.version_check_interval = 0
+        connection = MagicMock()
+
+        catalog_cache.get(connection)
+        catalog_cache.get(connection)
+        assert catalog_cache.load.call_count == 1
+
+        catalog_cache.get_version.return_value = ('v2',)
+        catalog_cache.get(connection)
+        assert catalog_cache.load.call_count == 2
+
+    def test_get_shares_loaded_catalog_through_snapshot(self, catalog, tmp_path):
+        first_worker = CatalogCache(snapshot_dir=str(tmp_path))
+        first_worker.get_version = MagicMock(return_value=('v1',))
+        first_worker.load = MagicMock(return_value=catalog)
+        first_worker.get(MagicMock())
+
+        second_worker = CatalogCache(snapshot_dir=str(tmp_path))
+        second_worker.get_version = MagicMock(return_value=('v1',))
+        second_worker.load = MagicMock()
+        cached = second_worker.get(MagicMock())
+
+        second_worker.load.assert_not_called()
+        assert [track['id'] for track in cached['search_index'].search(raga='mohanam')] == [1, 3]
+
+        second_worker.get_version.return_value = ('v2',)
+        second_worker.version_check_interval = 0
+        second_worker.get(MagicMock())
+        second_worker.load.assert_called_once()
+
+    def test_remove_track_invalidates_cache(self, track_repo, catalog_cache):
+        track_repo.get_all_tracks()
+
+        track_repo.remove_track_by_id(1)
+        track_repo.get_all_tracks()
+
+        assert catalog_cache.load.call_count == 2
+
+    def test_search_tracks_filters_in_memory(self, track_repo):
+        tracks = track_repo.search_tracks(raga='mohanam', level=1, tags=['Beginner'])
+
+        assert [track['id'] for track in tracks] == [1, 3]
+        assert tracks[0]['track_name'] == 'Varnam'
+        assert tracks[0]['ragam'] == 'Mohanam'
+        track_repo.connection.cursor.assert_not_called()
+
+    def test_search_tracks_requires_all_tags(self, track_repo):
+        tracks = track_repo.search_tracks(tags=['Beginner', 'Fast'])
+
+        assert [track['id'] for track in tracks] == [1]
+
+    def test_search_tracks_respects_limit(self, track_repo):
+        assert len(track_repo.search_tracks(limit=2)) == 2
+
+    def test_save_snapshot_keeps_most_recent_versions(self, catalog, tmp_path):
+        catalog_cache = CatalogCache(snapshot_dir=str(tmp_path))
+        for i in range(CATALOG_SNAPSHOTS_KEPT + 2):
+            catalog_cache.save_snapshot((f'v{i}',), catalog)
+            os.utime(catalog_cache.get_snapshot_path((f'v{i}',)), (i, i))
+
+        remaining = sorted(os.listdir(str(tmp_path / 'catalog')))
+
+        assert len(remaining) == CATALOG_SNAPSHOTS_KEPT
+        assert os.path.basename(catalog_cache.get_snapshot_path(('v0',))) not in remaining
@@ -0,0 +1,32 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from repositories.ModelPerformanceRepository import ModelPerformanceRepository
+
+
+class TestModelPerformanceRepository:
+
+    @pytest.fixture
+    def mock_connection(self):
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value.__enter__.return_value
+        mock_cursor.lastrowid = 42
+        yield mock_conn
+        mock_conn.reset_mock()
+
+    def test_constructor_does_no_io(self, mock_connection):
+        ModelPerformanceRepository(mock_connection)
+
+        mock_connection.cursor.assert_not_called()
+        mock_connection.commit.assert_not_called()
+
+    def test_record_model_performance(self, mock_connection):
+        repo = ModelPerformanceRepository(mock_connection)
+
+        model_performance_id = repo.record_model_performance('xgboost', {'mse': 1.5, 'mae': 1.0, 'r2': 0.8}, [7, 9])
+
+        assert model_performance_id == 42
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        assert mock_cursor.execute.call_count == 3
+        mock_connection.commit.assert_called_once()
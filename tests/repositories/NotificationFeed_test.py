@@ -0,0 +1,90 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from repositories.NotificationFeed import NotificationFeed
+from repositories.PortalRepository import PortalRepository
+
+
+def activity(activity_id, user_id=1, user_type='student', group_id=10):
+    return {'activity_id': activity_id, 'activity_type': 'Play Track', 'timestamp': None,
+            'metadata': '{}', 'user_id': user_id, 'user_name': f'User {user_id}',
+            'user_type': user_type, 'group_id': group_id}
+
+
+@pytest.fixture
+def mock_connection():
+    return MagicMock()
+
+
+def get_fetch_cursor(mock_connection):
+    return mock_connection.cursor.return_value.__enter__.return_value
+
+
+def test_get_fetches_only_rows_after_newest_cached_id(mock_connection):
+    feed = NotificationFeed(ttl=0, reorder_window=0)
+    cursor = get_fetch_cursor(mock_connection)
+    cursor.fetchall.side_effect = [[activity(12), activity(11)], [activity(13)]]
+
+    activities, new_cursor = feed.get(mock_connection, 1, 10)
+    assert [row['activity_id'] for row in activities] == [12, 11]
+    assert new_cursor == (12, ())
+
+    activities, new_cursor = feed.get(mock_connection, 1, new_cursor)
+    assert [row['activity_id'] for row in activities] == [13]
+    assert new_cursor == (13, ())
+    # The second poll only asked for the rows after the newest cached id
+    assert cursor.execute.call_args_list[1][0][1] == (12, 1, feed.size)
+
+
+def test_get_serves_other_sessions_from_cache_within_ttl(mock_connection):
+    feed = NotificationFeed(ttl=60)
+    get_fetch_cursor(mock_connection).fetchall.return_value = [activity(12), activity(11)]
+
+    feed.get(mock_connection, 1, 10)
+    activities, new_cursor = feed.get(mock_connection, 1, 11)
+
+    assert [row['activity_id'] for row in activities] == [12]
+    assert new_cursor == (11, (12,))
+    get_fetch_cursor(mock_connection).execute.assert_called_once()
+
+
+def test_get_notifies_ids_committed_out_of_order(mock_connection):
+    feed = NotificationFeed(ttl=0, reorder_window=60)
+    cursor = get_fetch_cursor(mock_connection)
+    # Activity 11 commits after 12 has been polled
+    cursor.fetchall.side_effect = [[activity(12)], [activity(13), activity(12), activity(11)]]
+
+    activities, new_cursor = feed.get(mock_connection, 1, 10)
+    assert [row['activity_id'] for row in activities] == [12]
+
+    activities, new_cursor = feed.get(mock_connection, 1, new_cursor)
+    assert [row['activity_id'] for row in activities] == [13, 11]
+    assert new_cursor == (10, (11, 12, 13))
+    # The second poll re-read the ids within the reorder window
+    assert cursor.execute.call_args_list[1][0][1] == (10, 1, feed.size)
+
+
+def test_get_notifications_fans_out_teacher_and_group_feeds():
+    notification_feed = MagicMock()
+    notification_feed.get.return_value = ([
+        activity(15, user_id=2, user_type='teacher', group_id=None),
+        activity(14, user_id=3, group_id=10),
+        activity(13, user_id=4, group_id=20),
+        activity(12, user_id=1, group_id=10),
+    ], 15)
+    portal_repo = PortalRepository(MagicMock(), notification_feed)
+
+    notifications, cursor = portal_repo.get_notifications(1, 10, 100, 11)
+
+    assert [row['activity_id'] for row in notifications] == [15, 14]
+    assert cursor == 15
+
+
+def test_get_cursor_reads_last_activity_before_time(mock_connection):
+    cursor = get_fetch_cursor(mock_connection)
+    cursor.fetchone.return_value = None
+
+    assert NotificationFeed.get_cursor(mock_connection, '2024-05-01 10:00:00') == 0
+    query = cursor.execute.call_args[0][0]
+    assert 'ORDER BY timestamp DESC, activity_id DESC' in query and 'LIMIT 1' in query
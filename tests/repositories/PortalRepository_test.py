@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, call
 import pytz
 from datetime import datetime
 
+from enums.TimeFrame import TimeFrame
 from repositories.PortalRepository import PortalRepository
 
 
@@ -205,3 +206,25 @@ class TestPortalRepository:
         ]
         assert result == expected_result
         assert mock_cursor.execute.call_args[0][1] == (user_id,)
+
+    def test_fetch_team_dashboard_data_by_groups(self, portal_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchall.return_value = [
+            {'user_id': 1, 'teammate': 'Asha', 'group_id': 10, 'group_name': 'Team A', 'badges': '["First Note"]'},
+            {'user_id': 2, 'teammate': 'Ravi', 'group_id': 11, 'group_name': 'Team B', 'badges': None},
+        ]
+
+        result = portal_repo.fetch_team_dashboard_data_by_groups([10, 11], TimeFrame.CURRENT_WEEK)
+
+        mock_cursor.execute.assert_called_once()
+        query, params = mock_cursor.execute.call_args.args
+        assert params[-2:] == (10, 11)
+        start_date, end_date = TimeFrame.CURRENT_WEEK.get_date_bounds()
+        assert params[2:4] == (start_date, end_date)
+        assert 'BETWEEN' not in query
+        assert result[0]['badges'] == ['First Note']
+        assert result[1]['badges'] == []
+
+    def test_fetch_team_dashboard_data_by_groups_without_groups(self, portal_repo, mock_connection):
+        assert portal_repo.fetch_team_dashboard_data_by_groups([], TimeFrame.CURRENT_WEEK) == []
+        mock_connection.cursor.assert_not_called()
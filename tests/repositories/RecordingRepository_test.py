@@ -0,0 +1,98 @@
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from repositories.RecordingRepository import RecordingRepository
+
+
+class TestRecordingRepository:
+
+    @pytest.fixture
+    def mock_connection(self):
+        mock_conn = MagicMock()
+        yield mock_conn
+        mock_conn.reset_mock()
+
+    @pytest.fixture
+    def recording_repo(self, mock_connection):
+        return RecordingRepository(mock_connection)
+
+    def test_get_average_track_scores_reads_track_rollup(self, recording_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.fetchall.return_value = [{'track_id': 1, 'avg_score': Decimal('6.2')}]
+
+        result = recording_repo.get_average_track_scores()
+
+        assert result == [{'track_id': 1, 'avg_score': Decimal('6.2')}]
+        query = mock_cursor.execute.call_args[0][0]
+        assert 'FROM track_stats' in query
+        assert 'user_track_stats' not in query
+
+    def test_add_user_track_unique_key_removes_duplicates_first(self, recording_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchone.return_value = (0,)
+
+        recording_repo.add_user_track_unique_key()
+
+        queries = [call[0][0] for call in mock_cursor.execute.call_args_list]
+        assert 'DELETE later' in queries[1]
+        assert 'ADD UNIQUE KEY user_track_unique' in queries[2]
+        mock_connection.commit.assert_called_once()
+
+    def test_add_user_track_unique_key_skips_existing_key(self, recording_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchone.return_value = (1,)
+
+        recording_repo.add_user_track_unique_key()
+
+        mock_cursor.execute.assert_called_once()
+        mock_connection.commit.assert_not_called()
+
+    def test_backfill_user_track_stats_fills_empty_table(self, recording_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchone.return_value = (0,)
+
+        recording_repo.backfill_user_track_stats()
+
+        queries = [call[0][0] for call in mock_cursor.execute.call_args_list]
+        assert 'FROM user_track_stats' in queries[0]
+        assert 'INSERT INTO user_track_stats' in queries[1]
+        mock_connection.commit.assert_called_once()
+
+    def test_backfill_user_track_stats_skips_filled_table(self, recording_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchone.return_value = (1,)
+
+        recording_repo.backfill_user_track_stats()
+
+        mock_cursor.execute.assert_called_once()
+        mock_connection.commit.assert_not_called()
+
+    def test_update_score_refreshes_user_track_stats_before_commit(self, recording_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.fetchone.return_value = (7, 3, datetime(2024, 5, 6, 18, 30))
+
+        recording_repo.update_score(42, 8.5)
+
+        statements = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        assert statements[0].startswith("UPDATE recordings SET score")
+        assert "DELETE FROM user_track_stats" in statements[2]
+        assert "INSERT INTO user_track_stats" in statements[3]
+        assert mock_cursor.execute.call_args_list[3].args[1] == (7, 3)
+        assert "DELETE FROM track_stats" in statements[4]
+        assert "INSERT INTO track_stats" in statements[5]
+        assert mock_cursor.execute.call_args_list[5].args[1] == (3,)
+        assert "DELETE FROM user_daily_stats" in statements[6]
+        mock_connection.commit.assert_called_once()
+
+    def test_add_recording_refreshes_user_track_stats(self, recording_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.lastrowid = 99
+
+        recording_id = recording_repo.add_recording(7, 3, 'blob', 'url', None, 30, 'hash')
+
+        assert recording_id == 99
+        assert mock_cursor.execute.call_args_list[-3].args[1] == (7, 3)
+        assert mock_cursor.execute.call_args_list[-1].args[1] == (3,)
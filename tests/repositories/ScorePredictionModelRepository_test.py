@@ -0,0 +1,67 @@
+import os
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from repositories.ScorePredictionModelRepository import ScorePredictionModelRepository
+
+
+class TestScorePredictionModelRepository:
+
+    @pytest.fixture
+    def mock_connection(self):
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchone.return_value = (3, 12345)
+        mock_cursor.fetchmany.side_effect = [
+            [(1, 10, 1, Decimal('2.5'), Decimal('30.0'), Decimal('0.25'), 8),
+             (1, 11, 1, Decimal('2.5'), Decimal('31.0'), Decimal('0.50'), 7)],
+            [(2, 12, 3, Decimal('1.0'), Decimal('45.5'), Decimal('0.75'), 6)],
+            [],
+        ]
+        yield mock_conn
+        mock_conn.reset_mock()
+
+    @pytest.fixture
+    def repo(self, mock_connection):
+        return ScorePredictionModelRepository(mock_connection)
+
+    def test_get_training_arrays_streams_typed_columns(self, repo, tmp_path):
+        arrays = repo.get_training_arrays(snapshot_dir=str(tmp_path), batch_size=2)
+
+        np.testing.assert_array_equal(arrays['recording_id'], [10, 11, 12])
+        np.testing.assert_allclose(arrays['duration'], [30.0, 31.0, 45.5])
+        assert arrays['recording_id'].dtype == np.int64
+        assert arrays['distance'].dtype == np.float32
+
+    def test_get_training_arrays_reuses_snapshot(self, repo, mock_connection, tmp_path):
+        first = repo.get_training_arrays(snapshot_dir=str(tmp_path))
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchmany.reset_mock()
+
+        second = repo.get_training_arrays(snapshot_dir=str(tmp_path))
+
+        mock_cursor.fetchmany.assert_not_called()
+        np.testing.assert_array_equal(first['score'], second['score'])
+        assert len(list(tmp_path.iterdir())) == 1
+
+    def test_get_training_arrays_grows_when_rows_were_added(self, repo, mock_connection, tmp_path):
+        mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchone.return_value = (1, 12345)
+
+        arrays = repo.get_training_arrays(use_snapshot=False)
+
+        assert len(arrays['recording_id']) == 3
+        assert not list(tmp_path.iterdir())
+
+    def test_prune_snapshots_keeps_most_recently_used(self, tmp_path):
+        for i in range(4):
+            snapshot_path = tmp_path / f"hash-{i}.npz"
+            snapshot_path.write_bytes(b'')
+            os.utime(snapshot_path, (1000 + i, 1000 + i))
+
+        ScorePredictionModelRepository.prune_snapshots(str(tmp_path), keep=2)
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == ['hash-2.npz', 'hash-3.npz']
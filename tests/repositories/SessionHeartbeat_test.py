@@ -0,0 +1,143 @@
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from repositories.SessionHeartbeat import SessionHeartbeat
+from repositories.UserSessionRepository import UserSessionRepository
+
+
+@pytest.fixture
+def mock_connection():
+    return MagicMock()
+
+
+@pytest.fixture
+def database_manager():
+    return MagicMock()
+
+
+@pytest.fixture
+def make_heartbeat(database_manager):
+    heartbeats = []
+
+    def make(**kwargs):
+        heartbeat = SessionHeartbeat(connection_factory=lambda: database_manager, **kwargs)
+        heartbeats.append(heartbeat)
+        return heartbeat
+
+    yield make
+    for heartbeat in heartbeats:
+        heartbeat.close()
+
+
+def test_beat_keeps_activity_in_memory_until_interval(make_heartbeat, mock_connection):
+    heartbeat = make_heartbeat(flush_interval=3600)
+    timestamp = datetime(2024, 5, 1, 10, 30)
+
+    heartbeat.beat(mock_connection, 'session-1', timestamp)
+    heartbeat.beat(mock_connection, 'session-1', timestamp)
+
+    assert heartbeat.get_last_activity_time('session-1') == timestamp
+    mock_connection.cursor.assert_not_called()
+
+
+def test_background_thread_flushes_all_pending_sessions_in_one_update(make_heartbeat, mock_connection,
+                                                                      database_manager):
+    heartbeat = make_heartbeat(flush_interval=0.05)
+
+    heartbeat.beat(mock_connection, 'session-1', datetime(2024, 5, 1, 10, 0))
+    heartbeat.beat(mock_connection, 'session-2', datetime(2024, 5, 1, 10, 5))
+    deadline = time.monotonic() + 5
+    while heartbeat.has_pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    mock_connection.cursor.assert_not_called()
+    mock_cursor = database_manager.connection.cursor.return_value
+    mock_cursor.execute.assert_called_once()
+    query, params = mock_cursor.execute.call_args[0]
+    assert 'UPDATE user_sessions' in query
+    assert sorted(params[-2:]) == ['session-1', 'session-2']
+    database_manager.connection.commit.assert_called_once()
+    assert heartbeat.pending == set()
+
+
+def test_close_flushes_pending_sessions(make_heartbeat, mock_connection, database_manager):
+    heartbeat = make_heartbeat(flush_interval=3600)
+    heartbeat.beat(mock_connection, 'session-1', datetime(2024, 5, 1, 10, 0))
+
+    heartbeat.close()
+
+    database_manager.connection.commit.assert_called_once()
+    database_manager.close.assert_called_once()
+    assert heartbeat.pending == set()
+
+
+def test_failed_background_flush_reconnects(make_heartbeat, mock_connection, database_manager):
+    heartbeat = make_heartbeat(flush_interval=3600)
+    heartbeat.beat(mock_connection, 'session-1', datetime(2024, 5, 1, 10, 0))
+    database_manager.connection.cursor.return_value.execute.side_effect = Exception("Lost connection")
+
+    assert heartbeat.flush_pending() == 0
+
+    database_manager.close.assert_called_once()
+    assert heartbeat.pending == {'session-1'}
+
+
+def test_beat_stamps_activity_with_db_clock(make_heartbeat, mock_connection):
+    heartbeat = make_heartbeat(flush_interval=3600)
+    mock_connection.cursor.return_value.fetchone.return_value = (datetime(2024, 5, 1, 10, 0),)
+
+    heartbeat.beat(mock_connection, 'session-1')
+    heartbeat.beat(mock_connection, 'session-2')
+
+    assert heartbeat.get_last_activity_time('session-1') == datetime(2024, 5, 1, 10, 0)
+    # The DB clock is read once and then advanced locally
+    mock_connection.cursor.return_value.execute.assert_called_once_with("SELECT CURRENT_TIMESTAMP;")
+
+
+def test_flush_evicts_idle_sessions(make_heartbeat, mock_connection):
+    heartbeat = make_heartbeat(flush_interval=3600, idle_eviction=60)
+    heartbeat.beat(mock_connection, 'closed-tab', datetime(2024, 5, 1, 10, 0))
+    heartbeat.beat(mock_connection, 'active', datetime(2024, 5, 1, 10, 5))
+    heartbeat.beaten_at['closed-tab'] -= 120
+
+    heartbeat.flush(mock_connection)
+
+    assert heartbeat.get_last_activity_time('closed-tab') is None
+    assert heartbeat.get_last_activity_time('active') == datetime(2024, 5, 1, 10, 5)
+
+
+def test_flush_splits_into_batches(make_heartbeat, mock_connection):
+    heartbeat = make_heartbeat(flush_interval=3600, batch_size=2)
+    heartbeat.db_clock = (datetime(2024, 5, 1, 10, 0), time.monotonic())
+    for i in range(5):
+        heartbeat.beat(mock_connection, f'session-{i}')
+
+    assert heartbeat.flush(mock_connection) == 5
+    assert mock_connection.cursor.return_value.execute.call_count == 3
+
+
+def test_failed_flush_keeps_sessions_pending(make_heartbeat, mock_connection):
+    heartbeat = make_heartbeat(flush_interval=3600)
+    heartbeat.beat(mock_connection, 'session-1', datetime(2024, 5, 1, 10, 0))
+    mock_connection.cursor.return_value.execute.side_effect = Exception("Lost connection")
+
+    assert heartbeat.flush(mock_connection) == 0
+    assert heartbeat.pending == {'session-1'}
+
+
+def test_close_session_flushes_and_forgets_session(make_heartbeat, mock_connection):
+    heartbeat = make_heartbeat(flush_interval=3600)
+    heartbeat.db_clock = (datetime(2024, 5, 1, 10, 0), time.monotonic())
+    repo = UserSessionRepository(mock_connection, heartbeat)
+    repo.update_last_activity_time('session-1')
+    mock_cursor = mock_connection.cursor.return_value
+    mock_cursor.fetchone.return_value = (120,)
+
+    assert repo.close_session('session-1') == 120
+
+    first_query = mock_cursor.execute.call_args_list[0][0][0]
+    assert 'CASE session_id' in first_query
+    assert heartbeat.get_last_activity_time('session-1') is None
@@ -0,0 +1,45 @@
+import pytest
+
+from repositories.TrackSearchIndex import TrackSearchIndex
+
+
+class TestTrackSearchIndex:
+
+    @pytest.fixture
+    def search_index(self):
+        tracks = [
+            {'id': 1, 'name': 'Mohanam Varnam', 'description': '', 'track_path': 'a', 'track_ref_path': 'a_ref',
+             'notation_path': None, 'level': 1, 'ragam_id': 10, 'offset': 0},
+            {'id': 2, 'name': 'Kalyani Kriti', 'description': '', 'track_path': 'b', 'track_ref_path': 'b_ref',
+             'notation_path': None, 'level': 2, 'ragam_id': 11, 'offset': 5},
+            {'id': 3, 'name': 'Varnam', 'description': '', 'track_path': 'c', 'track_ref_path': 'c_ref',
+             'notation_path': None, 'level': 1, 'ragam_id': 10, 'offset': 2},
+            {'id': 4, 'name': 'No Raga', 'description': '', 'track_path': 'd', 'track_ref_path': 'd_ref',
+             'notation_path': None, 'level': 1, 'ragam_id': None, 'offset': 0},
+        ]
+        ragas = [{'id': 10, 'name': 'Mohanam'}, {'id': 11, 'name': 'Kalyani'}]
+        tags_by_track_id = {1: ['Beginner', 'Fast'], 2: ['Fast'], 3: ['Beginner']}
+        return TrackSearchIndex(tracks, ragas, tags_by_track_id)
+
+    def test_search_without_filters_skips_tracks_without_raga(self, search_index):
+        assert [row['id'] for row in search_index.search()] == [1, 2, 3]
+
+    def test_search_combines_filters(self, search_index):
+        rows = search_index.search(raga='Mohanam', level='1', tags=['fast'])
+
+        assert [row['id'] for row in rows] == [1]
+        assert rows[0]['ragam'] == 'Mohanam'
+
+    def test_search_unknown_tag_matches_nothing(self, search_index):
+        assert search_index.search(tags=['Beginner', 'Slow']) == []
+
+    def test_search_name_ranks_exact_match_first(self, search_index):
+        assert [row['id'] for row in search_index.search(name='varnam')] == [3, 1]
+
+    def test_search_name_matches_misspelling(self, search_index):
+        assert [row['id'] for row in search_index.search(name='Kalyany Kriti')] == [2]
+
+    def test_search_returns_copies(self, search_index):
+        search_index.search()[0]['track_name'] = 'Changed'
+
+        assert search_index.search()[0]['track_name'] == 'Mohanam Varnam'
@@ -0,0 +1,47 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from repositories.UserDailyStatsRepository import UserDailyStatsRepository
+
+
+class TestUserDailyStatsRepository:
+
+    @pytest.fixture
+    def mock_connection(self):
+        mock_conn = MagicMock()
+        yield mock_conn
+        mock_conn.reset_mock()
+
+    @pytest.fixture
+    def user_daily_stats_repo(self, mock_connection):
+        return UserDailyStatsRepository(mock_connection)
+
+    def test_refresh_user_daily_stats_recomputes_one_day(self, user_daily_stats_repo):
+        cursor = MagicMock()
+        timestamp = datetime(2024, 5, 6, 18, 30)
+
+        user_daily_stats_repo.refresh_user_daily_stats(cursor, 7, timestamp)
+
+        calls = cursor.execute.call_args_list
+        assert "DELETE FROM user_daily_stats" in calls[0].args[0]
+        assert "DELETE FROM user_daily_tracks" in calls[1].args[0]
+        assert "INSERT INTO user_daily_stats" in calls[2].args[0]
+        assert calls[2].args[1] == (7, timestamp, timestamp) * 3
+        assert "INSERT INTO user_daily_tracks" in calls[3].args[0]
+        assert calls[3].args[1] == (7, timestamp, timestamp)
+
+    def test_refresh_user_daily_stats_skips_missing_timestamp(self, user_daily_stats_repo):
+        cursor = MagicMock()
+
+        user_daily_stats_repo.refresh_user_daily_stats(cursor, 7, None)
+
+        cursor.execute.assert_not_called()
+
+    def test_rebuild_user_daily_stats(self, user_daily_stats_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.rowcount = 12
+
+        assert user_daily_stats_repo.rebuild_user_daily_stats() == 12
+        mock_connection.commit.assert_called_once()
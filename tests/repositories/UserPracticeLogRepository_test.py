@@ -0,0 +1,121 @@
+import json
+from datetime import date, datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from enums.Badges import UserBadges
+from repositories.UserPracticeLogRepository import UserPracticeLogRepository
+
+
+class TestUserPracticeLogRepository:
+
+    @pytest.fixture
+    def mock_connection(self):
+        mock_conn = MagicMock()
+        yield mock_conn
+        mock_conn.reset_mock()
+
+    @pytest.fixture
+    def practice_log_repo(self, mock_connection):
+        return UserPracticeLogRepository(mock_connection)
+
+    @staticmethod
+    def streak_row(current_start, current_end, longest_start, longest_end, histogram):
+        return current_start, current_end, longest_start, longest_end, json.dumps(histogram)
+
+    @staticmethod
+    def saved_streak(cursor):
+        statement, params = next(call.args for call in cursor.execute.call_args_list
+                                 if "INSERT INTO user_practice_streaks" in call.args[0])
+        return params
+
+    def test_update_practice_streak_extends_current_run(self, practice_log_repo):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = self.streak_row(
+            date(2024, 5, 5), date(2024, 5, 6), date(2024, 5, 5), date(2024, 5, 6), {'1': 3, '2': 1})
+
+        practice_log_repo.update_practice_streak(cursor, 7, date(2024, 5, 7))
+
+        params = self.saved_streak(cursor)
+        assert params[1:5] == (date(2024, 5, 5), date(2024, 5, 7), date(2024, 5, 5), date(2024, 5, 7))
+        assert json.loads(params[5]) == {'1': 3, '3': 1}
+        assert cursor.execute.call_count == 2
+
+    def test_update_practice_streak_starts_new_run(self, practice_log_repo):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = self.streak_row(
+            date(2024, 5, 5), date(2024, 5, 6), date(2024, 4, 1), date(2024, 4, 5), {'2': 1, '5': 1})
+
+        practice_log_repo.update_practice_streak(cursor, 7, date(2024, 5, 9))
+
+        params = self.saved_streak(cursor)
+        assert params[1:5] == (date(2024, 5, 9), date(2024, 5, 9), date(2024, 4, 1), date(2024, 4, 5))
+        assert json.loads(params[5]) == {'1': 1, '2': 1, '5': 1}
+
+    def test_update_practice_streak_ignores_day_in_current_run(self, practice_log_repo):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = self.streak_row(
+            date(2024, 5, 5), date(2024, 5, 6), date(2024, 5, 5), date(2024, 5, 6), {'2': 1})
+
+        practice_log_repo.update_practice_streak(cursor, 7, date(2024, 5, 6))
+
+        assert cursor.execute.call_count == 1
+
+    def test_update_practice_streak_recomputes_backfilled_day(self, practice_log_repo):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = self.streak_row(
+            date(2024, 5, 5), date(2024, 5, 6), date(2024, 5, 5), date(2024, 5, 6), {'1': 1, '2': 1})
+        cursor.fetchall.return_value = [(date(2024, 5, 1),), (date(2024, 5, 3),), (date(2024, 5, 4),),
+                                        (date(2024, 5, 5),), (date(2024, 5, 6),)]
+
+        practice_log_repo.update_practice_streak(cursor, 7, date(2024, 5, 4))
+
+        params = self.saved_streak(cursor)
+        assert params[1:5] == (date(2024, 5, 3), date(2024, 5, 6), date(2024, 5, 3), date(2024, 5, 6))
+        assert json.loads(params[5]) == {'1': 1, '4': 1}
+
+    def test_get_streak_reads_current_run(self, practice_log_repo, mock_connection):
+        mock_connection.cursor.return_value.fetchone.return_value = self.streak_row(
+            date(2024, 5, 1), date(2024, 5, 5), date(2024, 5, 1), date(2024, 5, 5), {'5': 1})
+
+        assert practice_log_repo.get_streak(7, date(2024, 5, 5)) == UserBadges.FIVE_DAY_STREAK
+        mock_connection.cursor.return_value.fetchall.assert_not_called()
+
+    def test_get_streaks_buckets_histogram(self, practice_log_repo, mock_connection):
+        mock_connection.cursor.return_value.fetchone.return_value = self.streak_row(
+            date(2024, 5, 1), date(2024, 5, 1), date(2024, 4, 1), date(2024, 4, 10), {'1': 4, '2': 2, '4': 1, '10': 1})
+
+        streaks = practice_log_repo.get_streaks(7)
+
+        assert streaks == {'2_day_streak': 2, '3_day_streak': 1, '5_day_streak': 0, '7_day_streak': 0,
+                           '10_day_streak': 1}
+
+    def test_backfill_practice_streaks_rebuilds_empty_table(self, practice_log_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.fetchone.return_value = (0,)
+        mock_cursor.fetchall.return_value = [(1, date(2024, 5, 1)), (1, date(2024, 5, 2))]
+
+        assert practice_log_repo.backfill_practice_streaks() == 1
+
+        assert self.saved_streak(mock_cursor)
+        mock_connection.commit.assert_called_once()
+
+    def test_backfill_practice_streaks_skips_filled_table(self, practice_log_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.fetchone.return_value = (1,)
+
+        assert practice_log_repo.backfill_practice_streaks() == 0
+
+        mock_cursor.execute.assert_called_once()
+        mock_connection.commit.assert_not_called()
+
+    def test_log_practice_updates_streak_before_commit(self, practice_log_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.fetchone.return_value = None
+        mock_cursor.fetchall.return_value = [(date(2024, 5, 6),)]
+
+        practice_log_repo.log_practice(7, datetime(2024, 5, 6, 18, 30), 30)
+
+        assert self.saved_streak(mock_cursor)[1:3] == (date(2024, 5, 6), date(2024, 5, 6))
+        mock_connection.commit.assert_called_once()